@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Benchmark batched search against sequential single-query calls.
+
+Runs the same N queries three ways through an in-process FastMCP client:
+  1. N sequential search_documents calls
+  2. N concurrent search_documents calls (coalesced by the micro-batcher)
+  3. One search_documents_batch call
+
+Usage:
+    python benchmarks/bench_batch.py --queries 20 --rounds 5
+    MCP_CHROMA_PATH=/tmp/scratch_db python benchmarks/bench_batch.py
+"""
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from fastmcp import Client
+
+from src.server import mcp
+
+
+SAMPLE_QUERIES = [
+    "how do bees communicate",
+    "ancient technology",
+    "quantum physics",
+    "perfect pizza recipe",
+    "intelligent animals",
+    "what is MCP protocol",
+    "japanese art and philosophy",
+]
+
+
+async def _sequential(client, queries, collection, max_results):
+    for q in queries:
+        await client.call_tool("search_documents", {"query": q, "collection": collection, "max_results": max_results})
+
+
+async def _concurrent(client, queries, collection, max_results):
+    await asyncio.gather(*[
+        client.call_tool("search_documents", {"query": q, "collection": collection, "max_results": max_results})
+        for q in queries
+    ])
+
+
+async def _batch(client, queries, collection, max_results):
+    await client.call_tool("search_documents_batch", {"queries": queries, "collection": collection, "max_results": max_results})
+
+
+async def main(args):
+    queries = [f"{SAMPLE_QUERIES[i % len(SAMPLE_QUERIES)]} {i}" for i in range(args.queries)]
+    modes = {"sequential": _sequential, "concurrent": _concurrent, "batch": _batch}
+
+    async with Client(mcp) as client:
+        # Warm-up: load the embedding model and cache the collection handle
+        await _sequential(client, queries[:1], args.collection, args.max_results)
+
+        timings: dict[str, list[float]] = {name: [] for name in modes}
+        for _ in range(args.rounds):
+            for name, run in modes.items():
+                start = time.perf_counter()
+                await run(client, queries, args.collection, args.max_results)
+                timings[name].append(time.perf_counter() - start)
+
+    baseline = statistics.median(timings["sequential"])
+    print(f"📊 {args.queries} queries x {args.rounds} rounds on '{args.collection}'\n")
+    for name, samples in timings.items():
+        median = statistics.median(samples)
+        print(
+            f"  • {name:<10} {median * 1000:8.1f} ms  "
+            f"{args.queries / median:8.1f} queries/s  "
+            f"{baseline / median:5.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--queries", type=int, default=20, help="Queries per round")
+    parser.add_argument("--rounds", type=int, default=5, help="Rounds per mode")
+    parser.add_argument("--collection", default="default")
+    parser.add_argument("--max-results", type=int, default=5)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Load benchmark for the MCP server over the HTTP transport.
+
+Starts `src/server.py` with MCP_TRANSPORT=http (or targets --url), then runs
+search_documents from 1, 8 and 64 concurrent clients and reports p50/p99
+latency, throughput and how many calls were rejected as busy. With --workers
+N the server runs as a cluster (MCP_TRANSPORT=cluster) of N read-only
+workers behind the dispatcher, to compare against a single process.
+
+Usage:
+    python benchmarks/bench_load.py --requests 20
+    python benchmarks/bench_load.py --requests 20 --workers 4
+    python benchmarks/bench_load.py --url http://127.0.0.1:8000/mcp --clients 1 8 64
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+from fastmcp import Client
+
+SERVER_PATH = Path(__file__).parent.parent / "src" / "server.py"
+
+QUERIES = [
+    "how do bees communicate",
+    "ancient technology",
+    "quantum physics",
+    "perfect pizza recipe",
+    "intelligent animals",
+    "what is MCP protocol",
+    "japanese art and philosophy",
+]
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+async def _client_worker(url, worker_id, requests, collection, latencies, busy):
+    async with Client(url) as client:
+        for i in range(requests):
+            # Unique query text so the result cache doesn't hide the search cost
+            query = f"{QUERIES[(worker_id + i) % len(QUERIES)]} #{worker_id}-{i}"
+            start = time.perf_counter()
+            result = await client.call_tool("search_documents", {"query": query, "collection": collection})
+            latencies.append(time.perf_counter() - start)
+            if result.content[0].text.startswith("❌ Server busy"):
+                busy.append(1)
+
+
+async def run_level(url, clients, requests, collection):
+    latencies: list[float] = []
+    busy: list[int] = []
+    start = time.perf_counter()
+    await asyncio.gather(*[
+        _client_worker(url, w, requests, collection, latencies, busy) for w in range(clients)
+    ])
+    elapsed = time.perf_counter() - start
+    return {
+        "clients": clients,
+        "requests": len(latencies),
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "mean_ms": statistics.mean(latencies) * 1000,
+        "throughput": len(latencies) / elapsed,
+        "busy": len(busy),
+    }
+
+
+async def _wait_for_server(url, timeout=60.0):
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            async with Client(url) as client:
+                await client.ping()
+                return
+        except Exception:
+            if time.monotonic() > deadline:
+                raise
+            await asyncio.sleep(0.5)
+
+
+async def main(args):
+    server = None
+    url = args.url
+    if url is None:
+        url = f"http://127.0.0.1:{args.port}/mcp"
+        env = {**os.environ, "MCP_TRANSPORT": "http", "MCP_PORT": str(args.port)}
+        if args.workers:
+            env.update(MCP_TRANSPORT="cluster", MCP_CLUSTER_WORKERS=str(args.workers))
+        server = subprocess.Popen(
+            [sys.executable, str(SERVER_PATH)], env=env,
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+
+    try:
+        await _wait_for_server(url)
+        # Warm-up: load the embedding model and cache the collection handle
+        await run_level(url, 1, 2, args.collection)
+
+        print(f"📊 search_documents on '{args.collection}' via {url}\n")
+        print(f"  {'clients':>7} {'requests':>8} {'p50 ms':>9} {'p99 ms':>9} {'req/s':>9} {'busy':>5}")
+        for clients in args.clients:
+            r = await run_level(url, clients, args.requests, args.collection)
+            print(
+                f"  {r['clients']:>7} {r['requests']:>8} {r['p50_ms']:>9.1f} "
+                f"{r['p99_ms']:>9.1f} {r['throughput']:>9.1f} {r['busy']:>5}"
+            )
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="Existing server URL (default: start one)")
+    parser.add_argument("--port", type=int, default=8765, help="Port for the spawned server")
+    parser.add_argument("--clients", type=int, nargs="+", default=[1, 8, 64])
+    parser.add_argument("--requests", type=int, default=20, help="Requests per client")
+    parser.add_argument("--collection", default="default")
+    parser.add_argument("--workers", type=int, default=0, help="Run the spawned server as a cluster of N readers")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+Cold-start benchmark and startup budget for the stdio server.
+
+Starts a fresh server the way the agent does and measures, from the moment
+the process is spawned:
+
+  handshake     until the MCP initialize exchange completes
+  first_result  until the first search_documents call returns
+
+for each startup mode:
+
+  standard   MCP_FAST_START=0: ChromaDB opens before the handshake
+  fast       MCP_FAST_START=1 (the default): handshake first, warm-up after
+  warm-pool  attach (src/attach.py) to a pre-forked pool of warm servers
+
+Each mode is measured --repeat times and the medians are checked against the
+startup budget; the script exits with status 1 if any budget is exceeded, so
+it can gate changes that slow down startup. Uses the same scratch corpus as
+bench_suite.py.
+
+Usage:
+    python benchmarks/bench_startup.py
+    python benchmarks/bench_startup.py --modes fast warm-pool --repeat 10 --output startup.json
+    python benchmarks/bench_startup.py --budget fast=1500,3000
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any
+
+BENCH_DIR = Path(__file__).parent
+sys.path.insert(0, str(BENCH_DIR))
+
+from fastmcp import Client  # noqa: E402
+from fastmcp.client.transports import StdioTransport  # noqa: E402
+
+import corpus  # noqa: E402
+
+SERVE_PATH = BENCH_DIR / "serve.py"
+ATTACH_PATH = BENCH_DIR.parent / "src" / "attach.py"
+
+MODES = ["standard", "fast", "warm-pool"]
+
+# Median milliseconds allowed per mode: (handshake, first_result); None = report only
+BUDGETS: dict[str, tuple[float, float] | None] = {
+    "standard": None,
+    "fast": (1000.0, 4000.0),
+    "warm-pool": (400.0, 800.0),
+}
+
+
+async def _measure(transport: StdioTransport, query: str) -> tuple[float, float]:
+    """Seconds from spawn to handshake and to the first search result."""
+    start = time.perf_counter()
+    async with Client(transport) as client:
+        handshake = time.perf_counter() - start
+        result = await client.call_tool(
+            "search_documents", {"query": query, "collection": corpus.COLLECTION}, raise_on_error=False
+        )
+        first_result = time.perf_counter() - start
+    text = result.content[0].text if result.content else ""
+    if result.is_error or text.startswith("❌"):
+        raise RuntimeError(f"first search failed: {text[:200]}")
+    return handshake, first_result
+
+
+def _stdio(env: dict[str, str]) -> StdioTransport:
+    return StdioTransport(sys.executable, [str(SERVE_PATH), "--quiet"], env={**os.environ, **env})
+
+
+def _attach(socket_path: Path) -> StdioTransport:
+    return StdioTransport(sys.executable, ["-S", str(ATTACH_PATH), str(socket_path)])
+
+
+def _start_pool(env: dict[str, str], socket_path: Path, size: int) -> subprocess.Popen:
+    pool = subprocess.Popen(
+        [sys.executable, str(SERVE_PATH), "--quiet"],
+        env={
+            **os.environ,
+            **env,
+            "MCP_TRANSPORT": "warm-pool",
+            "MCP_WARM_POOL_SOCKET": str(socket_path),
+            "MCP_WARM_POOL_SIZE": str(size),
+        },
+        stdout=subprocess.DEVNULL,
+    )
+    deadline = time.monotonic() + 60
+    while not socket_path.exists():
+        if time.monotonic() > deadline or pool.poll() is not None:
+            pool.terminate()
+            raise RuntimeError("warm pool did not start")
+        time.sleep(0.1)
+    return pool
+
+
+async def run_mode(mode: str, args: argparse.Namespace, env: dict[str, str], query: str) -> dict[str, Any]:
+    handshakes, first_results = [], []
+    if mode == "warm-pool":
+        socket_path = Path(tempfile.mkdtemp(prefix="mcp-bench-")) / "pool.sock"
+        pool = _start_pool(env, socket_path, args.pool_size)
+        try:
+            await _measure(_attach(socket_path), query)  # waits until the first worker is warm
+            for _ in range(args.repeat):
+                # Give the pool time to replace the worker taken by the last run
+                await asyncio.sleep(args.pool_settle)
+                handshake, first_result = await _measure(_attach(socket_path), query)
+                handshakes.append(handshake)
+                first_results.append(first_result)
+        finally:
+            pool.terminate()
+            pool.wait()
+    else:
+        mode_env = {**env, "MCP_FAST_START": "1" if mode == "fast" else "0"}
+        for _ in range(args.repeat):
+            handshake, first_result = await _measure(_stdio(mode_env), query)
+            handshakes.append(handshake)
+            first_results.append(first_result)
+
+    ms = lambda values: round(statistics.median(values) * 1000, 1)  # noqa: E731
+    return {
+        "mode": mode,
+        "runs": args.repeat,
+        "handshake_ms": ms(handshakes),
+        "handshake_max_ms": round(max(handshakes) * 1000, 1),
+        "first_result_ms": ms(first_results),
+        "first_result_max_ms": round(max(first_results) * 1000, 1),
+    }
+
+
+def check_budget(entry: dict[str, Any], budget: tuple[float, float] | None) -> dict[str, Any]:
+    """Annotate a mode's result with its budget and whether the medians fit in it."""
+    if budget is None:
+        return {**entry, "budget": None, "within_budget": True}
+    handshake, first_result = budget
+    return {
+        **entry,
+        "budget": {"handshake_ms": handshake, "first_result_ms": first_result},
+        "within_budget": entry["handshake_ms"] <= handshake and entry["first_result_ms"] <= first_result,
+    }
+
+
+def _parse_budget(value: str) -> tuple[str, tuple[float, float]]:
+    mode, _, limits = value.partition("=")
+    try:
+        handshake, first_result = (float(v) for v in limits.split(","))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected MODE=HANDSHAKE_MS,FIRST_RESULT_MS, got '{value}'")
+    if mode not in MODES:
+        raise argparse.ArgumentTypeError(f"unknown mode '{mode}'")
+    return mode, (handshake, first_result)
+
+
+async def run(args: argparse.Namespace) -> dict[str, Any]:
+    count = corpus.parse_size(args.size)
+    db_path = Path(args.scratch) / f"{args.size.lower()}-{args.seed}"
+    log = lambda msg: print(msg, file=sys.stderr)  # noqa: E731  (stdout is reserved for JSON)
+
+    log(f"📦 corpus: {count:,} docs in {db_path}")
+    corpus.build_corpus(db_path, count, seed=args.seed, log=log)
+    env = {"MCP_CHROMA_PATH": str(db_path)}
+    query = corpus.queries(1, seed=args.seed)[0]
+    budgets = {**BUDGETS, **dict(args.budget)}
+
+    results = []
+    for mode in args.modes:
+        entry = check_budget(await run_mode(mode, args, env, query), budgets.get(mode))
+        results.append(entry)
+        flag = "" if entry["budget"] is None else ("✅" if entry["within_budget"] else "❌ OVER BUDGET")
+        log(
+            f"🚀 {mode:<10} handshake {entry['handshake_ms']:>7.1f} ms  "
+            f"first result {entry['first_result_ms']:>7.1f} ms  (median of {args.repeat})  {flag}"
+        )
+
+    meta = {
+        "size": args.size,
+        "documents": count,
+        "seed": args.seed,
+        "database": str(db_path),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "env": {k: v for k, v in os.environ.items() if k.startswith("MCP_")},
+    }
+    return {"meta": meta, "results": results}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", default="10k", help="Corpus size: 10k, 100k, 1M or a number (default: 10k)")
+    parser.add_argument("--seed", type=int, default=0, help="Corpus and query seed (default: 0)")
+    parser.add_argument("--scratch", default=str(BENCH_DIR / ".scratch"), help="Directory for scratch databases")
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=MODES)
+    parser.add_argument("--repeat", type=int, default=5, help="Server starts per mode (default: 5)")
+    parser.add_argument("--pool-size", type=int, default=2, help="Warm workers kept by the pool (default: 2)")
+    parser.add_argument(
+        "--pool-settle", type=float, default=2.0, help="Seconds for the pool to refill between runs (default: 2)"
+    )
+    parser.add_argument(
+        "--budget", type=_parse_budget, action="append", default=[],
+        help="Override a mode's budget as MODE=HANDSHAKE_MS,FIRST_RESULT_MS (repeatable)",
+    )
+    parser.add_argument("--output", help="Write the JSON report here (default: stdout)")
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args))
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(output + "\n")
+    else:
+        print(output)
+    return 0 if all(entry["within_budget"] for entry in report["results"]) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,305 @@
+#!/usr/bin/env python3
+"""
+Reproducible benchmark suite for the MCP server.
+
+Builds (or reuses) a synthetic corpus in a scratch ChromaDB using a
+deterministic local embedding function, then drives the server's tools over
+the selected transports and reports throughput and p50/p95/p99 latency as
+JSON:
+
+  transports  inproc (FastMCP client in this process), stdio, http
+  scenarios   search          unique queries (cold result cache)
+              search_cached   a few repeated queries (cache hot path)
+              list_collections
+              ingest          add_documents_batch of fresh generated documents
+
+With --baseline, results are compared against an earlier JSON report and the
+script exits with status 1 if any p95 latency or throughput regressed by more
+than --tolerance.
+
+Usage:
+    python benchmarks/bench_suite.py --size 10k --output bench.json
+    python benchmarks/bench_suite.py --size 100k --transports stdio http --concurrency 1 16
+    python benchmarks/bench_suite.py --size 10k --baseline bench.json --tolerance 0.15
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import Any, AsyncIterator
+
+BENCH_DIR = Path(__file__).parent
+sys.path.insert(0, str(BENCH_DIR))
+sys.path.insert(0, str(BENCH_DIR.parent))
+
+import chromadb  # noqa: E402
+from fastmcp import Client  # noqa: E402
+from fastmcp.client.transports import StdioTransport  # noqa: E402
+
+import corpus  # noqa: E402
+import hash_embedding  # noqa: E402,F401  (registers the embedding function)
+
+SERVE_PATH = BENCH_DIR / "serve.py"
+INGEST_PREFIX = "bench_ingest"
+
+TRANSPORTS = ["inproc", "stdio", "http"]
+SCENARIOS = ["search", "search_cached", "list_collections", "ingest"]
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    """Nearest-rank percentile."""
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def summarize(latencies: list[float], elapsed: float, errors: int, items: int | None = None) -> dict[str, Any]:
+    """Latency percentiles (ms) and throughput for one scenario run."""
+    summary = {
+        "requests": len(latencies),
+        "errors": errors,
+        "seconds": round(elapsed, 3),
+        "throughput": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+        "mean_ms": round(sum(latencies) / len(latencies) * 1000, 2),
+        "max_ms": round(max(latencies) * 1000, 2),
+    }
+    if items is not None:
+        summary["items_per_sec"] = round(items / elapsed, 1) if elapsed else 0.0
+    return summary
+
+
+async def _drive(client: Client, calls: list[tuple[str, dict[str, Any]]], concurrency: int) -> tuple[list[float], float, int]:
+    """Run tool calls with a fixed number of concurrent workers."""
+    latencies: list[float] = []
+    errors = 0
+    pending = iter(calls)
+
+    async def worker() -> None:
+        nonlocal errors
+        for name, arguments in pending:
+            start = time.perf_counter()
+            result = await client.call_tool(name, arguments, raise_on_error=False)
+            latencies.append(time.perf_counter() - start)
+            if result.is_error or (result.content and result.content[0].text.startswith("❌")):
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*[worker() for _ in range(concurrency)])
+    return latencies, time.perf_counter() - start, errors
+
+
+def _calls(scenario: str, args: argparse.Namespace, run_id: int, collection: str) -> tuple[list, int | None]:
+    """Tool calls for one scenario run, plus the number of documents they carry."""
+    if scenario == "search":
+        # Distinct queries per run so no run is served from another run's cache
+        queries = corpus.queries(args.requests, seed=args.seed * 1000 + run_id)
+        return [("search_documents", {"query": q, "collection": corpus.COLLECTION}) for q in queries], None
+    if scenario == "search_cached":
+        queries = corpus.queries(5, seed=args.seed)
+        return [
+            ("search_documents", {"query": queries[i % 5], "collection": corpus.COLLECTION})
+            for i in range(args.requests)
+        ], None
+    if scenario == "list_collections":
+        return [("list_collections", {})] * args.requests, None
+    if scenario == "ingest":
+        docs = list(corpus.generate(args.ingest_docs, seed=args.seed, start=10**9 + run_id * args.ingest_docs))
+        batches = [docs[i:i + args.ingest_batch] for i in range(0, len(docs), args.ingest_batch)]
+        return [("add_documents_batch", {"documents": b, "collection": collection}) for b in batches], len(docs)
+    raise ValueError(f"Unknown scenario: {scenario}")
+
+
+@asynccontextmanager
+async def open_client(transport: str, env: dict[str, str], port: int) -> AsyncIterator[Client]:
+    """Connect a FastMCP client to the server over the given transport."""
+    if transport == "inproc":
+        os.environ.update(env)
+        from src.server import mcp
+
+        async with Client(mcp) as client:
+            yield client
+        return
+
+    if transport == "stdio":
+        target = StdioTransport(sys.executable, [str(SERVE_PATH), "--quiet"], env={**os.environ, **env})
+        async with Client(target) as client:
+            yield client
+        return
+
+    url = f"http://127.0.0.1:{port}/mcp"
+    server = subprocess.Popen(
+        [sys.executable, str(SERVE_PATH)],
+        env={**os.environ, **env, "MCP_TRANSPORT": "http", "MCP_PORT": str(port)},
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        deadline = time.monotonic() + 60
+        while True:
+            try:
+                async with Client(url) as client:
+                    await client.ping()
+                    break
+            except Exception:
+                if time.monotonic() > deadline or server.poll() is not None:
+                    raise RuntimeError("HTTP server did not start")
+                await asyncio.sleep(0.25)
+        async with Client(url) as client:
+            yield client
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def _meta(args: argparse.Namespace, count: int, db_path: Path) -> dict[str, Any]:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, cwd=BENCH_DIR
+        ).stdout.strip()
+    except OSError:
+        commit = ""
+    return {
+        "size": args.size,
+        "documents": count,
+        "seed": args.seed,
+        "database": str(db_path),
+        "requests": args.requests,
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "env": {k: v for k, v in os.environ.items() if k.startswith("MCP_")},
+    }
+
+
+def compare(results: list[dict[str, Any]], baseline: dict[str, Any], tolerance: float) -> list[dict[str, Any]]:
+    """
+    Compare runs with matching (transport, scenario, concurrency) in a baseline report.
+
+    A run regresses when its p95 latency grew, or its throughput shrank, by
+    more than tolerance (a fraction).
+    """
+    base = {(r["transport"], r["scenario"], r["concurrency"]): r for r in baseline.get("results", [])}
+    rows = []
+    for run in results:
+        old = base.get((run["transport"], run["scenario"], run["concurrency"]))
+        if old is None:
+            continue
+        p95 = run["p95_ms"] / old["p95_ms"] - 1 if old["p95_ms"] else 0.0
+        throughput = run["throughput"] / old["throughput"] - 1 if old["throughput"] else 0.0
+        rows.append({
+            "transport": run["transport"],
+            "scenario": run["scenario"],
+            "concurrency": run["concurrency"],
+            "p50_change": round(run["p50_ms"] / old["p50_ms"] - 1 if old["p50_ms"] else 0.0, 3),
+            "p95_change": round(p95, 3),
+            "p99_change": round(run["p99_ms"] / old["p99_ms"] - 1 if old["p99_ms"] else 0.0, 3),
+            "throughput_change": round(throughput, 3),
+            "regressed": p95 > tolerance or throughput < -tolerance,
+        })
+    return rows
+
+
+async def run(args: argparse.Namespace) -> dict[str, Any]:
+    count = corpus.parse_size(args.size)
+    db_path = Path(args.scratch) / f"{args.size.lower()}-{args.seed}"
+    log = lambda msg: print(msg, file=sys.stderr)  # noqa: E731  (stdout is reserved for JSON)
+
+    log(f"📦 corpus: {count:,} docs in {db_path}")
+    coll = corpus.build_corpus(db_path, count, seed=args.seed, log=log)
+    # Fresh ingest targets per run, created with the benchmark embedding function
+    client = chromadb.PersistentClient(path=str(db_path))
+    for stale in client.list_collections():
+        if stale.name.startswith(INGEST_PREFIX):
+            client.delete_collection(stale.name)
+    if "ingest" in args.scenarios:
+        for transport in args.transports:
+            for concurrency in args.concurrency:
+                client.create_collection(
+                    f"{INGEST_PREFIX}_{transport}_{concurrency}",
+                    embedding_function=hash_embedding.HashEmbeddingFunction(),
+                )
+    log(f"   ready: {coll.count():,} docs")
+
+    env = {"MCP_CHROMA_PATH": str(db_path)}
+    results = []
+    run_id = 0
+    for transport in args.transports:
+        log(f"🔌 {transport}")
+        async with open_client(transport, env, args.port) as mcp_client:
+            # Warm-up: open the collection and load side structures
+            await _drive(mcp_client, _calls("search", args, -1, "")[0][:5], 1)
+            for scenario in args.scenarios:
+                for concurrency in args.concurrency:
+                    run_id += 1
+                    collection = f"{INGEST_PREFIX}_{transport}_{concurrency}"
+                    calls, items = _calls(scenario, args, run_id, collection)
+                    latencies, elapsed, errors = await _drive(mcp_client, calls, concurrency)
+                    entry = {
+                        "transport": transport,
+                        "scenario": scenario,
+                        "concurrency": concurrency,
+                        **summarize(latencies, elapsed, errors, items),
+                    }
+                    results.append(entry)
+                    log(
+                        f"   {scenario:<17} c={concurrency:<3} {entry['throughput']:>9.1f} req/s  "
+                        f"p50 {entry['p50_ms']:>8.2f}  p95 {entry['p95_ms']:>8.2f}  "
+                        f"p99 {entry['p99_ms']:>8.2f} ms  errors {errors}"
+                    )
+
+    return {"meta": _meta(args, count, db_path), "results": results}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", default="10k", help="Corpus size: 10k, 100k, 1M or a number (default: 10k)")
+    parser.add_argument("--seed", type=int, default=0, help="Corpus and query seed (default: 0)")
+    parser.add_argument("--scratch", default=str(BENCH_DIR / ".scratch"), help="Directory for scratch databases")
+    parser.add_argument("--transports", nargs="+", choices=TRANSPORTS, default=TRANSPORTS)
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=SCENARIOS)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8], help="Concurrent callers per run")
+    parser.add_argument("--requests", type=int, default=200, help="Calls per search/list run")
+    parser.add_argument("--ingest-docs", type=int, default=2000, help="Documents per ingest run")
+    parser.add_argument("--ingest-batch", type=int, default=200, help="Documents per add_documents_batch call")
+    parser.add_argument("--port", type=int, default=8766, help="Port for the spawned HTTP server")
+    parser.add_argument("--output", help="Write the JSON report here (default: stdout)")
+    parser.add_argument("--baseline", help="Earlier JSON report to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="Allowed p95/throughput regression (default: 0.10)")
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args))
+
+    regressed = False
+    if args.baseline:
+        rows = compare(report["results"], json.loads(Path(args.baseline).read_text()), args.tolerance)
+        report["comparison"] = {"baseline": args.baseline, "tolerance": args.tolerance, "runs": rows}
+        print(f"\n📈 vs {args.baseline} (tolerance {args.tolerance:.0%})", file=sys.stderr)
+        for row in rows:
+            flag = "❌ REGRESSED" if row["regressed"] else "✅"
+            print(
+                f"   {row['transport']:<7} {row['scenario']:<17} c={row['concurrency']:<3} "
+                f"p95 {row['p95_change']:+.1%}  throughput {row['throughput_change']:+.1%}  {flag}",
+                file=sys.stderr,
+            )
+        regressed = any(row["regressed"] for row in rows)
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(output + "\n")
+    else:
+        print(output)
+    return 1 if regressed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
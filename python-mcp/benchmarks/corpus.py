@@ -0,0 +1,123 @@
+"""
+Synthetic, reproducible corpora for benchmarks.
+
+Documents are generated from a seeded RNG over a fixed topic vocabulary and
+carry the same metadata keys as seed.py (category, difficulty, type), so
+filters and facets have realistic cardinalities. build_corpus() writes a
+corpus straight into a scratch ChromaDB with the deterministic hash embedding
+and reuses an existing scratch database of the same size and seed.
+"""
+import random
+import time
+from pathlib import Path
+from typing import Any, Iterator
+
+import chromadb
+
+from hash_embedding import HashEmbeddingFunction
+
+COLLECTION = "bench"
+
+TOPICS = {
+    "science": "quantum particle energy cell gene evolution gravity orbit atom experiment theory molecule",
+    "history": "empire ancient war dynasty revolution treaty king archive civilization trade medieval",
+    "cooking": "dough flour yeast oven spice sauce ferment roast recipe knife butter garlic",
+    "technology": "protocol server database network compiler cache latency thread query index cloud",
+    "philosophy": "ethics virtue stoic reason mind truth knowledge being meaning happiness logic",
+    "nature": "forest ocean octopus bee migration species river climate coral predator hive",
+}
+COMMON = "the a of and to in is that it for with as on by this from at which be are".split()
+DIFFICULTIES = ["beginner", "intermediate", "advanced"]
+TYPES = ["article", "guide", "reference", "note"]
+
+SIZES = {"10k": 10_000, "100k": 100_000, "1m": 1_000_000}
+
+
+def parse_size(value: str) -> int:
+    """Parse a corpus size such as 10k, 100k, 1M or 2500."""
+    key = value.lower()
+    if key in SIZES:
+        return SIZES[key]
+    return int(key.replace("_", ""))
+
+
+def generate(count: int, seed: int = 0, start: int = 0, length: int = 60) -> Iterator[dict[str, Any]]:
+    """
+    Yield count synthetic documents as {"id", "content", "metadata"} dicts.
+
+    The same (seed, index) always produces the same document.
+    """
+    categories = list(TOPICS)
+    vocab = {name: words.split() for name, words in TOPICS.items()}
+    for i in range(start, start + count):
+        rng = random.Random(seed * 1_000_003 + i)
+        category = categories[rng.randrange(len(categories))]
+        other = categories[rng.randrange(len(categories))]
+        tokens = [
+            rng.choice(vocab[category]) if r < 0.55 else rng.choice(vocab[other]) if r < 0.7 else rng.choice(COMMON)
+            for r in (rng.random() for _ in range(length))
+        ]
+        yield {
+            "id": f"bench-{i}",
+            "content": f"Document {i} about {category}. " + " ".join(tokens) + ".",
+            "metadata": {
+                "title": f"{category.title()} note {i}",
+                "category": category,
+                "difficulty": DIFFICULTIES[rng.randrange(len(DIFFICULTIES))],
+                "type": TYPES[rng.randrange(len(TYPES))],
+            },
+        }
+
+
+def queries(count: int, seed: int = 0) -> list[str]:
+    """Distinct, reproducible query strings drawn from the corpus vocabulary."""
+    rng = random.Random(seed + 7)
+    categories = list(TOPICS)
+    result = []
+    for i in range(count):
+        words = TOPICS[categories[i % len(categories)]].split()
+        result.append(" ".join(rng.sample(words, 3)) + f" {i}")
+    return result
+
+
+def build_corpus(path: Path, count: int, seed: int = 0, batch_size: int = 5000, log=print) -> Any:
+    """
+    Create (or reuse) a scratch ChromaDB at path holding count generated documents.
+
+    Returns:
+        The benchmark collection
+    """
+    client = chromadb.PersistentClient(path=str(path))
+    coll = client.get_or_create_collection(
+        COLLECTION,
+        embedding_function=HashEmbeddingFunction(),
+        metadata={"bench_seed": seed},
+    )
+    existing = coll.count()
+    if existing >= count:
+        return coll
+
+    batch_size = min(batch_size, client.get_max_batch_size())
+    ef = HashEmbeddingFunction()
+    start = time.perf_counter()
+    docs = []
+    for doc in generate(count - existing, seed=seed, start=existing):
+        docs.append(doc)
+        if len(docs) == batch_size:
+            _write(coll, ef, docs)
+            docs = []
+            done = coll.count()
+            log(f"  corpus: {done:,}/{count:,} docs ({done / (time.perf_counter() - start):,.0f} docs/s)")
+    if docs:
+        _write(coll, ef, docs)
+    return coll
+
+
+def _write(coll: Any, ef: HashEmbeddingFunction, docs: list[dict[str, Any]]) -> None:
+    texts = [d["content"] for d in docs]
+    coll.add(
+        ids=[d["id"] for d in docs],
+        documents=texts,
+        metadatas=[d["metadata"] for d in docs],
+        embeddings=ef(texts),
+    )
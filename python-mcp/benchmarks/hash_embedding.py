@@ -0,0 +1,55 @@
+"""
+Deterministic, dependency-free embedding function for benchmarks.
+
+Feature-hashes word tokens into a fixed number of dimensions (signed, then L2
+normalized), so texts that share words get similar vectors. It needs no model
+download or network, runs fast enough to embed millions of synthetic
+documents, and gives identical vectors on every machine.
+
+Importing this module registers the function with ChromaDB, which is required
+in every process that opens a collection created with it (see serve.py).
+"""
+import hashlib
+import re
+from functools import lru_cache
+
+import numpy as np
+from chromadb.api.types import Documents, EmbeddingFunction, Embeddings
+from chromadb.utils.embedding_functions import register_embedding_function
+
+_TOKEN_RE = re.compile(r"\w+")
+
+
+@lru_cache(maxsize=65536)
+def _bucket(token: str, dim: int) -> tuple[int, float]:
+    digest = int.from_bytes(hashlib.blake2b(token.encode(), digest_size=8).digest(), "little")
+    return digest % dim, 1.0 if digest >> 63 else -1.0
+
+
+@register_embedding_function
+class HashEmbeddingFunction(EmbeddingFunction[Documents]):
+    """Signed feature hashing of lowercase word tokens."""
+
+    def __init__(self, dim: int = 256):
+        self.dim = dim
+
+    def __call__(self, input: Documents) -> Embeddings:
+        vectors = np.zeros((len(input), self.dim), dtype=np.float32)
+        for row, text in enumerate(input):
+            for token in _TOKEN_RE.findall(text.lower()):
+                index, sign = _bucket(token, self.dim)
+                vectors[row, index] += sign
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        vectors /= np.where(norms == 0, 1.0, norms)
+        return list(vectors)
+
+    @staticmethod
+    def name() -> str:
+        return "bench-hash"
+
+    def get_config(self) -> dict:
+        return {"dim": self.dim}
+
+    @staticmethod
+    def build_from_config(config: dict) -> "HashEmbeddingFunction":
+        return HashEmbeddingFunction(dim=config.get("dim", 256))
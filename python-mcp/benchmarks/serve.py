@@ -0,0 +1,29 @@
+#!/usr/bin/env python3
+"""
+Run the MCP server with the benchmark embedding function registered.
+
+Collections in a benchmark scratch database are created with
+HashEmbeddingFunction, so any server process that opens them must import it
+first; it is added to MCP_EMBEDDING_MODULES so the server imports it along
+with chromadb, which keeps fast start intact. Takes the same environment
+variables as src/server.py; --quiet discards the server's stderr (banner and
+logs).
+
+Usage:
+    MCP_CHROMA_PATH=benchmarks/.scratch/10k-0 python benchmarks/serve.py [--quiet]
+"""
+import os
+import runpy
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+os.environ["MCP_EMBEDDING_MODULES"] = ",".join(
+    filter(None, [os.environ.get("MCP_EMBEDDING_MODULES"), "hash_embedding"])
+)
+
+if __name__ == "__main__":
+    if "--quiet" in sys.argv[1:]:
+        sys.argv.remove("--quiet")
+        os.dup2(os.open(os.devnull, os.O_WRONLY), 2)
+    runpy.run_path(str(Path(__file__).parent.parent / "src" / "server.py"), run_name="__main__")
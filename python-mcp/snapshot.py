@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Export collections to snapshot files and restore them, without re-embedding.
+
+A snapshot (src/snapshot.py) holds a collection's ids, documents, metadata
+and stored vectors (float16, int8 or float32) in one checksummed, memory-
+mappable file, together with the collection's distance space and embedding
+function. Restoring it loads the vectors as they are, so moving a collection
+to another environment costs a file copy and a bulk write instead of
+embedding every document again.
+
+Usage:
+    python snapshot.py export articles                       # -> articles.mcpsnap
+    python snapshot.py export articles -o /backups/a.mcpsnap --dtype int8
+    python snapshot.py import /backups/a.mcpsnap             # restores "articles"
+    python snapshot.py import a.mcpsnap --collection articles-v2 --overwrite
+    python snapshot.py info a.mcpsnap --verify
+
+Uses the server's MCP_CHROMA_PATH, MCP_INDEX_PATH and MCP_EMBEDDING_MODULES
+settings. Run it while the server is stopped, or use the export_collection
+and import_collection tools of a running server instead.
+"""
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Callable
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from src.catalog import CollectionCatalog
+from src.lexical import LexicalIndexManager
+from src.snapshot import DTYPES, SUFFIX, SnapshotReader, collection_settings, load_snapshot, write_snapshot
+from src.store import ChromaStore, CollectionNotFoundError
+
+# Same locations as src/server.py
+DB_PATH = Path(os.getenv("MCP_CHROMA_PATH", Path(__file__).parent / "chroma_db"))
+INDEX_PATH = Path(os.getenv("MCP_INDEX_PATH", DB_PATH.parent / f"{DB_PATH.name}_index"))
+EMBEDDING_MODULES = [m.strip() for m in os.getenv("MCP_EMBEDDING_MODULES", "").split(",") if m.strip()]
+
+
+def _progress(verb: str) -> Callable[[int, int], None]:
+    def report(done: int, total: int) -> None:
+        print(f"\r  {verb} {done:,} / {total:,} entries", end="", file=sys.stderr, flush=True)
+    return report
+
+
+def export(args: argparse.Namespace) -> int:
+    store = ChromaStore(DB_PATH, embedding_modules=EMBEDDING_MODULES)
+    try:
+        coll = store.get_collection(args.collection)
+    except CollectionNotFoundError as e:
+        print(f"❌ Collection '{args.collection}' not found.\nAvailable collections: {e.available}", file=sys.stderr)
+        return 1
+    path = Path(args.output or f"{args.collection}{SUFFIX}")
+    try:
+        info = write_snapshot(coll, path, dtype=args.dtype, page_size=args.batch_size, on_progress=_progress("exported"))
+    finally:
+        print(file=sys.stderr)
+    print(f"📦 Exported {info.count:,} entries from '{info.collection}' in {info.seconds:.2f}s")
+    print(f"  • file: {info.path} ({info.size / 1024 / 1024:.1f} MB)")
+    print(f"  • vectors: {info.dtype} × {info.dimension}")
+    print(f"  • sha256: {info.sha256}")
+    return 0
+
+
+def restore(args: argparse.Namespace) -> int:
+    with SnapshotReader(args.snapshot) as reader:
+        if not args.no_verify:
+            reader.verify()
+        target = args.collection or reader.collection
+        store = ChromaStore(DB_PATH, embedding_modules=EMBEDDING_MODULES)
+        if target in store.collection_names():
+            if not args.overwrite:
+                print(f"❌ Collection '{target}' already exists; pass --overwrite to replace it", file=sys.stderr)
+                return 1
+            store.delete_collection(target)
+        # Drop the server's side indexes for the target; it rebuilds them on first use
+        LexicalIndexManager(INDEX_PATH / "lexical").drop(target)
+        catalog = CollectionCatalog(INDEX_PATH / "catalog.json")
+        catalog.drop(target)
+        catalog.flush(force=True)
+
+        start = time.perf_counter()
+        coll = store.create_collection(target, **collection_settings(reader.header))
+        try:
+            count = load_snapshot(
+                reader,
+                coll,
+                batch_size=min(args.batch_size, store.client.get_max_batch_size()),
+                on_progress=_progress("imported"),
+            )
+        finally:
+            print(file=sys.stderr)
+        seconds = time.perf_counter() - start
+
+    print(f"✅ Imported {count:,} entries into '{target}' in {seconds:.2f}s ({count / max(seconds, 1e-9):,.0f} entries/sec)")
+    print(f"📍 Database location: {DB_PATH}")
+    return 0
+
+
+def info(args: argparse.Namespace) -> int:
+    with SnapshotReader(args.snapshot) as reader:
+        if args.verify:
+            reader.verify()
+        summary = reader.info()
+        settings = reader.header.get("configuration") or {}
+    print(f"📦 {summary.path}")
+    print(f"  • collection: {summary.collection}")
+    print(f"  • entries: {summary.count:,}")
+    print(f"  • vectors: {summary.dtype} × {summary.dimension}")
+    print(f"  • space: {(settings.get('hnsw') or {}).get('space', 'l2')}")
+    print(f"  • embedding function: {(settings.get('embedding_function') or {}).get('name', 'default')}")
+    print(f"  • size: {summary.size / 1024 / 1024:.1f} MB")
+    print(f"  • sha256: {summary.sha256}" + (" (verified)" if args.verify else ""))
+    return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    p = commands.add_parser("export", help="Write a collection to a snapshot file")
+    p.add_argument("collection", help="Collection to export")
+    p.add_argument("-o", "--output", help=f"Snapshot file (default: <collection>{SUFFIX})")
+    p.add_argument("--dtype", choices=DTYPES, default="float16", help="Stored vector precision (default: float16)")
+    p.add_argument("--batch-size", type=int, default=1000, help="Entries read per call (default: 1000)")
+    p.set_defaults(run=export)
+
+    p = commands.add_parser("import", help="Restore a collection from a snapshot file")
+    p.add_argument("snapshot", help="Snapshot file")
+    p.add_argument("--collection", help="Target collection (default: the exported collection's name)")
+    p.add_argument("--overwrite", action="store_true", help="Replace the target collection if it exists")
+    p.add_argument("--no-verify", action="store_true", help="Skip the checksum check")
+    p.add_argument("--batch-size", type=int, default=5000, help="Entries written per call, up to ChromaDB's maximum (default: 5000)")
+    p.set_defaults(run=restore)
+
+    p = commands.add_parser("info", help="Describe a snapshot file")
+    p.add_argument("snapshot", help="Snapshot file")
+    p.add_argument("--verify", action="store_true", help="Also check the checksum")
+    p.set_defaults(run=info)
+
+    args = parser.parse_args()
+    try:
+        return args.run(args)
+    except KeyboardInterrupt:
+        print("⏸️  Interrupted.", file=sys.stderr)
+        return 130
+    except ValueError as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,206 @@
+"""
+Pool of warm MCP client connections for the synchronous ADK tool layer.
+
+The pool owns a dedicated event loop running in a background thread. It keeps
+N connected FastMCP clients (stdio subprocesses or HTTP sessions) on that loop
+and lets any thread call tools synchronously; calls are spread over the
+least-busy connection. A health check pings idle connections and reconnects
+broken ones, and close() shuts everything down on the loop that owns it.
+"""
+import asyncio
+import threading
+from concurrent.futures import Future
+from typing import Any
+
+import anyio
+from fastmcp import Client  # type: ignore
+
+# Errors that mean the transport itself is gone, not that the tool failed.
+# Only these are retried: anything else may have reached the server, and
+# running a write such as add_document twice would apply it twice
+_CONNECTION_ERRORS = (
+    ConnectionError,
+    EOFError,
+    anyio.ClosedResourceError,
+    anyio.BrokenResourceError,
+    anyio.EndOfStream,
+)
+
+
+class _Connection:
+    """One connected client plus the number of calls in flight on it."""
+
+    def __init__(self, target: Any):
+        self.target = target
+        self.client: Client | None = None
+        self.in_flight = 0
+
+    async def connect(self) -> None:
+        self.client = Client(self.target() if callable(self.target) else self.target)
+        await self.client.__aenter__()
+
+    async def disconnect(self) -> None:
+        client, self.client = self.client, None
+        if client is not None:
+            try:
+                await client.__aexit__(None, None, None)
+            except Exception:
+                pass
+
+    async def reconnect(self) -> None:
+        await self.disconnect()
+        await self.connect()
+
+    @property
+    def connected(self) -> bool:
+        return self.client is not None and self.client.is_connected()
+
+
+class MCPClientPool:
+    """
+    Warm, thread-safe MCP client connections driven by a background event loop.
+
+    Args:
+        target: Server script path or HTTP URL passed to fastmcp.Client, or a
+            callable returning a fresh target per connection (transports can't be shared)
+        size: Number of connections kept open
+        health_interval: Seconds between health checks (0 disables them)
+        call_timeout: Seconds before a tool call is abandoned
+    """
+
+    def __init__(
+        self,
+        target: Any,
+        size: int = 2,
+        health_interval: float = 30.0,
+        call_timeout: float = 120.0,
+    ):
+        self.target = target
+        self.size = size
+        self.health_interval = health_interval
+        self.call_timeout = call_timeout
+        self._connections = [_Connection(target) for _ in range(size)]
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._thread: threading.Thread | None = None
+        self._health_task: asyncio.Task | None = None
+        self._lock = threading.RLock()
+        self._started = False
+        self.reconnects = 0
+
+    def start(self) -> None:
+        """Start the background loop and open every connection (idempotent)."""
+        with self._lock:
+            if self._started:
+                return
+            ready = threading.Event()
+            self._loop = asyncio.new_event_loop()
+            self._thread = threading.Thread(
+                target=self._run_loop, args=(ready,), name="mcp-client-pool", daemon=True
+            )
+            self._thread.start()
+            ready.wait()
+
+            try:
+                self._submit(self._open()).result(timeout=self.call_timeout)
+            except Exception:
+                self.close()
+                raise
+            self._started = True
+
+    def _run_loop(self, ready: threading.Event) -> None:
+        asyncio.set_event_loop(self._loop)
+        self._loop.call_soon(ready.set)
+        self._loop.run_forever()
+
+    def _submit(self, coro: Any) -> Future:
+        return asyncio.run_coroutine_threadsafe(coro, self._loop)
+
+    async def _open(self) -> None:
+        # The first server initializes the database alone; the rest start in
+        # parallel and, if one fails, it is reconnected on first use
+        first, *rest = self._connections
+        await first.connect()
+        await asyncio.gather(*[conn.connect() for conn in rest], return_exceptions=True)
+        if self.health_interval > 0:
+            self._health_task = asyncio.ensure_future(self._health_loop())
+
+    async def _health_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.health_interval)
+            for conn in self._connections:
+                if conn.in_flight:
+                    continue  # busy connections are evidently alive
+                try:
+                    if not conn.connected:
+                        raise ConnectionError("disconnected")
+                    await asyncio.wait_for(conn.client.ping(), timeout=5.0)
+                except Exception:
+                    await self._reconnect(conn)
+
+    async def _reconnect(self, conn: _Connection) -> None:
+        self.reconnects += 1
+        try:
+            await conn.reconnect()
+        except Exception:
+            pass  # retried by the next health check or call
+
+    async def _call(self, name: str, arguments: dict[str, Any]) -> Any:
+        conn = min(self._connections, key=lambda c: c.in_flight)
+        conn.in_flight += 1
+        try:
+            if not conn.connected:
+                await self._reconnect(conn)
+            try:
+                return await conn.client.call_tool(name, arguments)
+            except _CONNECTION_ERRORS:
+                # The server went away under us: reconnect and retry once
+                await self._reconnect(conn)
+                return await conn.client.call_tool(name, arguments)
+        finally:
+            conn.in_flight -= 1
+
+    def call_tool(self, name: str, arguments: dict[str, Any]) -> Any:
+        """Call an MCP tool from any thread and block until it returns."""
+        if not self._started:
+            self.start()
+        return self._submit(self._call(name, arguments)).result(timeout=self.call_timeout)
+
+    async def call_tool_async(self, name: str, arguments: dict[str, Any]) -> Any:
+        """Call an MCP tool from another event loop without blocking it."""
+        if not self._started:
+            await asyncio.to_thread(self.start)
+        return await asyncio.wrap_future(self._submit(self._call(name, arguments)))
+
+    def close(self) -> None:
+        """Disconnect every client and stop the background loop."""
+        with self._lock:
+            loop, thread = self._loop, self._thread
+            if loop is None or thread is None:
+                return
+
+            async def _shutdown() -> None:
+                if self._health_task is not None:
+                    self._health_task.cancel()
+                await asyncio.gather(*[conn.disconnect() for conn in self._connections])
+
+            try:
+                asyncio.run_coroutine_threadsafe(_shutdown(), loop).result(timeout=10.0)
+            except Exception:
+                pass
+            loop.call_soon_threadsafe(loop.stop)
+            thread.join(timeout=10.0)
+            loop.close()
+            self._loop = None
+            self._thread = None
+            self._health_task = None
+            self._started = False
+
+    def stats(self) -> dict[str, Any]:
+        """Return connection state and in-flight counts."""
+        return {
+            "target": getattr(self.target, "__name__", str(self.target)),
+            "size": self.size,
+            "connected": sum(1 for c in self._connections if c.connected),
+            "in_flight": [c.in_flight for c in self._connections],
+            "reconnects": self.reconnects,
+        }
@@ -4,44 +4,57 @@ Tools that connect to the MCP server for ChromaDB operations.
 This module wraps the MCP server's tools so they can be used by the ADK agent.
 """
 import asyncio
+import atexit
 import os
+import sys
 from typing import Any
-from fastmcp import Client  # type: ignore
+
+from fastmcp.client.transports import StdioTransport
+
+from ..metrics import Metrics
+from .pool import MCPClientPool
 
 
 # Path to the MCP server script (relative to this file)
 MCP_SERVER_PATH = os.path.join(os.path.dirname(__file__), "..", "server.py")
 
-# Global client instance (initialized lazily)
-_mcp_client = None
-_client_context = None
+# Connect to a running HTTP server instead of spawning stdio subprocesses
+MCP_SERVER_URL = os.getenv("MCP_SERVER_URL")
 
+# Attach to pre-forked warm servers (server.py with MCP_TRANSPORT=warm-pool)
+# listening on this socket instead of starting a server per connection
+MCP_WARM_POOL_SOCKET = os.getenv("MCP_WARM_POOL_SOCKET")
+MCP_ATTACH_PATH = os.path.join(os.path.dirname(__file__), "..", "attach.py")
 
-async def _get_mcp_client():
-    """Get or create the MCP client instance."""
-    global _mcp_client, _client_context
-    
-    if _mcp_client is None:
-        _client_context = Client(MCP_SERVER_PATH)
-        _mcp_client = await _client_context.__aenter__()
-    
-    return _mcp_client
+# Number of warm server connections shared by all tool calls
+MCP_CLIENT_POOL_SIZE = int(os.getenv("MCP_CLIENT_POOL_SIZE", "2"))
 
+# Round-trip timing per tool call, as seen by the agent (MCP_METRICS=0 disables)
+_metrics = Metrics(enabled=os.getenv("MCP_METRICS", "1") != "0")
+
+
+def warm_pool_transport() -> StdioTransport:
+    """Stdio transport running the attach shim (-S: it needs no site-packages)."""
+    return StdioTransport(sys.executable, ["-S", MCP_ATTACH_PATH, MCP_WARM_POOL_SOCKET])
+
+
+# Global pool (connections are opened on the first tool call)
+_pool = MCPClientPool(
+    MCP_SERVER_URL or (warm_pool_transport if MCP_WARM_POOL_SOCKET else MCP_SERVER_PATH),
+    size=MCP_CLIENT_POOL_SIZE,
+)
+atexit.register(_pool.close)
 
-def _run_async(coro: Any) -> Any:
-    """Helper to run async functions synchronously."""
-    try:
-        loop = asyncio.get_event_loop()
-        if loop.is_running():
-            # If we're already in an async context
-            import nest_asyncio  # type: ignore
-            nest_asyncio.apply()
-            return loop.run_until_complete(coro)
-        else:
-            return loop.run_until_complete(coro)
-    except RuntimeError:
-        # No event loop exists, create a new one
-        return asyncio.run(coro)
+
+def _call_tool(name: str, arguments: dict[str, Any]) -> Any:
+    """Call an MCP server tool synchronously through the connection pool."""
+    with _metrics.span(f"roundtrip.{name}"):
+        return _pool.call_tool(name, arguments)
+
+
+def client_metrics() -> dict[str, Any]:
+    """Round-trip latency per tool and connection-pool state for this process."""
+    return {**_metrics.snapshot(), "pool": _pool.stats()}
 
 
 def search_documents(query: str, n_results: int = 5, collection: str = "documents") -> dict[str, Any]:
@@ -54,28 +67,25 @@ def search_documents(query: str, n_results: int = 5, collection: str = "document
         collection (str): Collection name (default: "documents").
 
     Returns:
-        dict: status with found documents and their content, or error msg.
+        dict: status with a list of hits (id, score, snippet, metadata), or error msg.
     """
-    async def _search():
-        client = await _get_mcp_client()
-        result = await client.call_tool("search_documents", {
+    try:
+        result = _call_tool("search_documents", {
             "query": query,
             "max_results": n_results,
-            "collection": collection
+            "collection": collection,
+            "response_format": "json"
         })
         
-        # Parse the MCP server's formatted response
-        response_text = result.content[0].text
+        # Errors come back as plain text; hits come back as structured records
+        if result.structured_content is None:
+            return {"status": "error", "error_message": result.content[0].text}
         
-        # Return a structured response
         return {
             "status": "success",
-            "message": f"Search completed for query: '{query}'",
-            "results": response_text
+            "query": query,
+            "results": result.structured_content["results"]
         }
-    
-    try:
-        return _run_async(_search())
     except Exception as e:
         return {
             "status": "error",
@@ -83,6 +93,41 @@ def search_documents(query: str, n_results: int = 5, collection: str = "document
         }
 
 
+def add_document(
+    content: str,
+    document_name: str,
+    source: str | None = None,
+    collection: str = "documents",
+) -> dict[str, Any]:
+    """
+    Adds a document to the search index via the MCP server.
+
+    Args:
+        content (str): The document text.
+        document_name (str): A title for the document.
+        source (str, optional): Where the document came from (URL, file path, ...).
+        collection (str): Collection name (default: "documents").
+
+    Returns:
+        dict: status with the stored document ID, or error msg.
+    """
+    args = {"content": content, "document_name": document_name, "collection": collection}
+    if source:
+        args["source"] = source
+    
+    try:
+        result = _call_tool("add_document", args)
+        text = result.content[0].text if result.content else ""
+        
+        # The server reports failures as text starting with ❌
+        if result.is_error or text.startswith("❌"):
+            return {"status": "error", "error_message": text}
+        
+        return {"status": "success", "message": text}
+    except Exception as e:
+        return {"status": "error", "error_message": f"Failed to add document: {str(e)}"}
+
+
 def list_collections() -> dict[str, Any]:
     """
     Lists all available document collections via the MCP server.
@@ -90,26 +135,17 @@ def list_collections() -> dict[str, Any]:
     Returns:
         dict: status with collection names and counts.
     """
-    async def _list():
-        client = await _get_mcp_client()
-        result = await client.call_tool("list_collections", {})
-        return {"status": "success", "collections": result.content[0].text}
-    
     try:
-        return _run_async(_list())
+        result = _call_tool("list_collections", {})
+        text = result.content[0].text if result.content else ""
+        if result.is_error or text.startswith("❌"):
+            return {"status": "error", "error_message": text}
+        return {"status": "success", "collections": text}
     except Exception as e:
         return {"status": "error", "error_message": f"Failed to list collections: {str(e)}"}
 
 
 async def cleanup_mcp_client() -> None:
-    """Clean up the MCP client connection. Call this when shutting down."""
-    global _mcp_client, _client_context
-    
-    if _client_context is not None:
-        try:
-            await _client_context.__aexit__(None, None, None)
-        except Exception:
-            pass
-        _mcp_client = None
-        _client_context = None
-
+    """Clean up the MCP client connections. Call this when shutting down."""
+    # close() blocks until the pool's own loop has disconnected every client
+    await asyncio.to_thread(_pool.close)
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Attach this process's stdin/stdout to a warm server from the pool.
+
+Used as the stdio server command by MCP clients when a warm pool is running
+(MCP_TRANSPORT=warm-pool, see warm_pool.py): it connects to the pool's Unix
+socket and relays bytes both ways, so the client talks to an already warm
+server. Only the standard library is imported, keeping the attach itself to
+a few tens of milliseconds. If no pool is listening, the process is replaced
+by a regular stdio server.
+
+Usage:
+    python src/attach.py <socket>
+"""
+import os
+import socket
+import sys
+import threading
+from pathlib import Path
+
+SERVER_PATH = Path(__file__).resolve().parent / "server.py"
+
+_CHUNK = 65536
+
+
+def _pump_stdin(sock: socket.socket) -> None:
+    while True:
+        data = os.read(0, _CHUNK)
+        if not data:
+            break
+        sock.sendall(data)
+    try:
+        sock.shutdown(socket.SHUT_WR)
+    except OSError:
+        pass
+
+
+def main() -> None:
+    if len(sys.argv) != 2:
+        sys.exit(__doc__)
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(sys.argv[1])
+    except OSError:
+        env = {k: v for k, v in os.environ.items() if k != "MCP_TRANSPORT"}
+        os.execve(sys.executable, [sys.executable, str(SERVER_PATH)], env)
+
+    threading.Thread(target=_pump_stdin, args=(sock,), daemon=True).start()
+    while True:
+        data = sock.recv(_CHUNK)
+        if not data:
+            break
+        view = memoryview(data)
+        while view:
+            view = view[os.write(1, view):]
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+"""
+Micro-batching for semantic search queries.
+
+Single-query searches that arrive within a few milliseconds of each other are
+merged into one vectorized ChromaDB query per collection, so the embedding
+model and the HNSW index are hit once per batch instead of once per call.
+"""
+import asyncio
+from typing import Any, Callable
+
+
+# (collection, queries, n_results) -> ChromaDB QueryResult
+BatchRunner = Callable[[str, list[str], int], dict[str, Any]]
+
+
+def split_query_result(results: dict[str, Any], index: int, n_results: int) -> dict[str, list]:
+    """
+    Extract one query's hits from a batched ChromaDB QueryResult.
+
+    Args:
+        results: The QueryResult returned for the whole batch
+        index: Position of the query in the batch
+        n_results: Number of hits the caller asked for
+
+    Returns:
+        Dict with "ids", "documents", "metadatas" and "distances" lists
+    """
+    single = {}
+    for key in ("ids", "documents", "metadatas", "distances"):
+        rows = results.get(key)
+        single[key] = list(rows[index][:n_results]) if rows else []
+    return single
+
+
+def run_grouped(
+    runner: BatchRunner,
+    requests: list[tuple[str, str, int]],
+) -> list[dict[str, list] | Exception]:
+    """
+    Run many (collection, query, n_results) requests with one query per collection.
+
+    Identical queries against the same collection are embedded only once.
+
+    Returns:
+        One result dict (or the exception raised for its collection) per request,
+        in the same order as the input
+    """
+    groups: dict[str, list[int]] = {}
+    for i, (collection, _, _) in enumerate(requests):
+        groups.setdefault(collection, []).append(i)
+
+    out: list[Any] = [None] * len(requests)
+    for collection, indices in groups.items():
+        unique = list(dict.fromkeys(requests[i][1] for i in indices))
+        n_results = max(requests[i][2] for i in indices)
+        try:
+            results = runner(collection, unique, n_results)
+        except Exception as e:
+            for i in indices:
+                out[i] = e
+            continue
+        for i in indices:
+            _, query, n = requests[i]
+            out[i] = split_query_result(results, unique.index(query), n)
+    return out
+
+
+class QueryBatcher:
+    """
+    Coalesces concurrent single-query searches into per-collection batches.
+
+    When the collection is idle a query is flushed on the next event-loop
+    tick, so an isolated call pays no extra latency. While a batch for the
+    same collection is already running, new queries wait up to `window`
+    seconds to be merged into the next batch.
+
+    Args:
+        runner: Blocking function that executes one batched query
+        window: Seconds to wait for more queries while a batch is in flight
+        max_batch: Flush immediately once this many queries are pending
+        executor: BoundedExecutor used to run batches; a default thread if None
+    """
+
+    def __init__(
+        self,
+        runner: BatchRunner,
+        window: float = 0.005,
+        max_batch: int = 64,
+        executor: Any = None,
+    ):
+        self.runner = runner
+        self.executor = executor
+        self.window = window
+        self.max_batch = max_batch
+        self._pending: dict[str, list[tuple[str, int, asyncio.Future]]] = {}
+        self._timers: dict[str, asyncio.TimerHandle] = {}
+        self._inflight: dict[str, int] = {}
+        self.batches = 0
+        self.queries = 0
+
+    async def submit(self, collection: str, query: str, n_results: int) -> dict[str, list]:
+        """Queue a query and wait for its share of the batched result."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        pending = self._pending.setdefault(collection, [])
+        pending.append((query, n_results, future))
+
+        if len(pending) >= self.max_batch:
+            self._flush(collection)
+        elif collection not in self._timers:
+            delay = self.window if self._inflight.get(collection) else 0
+            self._timers[collection] = loop.call_later(delay, self._flush, collection)
+
+        return await future
+
+    def _flush(self, collection: str) -> None:
+        timer = self._timers.pop(collection, None)
+        if timer is not None:
+            timer.cancel()
+        pending = self._pending.pop(collection, [])
+        if pending:
+            asyncio.ensure_future(self._run(collection, pending))
+
+    async def _run(self, collection: str, pending: list[tuple[str, int, asyncio.Future]]) -> None:
+        self.batches += 1
+        self.queries += len(pending)
+        self._inflight[collection] = self._inflight.get(collection, 0) + 1
+        requests = [(collection, query, n) for query, n, _ in pending]
+        try:
+            if self.executor is not None:
+                results = await self.executor.run(run_grouped, self.runner, requests, collection=collection)
+            else:
+                results = await asyncio.to_thread(run_grouped, self.runner, requests)
+        except Exception as e:
+            results = [e] * len(pending)
+        finally:
+            self._inflight[collection] -= 1
+
+        for (_, _, future), result in zip(pending, results):
+            if future.done():
+                continue
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+    def stats(self) -> dict[str, Any]:
+        """Return how many queries were merged into how many batches."""
+        return {
+            "batches": self.batches,
+            "queries": self.queries,
+            "avg_batch_size": round(self.queries / self.batches, 2) if self.batches else 0.0,
+        }
@@ -0,0 +1,150 @@
+"""
+Small thread-safe caching primitives shared by the server.
+
+The MCP server keeps several kinds of short-lived state (collection handles,
+embeddings, search results). They all use the same bounded LRU cache so
+eviction and hit-rate reporting behave the same everywhere.
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable
+
+
+_MISSING = object()
+
+
+class LRUCache:
+    """
+    Bounded least-recently-used cache with an optional time-to-live.
+
+    Args:
+        max_size: Maximum number of entries kept before the oldest is evicted
+        ttl: Seconds an entry stays valid, or None to never expire
+        max_bytes: Optional memory budget; requires sizeof
+        sizeof: Returns the approximate size in bytes of a cached value
+    """
+
+    def __init__(
+        self,
+        max_size: int = 128,
+        ttl: float | None = None,
+        max_bytes: int | None = None,
+        sizeof: Callable[[Any], int] | None = None,
+    ):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+        self.nbytes = 0
+        self._data: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._sizes: dict[Hashable, int] = {}
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return the cached value for key, or default if missing or expired."""
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is _MISSING:
+                self.misses += 1
+                return default
+
+            stored_at, value = entry
+            if self.ttl is not None and time.monotonic() - stored_at > self.ttl:
+                self._remove(key)
+                self.misses += 1
+                return default
+
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        """Store value under key, evicting least recently used entries while over budget."""
+        with self._lock:
+            self._remove(key)
+            self._data[key] = (time.monotonic(), value)
+            if self.sizeof is not None:
+                size = self.sizeof(value)
+                self._sizes[key] = size
+                self.nbytes += size
+            while self._data and (
+                len(self._data) > self.max_size
+                or (self.max_bytes is not None and self.nbytes > self.max_bytes)
+            ):
+                self._remove(next(iter(self._data)))
+                self.evictions += 1
+
+    def touch(self, key: Hashable) -> None:
+        """Mark key as recently used without counting a lookup."""
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+
+    def _remove(self, key: Hashable) -> None:
+        if self._data.pop(key, _MISSING) is not _MISSING:
+            self.nbytes -= self._sizes.pop(key, 0)
+
+    def get_or_create(self, key: Hashable, factory: Callable[[], Any]) -> Any:
+        """Return the cached value for key, building and storing it on a miss."""
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = factory()
+            self.put(key, value)
+        return value
+
+    def invalidate(self, key: Hashable) -> None:
+        """Drop a single entry if present."""
+        with self._lock:
+            self._remove(key)
+
+    def invalidate_where(self, predicate: Callable[[Hashable], bool]) -> int:
+        """Drop every entry whose key matches predicate. Returns how many were dropped."""
+        with self._lock:
+            keys = [k for k in self._data if predicate(k)]
+            for key in keys:
+                self._remove(key)
+            return len(keys)
+
+    def items(self) -> list[tuple[Hashable, Any]]:
+        """Snapshot of live (key, value) pairs without touching recency or counters."""
+        with self._lock:
+            now = time.monotonic()
+            return [
+                (k, v) for k, (stored_at, v) in self._data.items()
+                if self.ttl is None or now - stored_at <= self.ttl
+            ]
+
+    def clear(self) -> None:
+        """Drop every entry. Counters are kept."""
+        with self._lock:
+            self._data.clear()
+            self._sizes.clear()
+            self.nbytes = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    @property
+    def hit_rate(self) -> float:
+        """Fraction of lookups served from the cache."""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def stats(self) -> dict[str, Any]:
+        """Return a snapshot of size and hit/miss counters."""
+        with self._lock:
+            return {
+                "size": len(self._data),
+                "max_size": self.max_size,
+                "bytes": self.nbytes,
+                "max_bytes": self.max_bytes,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hit_rate, 4),
+            }
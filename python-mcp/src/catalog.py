@@ -0,0 +1,289 @@
+"""
+Persistent statistics catalog for collections.
+
+Keeps, per collection, the number of stored entries and logical documents,
+the total size of stored text, the embedding dimension, the time of the last
+write and the number of distinct values per metadata key. The server updates
+an entry on every write it performs, so listing collections is answered from
+memory instead of one count() round-trip per collection. The catalog is saved
+as JSON next to the other server-side indexes. Writes made by other processes
+are picked up by reconcile(), which rescans collections whose entry count no
+longer matches (or every collection, when asked to).
+"""
+import json
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Iterable
+
+from .metadata_index import typed_value
+from .store import iter_pages
+
+
+@dataclass
+class CollectionStats:
+    """Statistics of one collection."""
+
+    name: str
+    entries: int = 0  # stored units; a chunked document has one per chunk
+    documents: int = 0
+    bytes: int = 0  # UTF-8 size of the stored document text
+    dimension: int | None = None
+    modified: float | None = None  # epoch seconds of the last write seen
+    values: dict[str, Counter] = field(default_factory=dict)  # counts per typed_value(value)
+    high_cardinality: set[str] = field(default_factory=set)
+
+    def cardinalities(self) -> dict[str, int | None]:
+        """Distinct values per metadata key; None for keys with too many to track."""
+        keys = {key: len(counts) for key, counts in sorted(self.values.items())}
+        keys.update({key: None for key in sorted(self.high_cardinality)})
+        return keys
+
+    def summary(self) -> dict[str, Any]:
+        return {
+            "name": self.name,
+            "documents": self.documents,
+            "entries": self.entries,
+            "bytes": self.bytes,
+            "dimension": self.dimension,
+            "modified": self.modified,
+            "metadata_keys": self.cardinalities(),
+        }
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "entries": self.entries,
+            "documents": self.documents,
+            "bytes": self.bytes,
+            "dimension": self.dimension,
+            "modified": self.modified,
+            "values": {key: list(counts.items()) for key, counts in self.values.items()},
+            "high_cardinality": sorted(self.high_cardinality),
+        }
+
+    @classmethod
+    def from_dict(cls, name: str, data: dict[str, Any]) -> "CollectionStats":
+        return cls(
+            name=name,
+            entries=data["entries"],
+            documents=data["documents"],
+            bytes=data["bytes"],
+            dimension=data.get("dimension"),
+            modified=data.get("modified"),
+            values={
+                key: Counter({_value_key(v): n for v, n in pairs}) for key, pairs in data["values"].items()
+            },
+            high_cardinality=set(data.get("high_cardinality", [])),
+        )
+
+
+class CollectionCatalog:
+    """
+    Write-maintained statistics for every collection, persisted to a JSON file.
+
+    Args:
+        path: JSON file holding the catalog
+        max_values: Distinct values tracked per metadata key before the key is
+            reported as high-cardinality
+        exclude: Metadata keys not tracked (bookkeeping fields)
+        is_document: Whether a stored entry's metadata marks it as the start of a
+            logical document (e.g. not a second chunk); every entry counts if None
+        save_interval: Minimum seconds between saves of a changed catalog
+        read_only: Never write the catalog file (e.g. a cluster reader serving a
+            published version shared with other readers)
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        max_values: int = 1000,
+        exclude: Iterable[str] = (),
+        is_document: Callable[[dict[str, Any]], bool] | None = None,
+        save_interval: float = 2.0,
+        read_only: bool = False,
+    ):
+        self.path = Path(path)
+        self.read_only = read_only
+        self.max_values = max_values
+        self.exclude = frozenset(exclude)
+        self.is_document = is_document or (lambda meta: True)
+        self.save_interval = save_interval
+        self.reconciled = False
+        self._entries: dict[str, CollectionStats] | None = None
+        self._dirty = False
+        self._last_save = 0.0
+        self._lock = threading.RLock()
+
+    @property
+    def entries(self) -> dict[str, CollectionStats]:
+        """Entries by collection name, loaded from disk on first use."""
+        if self._entries is None:
+            with self._lock:
+                if self._entries is None:
+                    self._entries = self._load()
+        return self._entries
+
+    def _load(self) -> dict[str, CollectionStats]:
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+            return {name: CollectionStats.from_dict(name, entry) for name, entry in data["collections"].items()}
+        except (OSError, ValueError, KeyError, TypeError):
+            return {}
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.entries
+
+    def get(self, name: str) -> CollectionStats | None:
+        return self.entries.get(name)
+
+    def all(self) -> list[CollectionStats]:
+        """Every catalogued collection, by name."""
+        return [self.entries[name] for name in sorted(self.entries)]
+
+    def ensure(self, name: str, coll: Any) -> CollectionStats:
+        """Return a collection's entry, scanning the collection if it has none yet."""
+        stats = self.entries.get(name)
+        if stats is None:
+            stats = self.scan(name, coll)
+        return stats
+
+    def scan(self, name: str, coll: Any, page_size: int = 1000) -> CollectionStats:
+        """Rebuild a collection's entry from its stored documents."""
+        previous = self.entries.get(name)
+        stats = CollectionStats(name=name, modified=previous.modified if previous else None)
+        for page in iter_pages(coll, ["documents", "metadatas"], page_size):
+            self._apply(stats, page["documents"] or [], page["metadatas"] or [], 1)
+        if stats.entries:
+            stats.dimension = _dimension(coll)
+        with self._lock:
+            self.entries[name] = stats
+            self._dirty = True
+        return stats
+
+    def add(self, name: str, texts: list[str], metadatas: list[dict[str, Any]]) -> None:
+        """Account for stored entries written to a catalogued collection."""
+        self._update(name, texts, metadatas, 1)
+
+    def remove(self, name: str, texts: list[str], metadatas: list[dict[str, Any]]) -> None:
+        """Account for stored entries deleted or about to be overwritten."""
+        self._update(name, texts, metadatas, -1)
+
+    def _update(self, name: str, texts: list[str], metadatas: list[dict[str, Any]], sign: int) -> None:
+        with self._lock:
+            stats = self.entries.get(name)
+            if stats is None:
+                return  # scanned in full when first needed
+            self._apply(stats, texts, metadatas, sign)
+            self._dirty = True
+
+    def _apply(self, stats: CollectionStats, texts: list[str], metadatas: list[dict[str, Any]], sign: int) -> None:
+        for text, meta in zip(texts, metadatas or [{}] * len(texts)):
+            meta = meta or {}
+            stats.entries += sign
+            stats.bytes += sign * len((text or "").encode("utf-8"))
+            if self.is_document(meta):
+                stats.documents += sign
+            for key, value in meta.items():
+                if key in self.exclude or key in stats.high_cardinality:
+                    continue
+                counts = stats.values.setdefault(key, Counter())
+                typed = typed_value(value)  # True and 1 are distinct values
+                counts[typed] += sign
+                if counts[typed] <= 0:
+                    del counts[typed]
+                    if not counts:
+                        del stats.values[key]
+                elif len(counts) > self.max_values:
+                    stats.high_cardinality.add(key)
+                    del stats.values[key]
+
+    def touch(self, name: str, coll: Any = None) -> None:
+        """Record a write to a catalogued collection; fills in its dimension if unknown."""
+        stats = self.entries.get(name)
+        if stats is None:
+            return
+        if stats.dimension is None and coll is not None and stats.entries:
+            stats.dimension = _dimension(coll)
+        with self._lock:
+            stats.modified = time.time()
+            self._dirty = True
+
+    def drop(self, name: str) -> None:
+        """Forget a collection."""
+        with self._lock:
+            if self.entries.pop(name, None) is not None:
+                self._dirty = True
+
+    def reconcile(self, collections: list[Any], full: bool = False) -> None:
+        """
+        Bring the catalog in line with the database.
+
+        Collections that no longer exist are dropped. New collections, and ones
+        whose entry count differs from the catalog (written by another process),
+        are rescanned; with full=True every collection is rescanned.
+
+        Args:
+            collections: Every collection in the database
+            full: Rescan all collections, not just the ones that look stale
+        """
+        present = {coll.name for coll in collections}
+        for name in list(self.entries):
+            if name not in present:
+                self.drop(name)
+        for coll in collections:
+            stats = self.entries.get(coll.name)
+            if full or stats is None or stats.entries != coll.count():
+                self.scan(coll.name, coll)
+        self.reconciled = True
+        self.flush(force=True)
+
+    def reload(self, path: Path) -> None:
+        """Switch to another catalog file, loaded on next use."""
+        with self._lock:
+            self.path = Path(path)
+            self._entries = None
+            self._dirty = False
+            self.reconciled = False
+
+    def flush(self, force: bool = False) -> None:
+        """Save the catalog if it changed, at most once per save_interval unless forced."""
+        if not self._dirty or self._entries is None:
+            return
+        now = time.monotonic()
+        if not force and now - self._last_save < self.save_interval:
+            return
+        with self._lock:
+            data = {"collections": {name: stats.to_dict() for name, stats in self._entries.items()}}
+            self._dirty = False
+            self._last_save = now
+        if self.read_only:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".json.tmp")
+        tmp.write_text(json.dumps(data, separators=(",", ":"), default=str), encoding="utf-8")
+        tmp.replace(self.path)
+
+    def stats(self) -> dict[str, Any]:
+        """Return catalog size and persistence state."""
+        return {
+            "collections": len(self.entries),
+            "reconciled": self.reconciled,
+            "dirty": self._dirty,
+            "path": str(self.path),
+        }
+
+
+def _value_key(saved: Any) -> tuple[str, Any]:
+    """Counter key of a saved value; JSON turns the (kind, value) tuple into a list."""
+    return tuple(saved) if isinstance(saved, list) else typed_value(saved)
+
+
+def _dimension(coll: Any) -> int | None:
+    """Embedding dimension of a collection, read from one stored vector."""
+    got = coll.get(limit=1, include=["embeddings"])
+    embeddings = got.get("embeddings")
+    if embeddings is None or len(embeddings) == 0:
+        return None
+    return len(embeddings[0])
@@ -0,0 +1,186 @@
+"""
+Document chunking and parent-document reconstruction.
+
+Long documents are split at ingestion time into overlapping, token-bounded
+windows that are embedded and stored separately, so each vector covers a
+focused span instead of a whole diluted document. Chunks carry their parent's
+id and character offsets in metadata; search hits are collapsed back to one
+record per parent (keeping its best span), and the full text can be stitched
+back together from the chunks.
+
+Tokens are approximated with a word/punctuation split, which tracks subword
+tokenizer counts closely enough for sizing windows without a model-specific
+tokenizer.
+"""
+import re
+from typing import Any, Iterable, NamedTuple
+
+from .ingest import HASH_KEY, content_hash
+
+PARENT_KEY = "parent_id"
+INDEX_KEY = "chunk_index"
+COUNT_KEY = "chunk_count"
+START_KEY = "chunk_start"
+END_KEY = "chunk_end"
+
+# Bookkeeping keys added to every chunk's metadata
+CHUNK_KEYS = frozenset({PARENT_KEY, INDEX_KEY, COUNT_KEY, START_KEY, END_KEY})
+
+_TOKEN_RE = re.compile(r"\w+|[^\w\s]", re.UNICODE)
+_SENTENCE_END = frozenset(".!?")
+
+
+class Chunk(NamedTuple):
+    """A window of a document: its text and character offsets in the original."""
+
+    index: int
+    text: str
+    start: int
+    end: int
+
+
+def chunk_text(text: str, max_tokens: int = 256, overlap: int = 32) -> list[Chunk]:
+    """
+    Split text into windows of at most max_tokens tokens.
+
+    Consecutive windows share `overlap` tokens. A window ends after the last
+    sentence in its final third when there is one, so spans rarely cut a
+    sentence in half. Windows are contiguous slices of the original text.
+
+    Returns:
+        The chunks in order; a single chunk when the text fits in one window
+    """
+    spans = [m.span() for m in _TOKEN_RE.finditer(text)]
+    if len(spans) <= max_tokens:
+        return [Chunk(0, text, 0, len(text))]
+
+    overlap = min(overlap, max_tokens // 2)
+    chunks = []
+    first = 0
+    start = 0
+    while True:
+        last = min(first + max_tokens, len(spans))
+        if last < len(spans):
+            for i in range(last - 1, first + (max_tokens * 2) // 3, -1):
+                if text[spans[i][0]] in _SENTENCE_END:
+                    last = i + 1
+                    break
+        end = spans[last][0] if last < len(spans) else len(text)
+        chunks.append(Chunk(len(chunks), text[start:end], start, end))
+        if last >= len(spans):
+            return chunks
+        first = max(last - overlap, first + 1)
+        start = spans[first][0]
+
+
+def chunk_documents(
+    documents: Iterable[tuple[str, str, dict[str, Any]]],
+    max_tokens: int = 256,
+    overlap: int = 32,
+) -> list[tuple[str, str, dict[str, Any]]]:
+    """
+    Expand (id, content, metadata) documents into storable units.
+
+    Documents that fit in one window are kept as they are. Longer ones become
+    chunks with ids "<parent>#<n>" whose metadata is the parent's plus the
+    chunk bookkeeping keys and a per-chunk content hash, so unchanged chunks
+    of an edited document are skipped on re-ingestion.
+    """
+    units = []
+    for doc_id, content, metadata in documents:
+        chunks = chunk_text(content, max_tokens, overlap) if max_tokens > 0 else []
+        if len(chunks) <= 1:
+            units.append((doc_id, content, metadata))
+            continue
+        base = {k: v for k, v in metadata.items() if k != HASH_KEY}
+        for chunk in chunks:
+            meta = {
+                **base,
+                PARENT_KEY: doc_id,
+                INDEX_KEY: chunk.index,
+                COUNT_KEY: len(chunks),
+                START_KEY: chunk.start,
+                END_KEY: chunk.end,
+            }
+            meta[HASH_KEY] = content_hash(chunk.text, meta)
+            units.append((f"{doc_id}#{chunk.index}", chunk.text, meta))
+    return units
+
+
+def stale_ids(
+    coll: Any,
+    documents: list[tuple[str, str, dict[str, Any]]],
+    units: list[tuple[str, str, dict[str, Any]]],
+    batch_size: int = 500,
+) -> list[str]:
+    """
+    Ids stored for these documents that the current chunking no longer produces.
+
+    Covers chunks beyond a shortened document's new chunk count, a whole
+    document that is now chunked, and chunks of a document that now fits in
+    one window.
+    """
+    keep = {doc_id for doc_id, _, _ in units}
+    parents = [doc_id for doc_id, _, _ in documents]
+    stored: set[str] = set()
+    for i in range(0, len(parents), batch_size):
+        part = parents[i:i + batch_size]
+        stored.update(coll.get(where={PARENT_KEY: {"$in": part}}, include=[])["ids"])
+        stored.update(coll.get(ids=part, include=[])["ids"])
+    return sorted(stored - keep)
+
+
+def parent_id(doc_id: str, metadata: dict[str, Any] | None) -> str:
+    """Id of the document a stored unit belongs to."""
+    return (metadata or {}).get(PARENT_KEY) or doc_id
+
+
+def collapse_chunks(results: dict[str, list], n_results: int) -> dict[str, list]:
+    """
+    Keep only the best-ranked hit per parent document.
+
+    Chunk hits are reported under their parent's id, with the matching span as
+    the document text; at most n_results hits are returned.
+    """
+    ids = results.get("ids") or []
+    metadatas = results.get("metadatas") or [{}] * len(ids)
+    keys = [k for k, v in results.items() if isinstance(v, list) and len(v) == len(ids)]
+
+    seen: set[str] = set()
+    keep = []
+    for i, (doc_id, meta) in enumerate(zip(ids, metadatas)):
+        parent = parent_id(doc_id, meta)
+        if parent in seen:
+            continue
+        seen.add(parent)
+        keep.append(i)
+        if len(keep) == n_results:
+            break
+
+    collapsed = {key: [results[key][i] for i in keep] for key in keys}
+    collapsed["ids"] = [parent_id(ids[i], metadatas[i]) for i in keep]
+    if "metadatas" in collapsed:
+        collapsed["metadatas"] = [
+            {k: v for k, v in (meta or {}).items() if k != PARENT_KEY} for meta in collapsed["metadatas"]
+        ]
+    for key, value in results.items():
+        collapsed.setdefault(key, value)
+    return collapsed
+
+
+def reconstruct(chunks: list[tuple[str, dict[str, Any]]]) -> tuple[str, dict[str, Any]]:
+    """
+    Stitch a parent document back together from its (text, metadata) chunks.
+
+    Returns:
+        The full text and the parent's metadata (chunk bookkeeping removed)
+    """
+    ordered = sorted(chunks, key=lambda c: c[1].get(INDEX_KEY, 0))
+    parts = []
+    covered = 0
+    for text, meta in ordered:
+        start = meta.get(START_KEY, covered)
+        parts.append(text[max(0, covered - start):])
+        covered = max(covered, meta.get(END_KEY, start + len(text)))
+    metadata = {k: v for k, v in ordered[0][1].items() if k not in CHUNK_KEYS and k != HASH_KEY}
+    return "".join(parts), metadata
@@ -0,0 +1,339 @@
+"""
+Multi-process HTTP serving: one writer, N read-only workers, one dispatcher.
+
+A single server process is bound by one interpreter (and its GIL) no matter
+how many threads the executor has. MCP_TRANSPORT=cluster runs, on one
+machine:
+
+- a writer: a regular server on the live ChromaDB directory that applies
+  every write tool call and publishes a new index version shortly after
+  each batch of writes (replica.py)
+- N readers: servers on the newest published version that answer everything
+  else, reject writes, and hot-swap to each new version as it appears
+- a dispatcher, listening on MCP_HOST:MCP_PORT: sends write tool calls to the
+  writer and every other request to the reader with the fewest requests in
+  flight (its queue depth), retrying on another reader if one is down;
+  a search cursor goes back to the reader holding its result set
+
+Backends run FastMCP's stateless HTTP mode, so any request can go to any
+reader without session affinity. The supervisor publishes a first version
+before starting the readers (picking up anything written while the cluster
+was down, e.g. by seed.py) and restarts backends that exit.
+"""
+import asyncio
+import itertools
+import json
+import os
+import signal
+import subprocess
+import sys
+import time
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import Any, AsyncIterator
+
+import httpx
+from fastmcp.server.middleware import Middleware
+from fastmcp.tools.tool import ToolResult
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, PlainTextResponse, Response, StreamingResponse
+from starlette.routing import Route
+
+from .pagination import ResultPages
+from .replica import current_version, publish, version_path
+
+# Tool calls the dispatcher routes to the writer (exports too, so snapshot
+# files are written from the live database into one directory)
+WRITE_TOOLS = frozenset({
+    "add_document", "add_documents_batch", "delete_document", "import_collection", "export_collection",
+})
+
+# Headers that describe one hop of the connection rather than the message
+_HOP_HEADERS = frozenset({
+    "connection", "keep-alive", "proxy-authenticate", "proxy-authorization",
+    "te", "trailers", "transfer-encoding", "upgrade", "host", "content-length",
+})
+
+# Seconds to wait before restarting a backend that exited
+_RESTART_DELAY = 1.0
+
+
+def _tool_calls(body: bytes) -> list[dict[str, Any]]:
+    """The params of every tools/call in a JSON-RPC message (or batch)."""
+    try:
+        message = json.loads(body)
+    except ValueError:
+        return []
+    return [
+        item.get("params") or {}
+        for item in (message if isinstance(message, list) else [message])
+        if isinstance(item, dict) and item.get("method") == "tools/call"
+    ]
+
+
+def write_calls(body: bytes) -> bool:
+    """Whether a JSON-RPC message (or batch) calls a write tool."""
+    return any(params.get("name") in WRITE_TOOLS for params in _tool_calls(body))
+
+
+def cursor_owner(body: bytes) -> str | None:
+    """Worker holding the result set of a search cursor in the message, if any."""
+    for params in _tool_calls(body):
+        cursor = (params.get("arguments") or {}).get("cursor")
+        if isinstance(cursor, str):
+            return ResultPages.cursor_owner(cursor)
+    return None
+
+
+class Backend:
+    """One server process behind the dispatcher."""
+
+    def __init__(self, name: str, port: int, env: dict[str, str]):
+        self.name = name
+        self.port = port
+        self.env = env
+        self.url = f"http://127.0.0.1:{port}"
+        self.process: subprocess.Popen | None = None
+        self.inflight = 0
+        self.requests = 0
+        self.errors = 0
+        self.restarts = 0
+        self.down_since: float | None = None
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "name": self.name,
+            "url": self.url,
+            "pid": self.process.pid if self.process else None,
+            "inflight": self.inflight,
+            "requests": self.requests,
+            "errors": self.errors,
+            "restarts": self.restarts,
+        }
+
+
+class Dispatcher:
+    """
+    ASGI app forwarding MCP requests to the writer or the least busy reader.
+
+    Args:
+        writer: Backend receiving write tool calls
+        readers: Backends receiving everything else
+        replica_root: Replica root, for the version shown in /cluster
+    """
+
+    def __init__(self, writer: Backend, readers: list[Backend], replica_root: Path):
+        self.writer = writer
+        self.readers = readers
+        self.replica_root = replica_root
+        self._rotation = itertools.count()
+        self._client: httpx.AsyncClient | None = None
+        self.app = self._build_app()
+
+    def route(self, body: bytes) -> Backend | None:
+        """Backend for a request: writer, cursor owner, or least busy reader."""
+        if write_calls(body):
+            return self.writer
+        owner = cursor_owner(body)
+        for backend in self.readers:
+            if backend.name == owner:
+                return backend
+        return self.pick()
+
+    def pick(self, exclude: set[str] = frozenset()) -> Backend | None:
+        """Reader with the fewest requests in flight; ties rotate."""
+        candidates = [b for b in self.readers if b.name not in exclude]
+        if not candidates:
+            return None
+        start = next(self._rotation) % len(candidates)
+        rotated = candidates[start:] + candidates[:start]
+        return min(rotated, key=lambda b: b.inflight)
+
+    def _build_app(self) -> Starlette:
+        async def cluster_stats(request: Request) -> JSONResponse:
+            return JSONResponse({
+                "version": current_version(self.replica_root),
+                "writer": self.writer.stats(),
+                "readers": [b.stats() for b in self.readers],
+            })
+
+        @asynccontextmanager
+        async def lifespan(app: Starlette) -> AsyncIterator[None]:
+            try:
+                yield
+            finally:
+                if self._client is not None:
+                    await self._client.aclose()
+
+        return Starlette(
+            routes=[
+                Route("/cluster", cluster_stats, methods=["GET"]),
+                Route("/{path:path}", self.forward, methods=["GET", "POST", "DELETE"]),
+            ],
+            lifespan=lifespan,
+        )
+
+    @staticmethod
+    async def _relay(upstream: httpx.Response, backend: Backend) -> AsyncIterator[bytes]:
+        # The request counts against the backend's queue depth until its response is fully relayed
+        try:
+            async for chunk in upstream.aiter_raw():
+                yield chunk
+        finally:
+            backend.inflight -= 1
+            await upstream.aclose()
+
+    async def forward(self, request: Request) -> Response:
+        if self._client is None:
+            self._client = httpx.AsyncClient(timeout=httpx.Timeout(None, connect=5.0))
+        body = await request.body()
+        headers = [(k, v) for k, v in request.headers.items() if k.lower() not in _HOP_HEADERS]
+        path = request.url.path + (f"?{request.url.query}" if request.url.query else "")
+
+        backend = self.route(body)
+        tried: set[str] = set()
+        while backend is not None:
+            backend.inflight += 1
+            backend.requests += 1
+            try:
+                upstream = await self._client.send(
+                    self._client.build_request(request.method, backend.url + path, headers=headers, content=body),
+                    stream=True,
+                )
+            except httpx.TransportError:
+                backend.inflight -= 1
+                backend.errors += 1
+                tried.add(backend.name)
+                # Reads can go to another reader; writes have nowhere else to go
+                backend = None if backend is self.writer else self.pick(exclude=tried)
+                continue
+
+            return StreamingResponse(
+                self._relay(upstream, backend),
+                status_code=upstream.status_code,
+                headers={k: v for k, v in upstream.headers.items() if k.lower() not in _HOP_HEADERS},
+            )
+        return PlainTextResponse("No backend available", status_code=503)
+
+
+class ReadOnlyMiddleware(Middleware):
+    """Rejects write tool calls on reader processes."""
+
+    async def on_call_tool(self, context: Any, call_next: Any) -> Any:
+        if context.message.name in WRITE_TOOLS:
+            message = "❌ This server is a read-only replica; send writes through the cluster dispatcher."
+            # Write tools return str, which FastMCP wraps as {"result": ...}
+            return ToolResult(content=message, structured_content={"result": message})
+        return await call_next(context)
+
+
+def serve_cluster(
+    command: list[str],
+    db_path: Path,
+    index_path: Path,
+    replica_root: Path,
+    host: str = "127.0.0.1",
+    port: int = 8000,
+    workers: int = 4,
+    base_port: int | None = None,
+    keep: int = 3,
+) -> None:
+    """
+    Run the writer, `workers` readers and the dispatcher until SIGTERM or SIGINT.
+
+    Args:
+        command: Starts one server process (e.g. [python, "src/server.py"]);
+            its role and port are passed through the environment
+        db_path: Live ChromaDB directory, owned by the writer
+        index_path: The writer's server-side index directory
+        replica_root: Where versions are published
+        host: Dispatcher address
+        port: Dispatcher port
+        workers: Reader processes
+        base_port: First backend port (writer; readers follow), port + 1 if None
+        keep: Published versions kept on disk
+    """
+    import uvicorn
+
+    version = publish(db_path, index_path, replica_root, keep)
+    print(f"📦 Published index version {version} to {replica_root}", file=sys.stderr)
+
+    base_port = base_port or port + 1
+    common = {
+        **os.environ,
+        "MCP_TRANSPORT": "http",
+        "MCP_HOST": "127.0.0.1",
+        "MCP_STATELESS_HTTP": "1",
+        "MCP_REPLICA_PATH": str(replica_root),
+        "MCP_REPLICA_KEEP": str(keep),
+    }
+    writer = Backend("writer", base_port, {
+        **common, "MCP_ROLE": "writer", "MCP_PORT": str(base_port),
+        "MCP_CHROMA_PATH": str(db_path), "MCP_INDEX_PATH": str(index_path),
+    })
+    readers = [
+        Backend(f"reader-{i}", base_port + 1 + i, {
+            **common, "MCP_ROLE": "reader", "MCP_PORT": str(base_port + 1 + i),
+            "MCP_WORKER_NAME": f"reader-{i}",
+            # Readers embed queries only; the document-embedding cache stays with the writer
+            "MCP_EMBEDDING_DISK_CACHE": "0",
+        })
+        for i in range(workers)
+    ]
+    backends = [writer, *readers]
+
+    def start(backend: Backend) -> None:
+        env = dict(backend.env)
+        if backend is not writer:
+            # A (re)started reader opens whatever version is current right now
+            current = version_path(replica_root, current_version(replica_root))
+            env["MCP_CHROMA_PATH"] = str(current / "chroma")
+            env["MCP_INDEX_PATH"] = str(current / "index")
+        backend.process = subprocess.Popen(command, env=env)
+        backend.down_since = None
+
+    dispatcher = Dispatcher(writer, readers, replica_root)
+    for backend in backends:
+        start(backend)
+
+    async def supervise() -> None:
+        while True:
+            await asyncio.sleep(0.5)
+            for backend in backends:
+                if backend.process is None or backend.process.poll() is None:
+                    continue
+                now = time.monotonic()
+                if backend.down_since is None:
+                    backend.down_since = now
+                    print(f"⚠️ {backend.name} exited with {backend.process.returncode}", file=sys.stderr)
+                elif now - backend.down_since >= _RESTART_DELAY:
+                    backend.restarts += 1
+                    start(backend)
+
+    async def main() -> None:
+        config = uvicorn.Config(dispatcher.app, host=host, port=port, log_level="warning")
+        server = uvicorn.Server(config)
+        supervisor = asyncio.create_task(supervise())
+        print(
+            f"🧩 Cluster: dispatcher on http://{host}:{port}/mcp, writer on :{writer.port}, "
+            f"{workers} readers on :{readers[0].port if readers else '-'}+",
+            file=sys.stderr,
+        )
+        try:
+            await server.serve()
+        finally:
+            supervisor.cancel()
+
+    try:
+        asyncio.run(main())
+    finally:
+        for backend in backends:
+            if backend.process is not None and backend.process.poll() is None:
+                backend.process.send_signal(signal.SIGTERM)
+        for backend in backends:
+            if backend.process is not None:
+                try:
+                    backend.process.wait(timeout=10)
+                except subprocess.TimeoutExpired:
+                    backend.process.kill()
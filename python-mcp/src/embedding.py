@@ -0,0 +1,413 @@
+"""
+Embedding engine shared by the server and seed.py.
+
+ChromaDB normally loads its default model lazily inside the first add or
+query, and embeds through a fixed-length padded pipeline. EmbeddingEngine
+instead:
+
+- runs all-MiniLM-L6-v2 (the model behind ChromaDB's default embedding
+  function, so vectors stay compatible with existing collections) on ONNX
+  Runtime with a configurable thread count, and can be warmed up at startup
+- embeds in length-sorted batches padded only to the longest text in the batch
+- can use a dynamically int8-quantized copy of the model (needs the `onnx`
+  package to quantize once; the result is cached next to the model)
+- keeps document embeddings in an on-disk cache keyed by model and content
+  hash, so re-seeding and re-indexing the same text never recomputes vectors
+
+Collections created with any other embedding function keep using it (through
+the same batching and disk cache).
+
+EmbeddingProcessPool spreads embedding over worker processes, each running
+its own engine, for bulk loads that would otherwise be bound by one core.
+"""
+import hashlib
+import multiprocessing
+import os
+import sqlite3
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Iterable
+
+if TYPE_CHECKING:
+    import numpy as np
+
+from .query_cache import embedding_model_name
+
+MODEL_NAME = "all-MiniLM-L6-v2"
+DIMENSION = 384
+MAX_TOKENS = 256
+
+# Embedding-function names whose vectors the ONNX backend reproduces
+COMPATIBLE_FUNCTIONS = frozenset({"default", "onnx_mini_lm_l6_v2"})
+
+BACKENDS = ("onnx", "chroma")
+
+
+class OnnxMiniLM:
+    """
+    all-MiniLM-L6-v2 on ONNX Runtime with mean pooling and L2 normalization.
+
+    Model files are shared with ChromaDB's default embedding function (and
+    downloaded by it when missing).
+
+    Args:
+        threads: Intra-op threads per inference call (0 = ONNX Runtime default)
+        batch_size: Texts per inference call
+        quantize: Use an int8 dynamically-quantized copy of the model
+    """
+
+    def __init__(self, threads: int = 0, batch_size: int = 32, quantize: bool = False):
+        self.threads = threads
+        self.batch_size = batch_size
+        self.quantize = quantize
+        self._session = None
+        self._tokenizer = None
+        self._lock = threading.Lock()
+
+    @property
+    def name(self) -> str:
+        return f"{MODEL_NAME}-int8" if self.quantize else MODEL_NAME
+
+    @property
+    def loaded(self) -> bool:
+        return self._session is not None
+
+    def load(self) -> None:
+        """Load (downloading or quantizing first if needed) the model and tokenizer."""
+        if self._session is not None:
+            return
+        with self._lock:
+            if self._session is not None:
+                return
+            import onnxruntime as ort
+            from chromadb.utils.embedding_functions import ONNXMiniLM_L6_V2
+            from tokenizers import Tokenizer
+
+            default = ONNXMiniLM_L6_V2()
+            model_dir = Path(default.DOWNLOAD_PATH) / default.EXTRACTED_FOLDER_NAME
+            if not (model_dir / "model.onnx").exists():
+                default._download_model_if_not_exists()
+            model_path = model_dir / "model.onnx"
+            if self.quantize:
+                model_path = self._quantized(model_path)
+
+            tokenizer = Tokenizer.from_file(str(model_dir / "tokenizer.json"))
+            tokenizer.enable_truncation(max_length=MAX_TOKENS)
+            tokenizer.enable_padding(pad_id=0, pad_token="[PAD]")
+
+            options = ort.SessionOptions()
+            options.log_severity_level = 3
+            options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+            if self.threads:
+                options.intra_op_num_threads = self.threads
+                options.inter_op_num_threads = 1
+            self._tokenizer = tokenizer
+            self._session = ort.InferenceSession(
+                str(model_path), sess_options=options, providers=["CPUExecutionProvider"]
+            )
+
+    @staticmethod
+    def _quantized(model_path: Path) -> Path:
+        target = model_path.with_name("model_int8.onnx")
+        if target.exists():
+            return target
+        try:
+            from onnxruntime.quantization import QuantType, quantize_dynamic
+        except ImportError:
+            raise ImportError("int8 quantization needs the onnx package: uv pip install onnx") from None
+        tmp = target.with_suffix(".tmp.onnx")
+        quantize_dynamic(str(model_path), str(tmp), weight_type=QuantType.QInt8)
+        tmp.replace(target)
+        return target
+
+    def __call__(self, texts: list[str]) -> "np.ndarray":
+        """Embed texts, batching similar lengths together to minimize padding."""
+        import numpy as np
+        self.load()
+        out = np.empty((len(texts), DIMENSION), dtype=np.float32)
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+        for start in range(0, len(order), self.batch_size):
+            rows = order[start:start + self.batch_size]
+            encoded = self._tokenizer.encode_batch([texts[i] for i in rows])
+            ids = np.array([e.ids for e in encoded], dtype=np.int64)
+            mask = np.array([e.attention_mask for e in encoded], dtype=np.int64)
+            hidden = self._session.run(
+                None, {"input_ids": ids, "attention_mask": mask, "token_type_ids": np.zeros_like(ids)}
+            )[0]
+            weights = mask[:, :, None].astype(np.float32)
+            pooled = (hidden * weights).sum(axis=1) / np.clip(weights.sum(axis=1), 1e-9, None)
+            pooled /= np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None)
+            out[rows] = pooled
+        return out
+
+
+class DiskEmbeddingCache:
+    """
+    Document embeddings in SQLite, keyed by (model, SHA-256 of the text).
+
+    Args:
+        path: SQLite database file
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._conn: sqlite3.Connection | None = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings ("
+                "model TEXT NOT NULL, key BLOB NOT NULL, vector BLOB NOT NULL, "
+                "PRIMARY KEY (model, key)) WITHOUT ROWID"
+            )
+            self._conn = conn
+        return self._conn
+
+    @staticmethod
+    def key(text: str) -> bytes:
+        return hashlib.sha256(text.encode("utf-8")).digest()
+
+    def get_many(self, model: str, texts: list[str], batch: int = 500) -> "list[np.ndarray | None]":
+        """Cached vectors for texts, None where missing."""
+        import numpy as np
+        keys = [self.key(t) for t in texts]
+        found: dict[bytes, np.ndarray] = {}
+        with self._lock:
+            for start in range(0, len(keys), batch):
+                part = list(set(keys[start:start + batch]))
+                rows = self.conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE model = ? AND key IN ({','.join('?' * len(part))})",
+                    [model, *part],
+                ).fetchall()
+                found.update((k, np.frombuffer(v, dtype=np.float32)) for k, v in rows)
+        vectors = [found.get(k) for k in keys]
+        hits = sum(v is not None for v in vectors)
+        self.hits += hits
+        self.misses += len(vectors) - hits
+        return vectors
+
+    def put_many(self, model: str, texts: list[str], vectors: list[Any]) -> None:
+        """Store vectors for texts (replacing any existing entry)."""
+        import numpy as np
+        rows = [
+            (model, self.key(t), np.asarray(v, dtype=np.float32).tobytes())
+            for t, v in zip(texts, vectors)
+        ]
+        with self._lock:
+            self.conn.execute("BEGIN")
+            self.conn.executemany("INSERT OR REPLACE INTO embeddings VALUES (?, ?, ?)", rows)
+            self.conn.execute("COMMIT")
+        self.writes += len(rows)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def stats(self) -> dict[str, Any]:
+        return {"path": str(self.path), "hits": self.hits, "misses": self.misses, "writes": self.writes}
+
+
+class EmbeddingEngine:
+    """
+    Computes embeddings for a collection's texts with batching and an on-disk cache.
+
+    Args:
+        backend: "onnx" to run the built-in model for collections using the
+            default embedding function, or "chroma" to always call the
+            collection's own function
+        threads: ONNX Runtime intra-op threads (0 = runtime default)
+        batch_size: Texts per inference call
+        quantize: Use the int8-quantized model (vectors differ slightly from fp32)
+        cache_path: SQLite file for the document-embedding cache, or None to disable
+    """
+
+    def __init__(
+        self,
+        backend: str = "onnx",
+        threads: int = 0,
+        batch_size: int = 32,
+        quantize: bool = False,
+        cache_path: Path | None = None,
+    ):
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown embedding backend '{backend}' (expected one of {', '.join(BACKENDS)})")
+        self.backend = backend
+        self.batch_size = batch_size
+        self.onnx = OnnxMiniLM(threads=threads, batch_size=batch_size, quantize=quantize) if backend == "onnx" else None
+        self.cache = DiskEmbeddingCache(cache_path) if cache_path else None
+        self.computed = 0
+        self.seconds = 0.0
+        self.warmup_seconds: float | None = None
+        self.warmup_error: str | None = None
+
+    @classmethod
+    def from_env(cls, index_path: Path) -> "EmbeddingEngine":
+        """
+        Build the engine from MCP_EMBEDDING_* settings, so the server and
+        seed.py embed identically.
+
+        - MCP_EMBEDDING_BACKEND: "onnx" (default) or "chroma"
+        - MCP_EMBEDDING_THREADS: inference threads (default 0 = all cores)
+        - MCP_EMBEDDING_BATCH_SIZE: texts per inference call (default 32)
+        - MCP_EMBEDDING_QUANTIZE: "1" for the int8 model (default "0")
+        - MCP_EMBEDDING_DISK_CACHE: "0" disables the cache at
+          <index_path>/embeddings.sqlite3 (default "1")
+        """
+        disk_cache = os.getenv("MCP_EMBEDDING_DISK_CACHE", "1") != "0"
+        return cls(
+            backend=os.getenv("MCP_EMBEDDING_BACKEND", "onnx"),
+            threads=int(os.getenv("MCP_EMBEDDING_THREADS", "0")),
+            batch_size=int(os.getenv("MCP_EMBEDDING_BATCH_SIZE", "32")),
+            quantize=os.getenv("MCP_EMBEDDING_QUANTIZE", "0") == "1",
+            cache_path=Path(index_path) / "embeddings.sqlite3" if disk_cache else None,
+        )
+
+    def _uses_onnx(self, coll: Any) -> bool:
+        return self.onnx is not None and (coll is None or embedding_model_name(coll) in COMPATIBLE_FUNCTIONS)
+
+    def model_name(self, coll: Any) -> str:
+        """Identifier of the model that embeds this collection's texts (used in cache keys)."""
+        return self.onnx.name if self._uses_onnx(coll) else embedding_model_name(coll)
+
+    def warm_up(self) -> None:
+        """Load the model and run one inference so the first request doesn't pay for it."""
+        start = time.perf_counter()
+        try:
+            if self.onnx is not None:
+                self.onnx(["warm up"])
+            self.warmup_error = None
+        except Exception as e:
+            self.warmup_error = str(e)
+            print(f"⚠️ Embedding model warm-up failed: {e}", file=sys.stderr)
+        self.warmup_seconds = time.perf_counter() - start
+
+    def _compute(self, coll: Any, texts: list[str], is_query: bool) -> "list[np.ndarray]":
+        start = time.perf_counter()
+        if self._uses_onnx(coll):
+            vectors = list(self.onnx(texts))
+        else:
+            import numpy as np
+            vectors = []
+            for i in range(0, len(texts), self.batch_size):
+                part = texts[i:i + self.batch_size]
+                vectors.extend(np.asarray(v, dtype=np.float32) for v in coll._embed(input=part, is_query=is_query))
+        self.computed += len(texts)
+        self.seconds += time.perf_counter() - start
+        return vectors
+
+    def embed(self, coll: Any, texts: list[str], is_query: bool = False) -> "list[np.ndarray]":
+        """
+        Embed texts for a collection.
+
+        Document embeddings are looked up in (and added to) the disk cache;
+        queries are not, since the server caches them in memory.
+        """
+        if not texts:
+            return []
+        if is_query or self.cache is None:
+            return self._compute(coll, texts, is_query)
+
+        model = self.model_name(coll)
+        vectors = self.cache.get_many(model, texts)
+        missing = list(dict.fromkeys(t for t, v in zip(texts, vectors) if v is None))
+        if missing:
+            computed = dict(zip(missing, self._compute(coll, missing, is_query)))
+            self.cache.put_many(model, missing, list(computed.values()))
+            vectors = [computed[t] if v is None else v for t, v in zip(texts, vectors)]
+        return vectors
+
+    def close(self) -> None:
+        if self.cache is not None:
+            self.cache.close()
+
+    def stats(self) -> dict[str, Any]:
+        """Backend, model state, inference counters and disk-cache counters."""
+        return {
+            "backend": self.backend,
+            "model": self.onnx.name if self.onnx else None,
+            "loaded": self.onnx.loaded if self.onnx else None,
+            "threads": self.onnx.threads if self.onnx else None,
+            "batch_size": self.batch_size,
+            "warmup_seconds": round(self.warmup_seconds, 3) if self.warmup_seconds is not None else None,
+            "warmup_error": self.warmup_error,
+            "embedded": self.computed,
+            "embed_seconds": round(self.seconds, 3),
+            "disk_cache": self.cache.stats() if self.cache else None,
+        }
+
+
+# Engine and collection of an EmbeddingProcessPool worker process
+_worker: tuple[EmbeddingEngine, Any] | None = None
+
+
+def _init_worker(db_path: str, collection: str, index_path: str, threads: int, embedding_modules: tuple[str, ...]) -> None:
+    global _worker
+    from .store import ChromaStore
+
+    if threads:
+        os.environ.setdefault("MCP_EMBEDDING_THREADS", str(threads))
+    store = ChromaStore(Path(db_path), embedding_modules=embedding_modules)
+    _worker = (EmbeddingEngine.from_env(Path(index_path)), store.get_collection(collection))
+
+
+def _embed_in_worker(texts: list[str]) -> list[Any]:
+    engine, coll = _worker
+    return engine.embed(coll, texts)
+
+
+class EmbeddingProcessPool:
+    """
+    Computes document embeddings for one collection in worker processes.
+
+    Each worker opens the collection and builds an EmbeddingEngine from the
+    same MCP_EMBEDDING_* settings (sharing the on-disk cache), so vectors are
+    identical to in-process ones. Calls block until their texts are embedded;
+    call from several threads to keep every worker busy.
+
+    Args:
+        db_path: ChromaDB directory
+        collection: Collection whose embedding function is used
+        index_path: Directory of the on-disk embedding cache
+        workers: Worker processes
+        embedding_modules: Modules registering custom embedding functions
+    """
+
+    def __init__(
+        self,
+        db_path: Path,
+        collection: str,
+        index_path: Path,
+        workers: int,
+        embedding_modules: Iterable[str] = (),
+    ):
+        self.workers = workers
+        # Split the cores between workers unless MCP_EMBEDDING_THREADS says otherwise
+        threads = max(1, (os.cpu_count() or 1) // workers)
+        # Spawned rather than forked: the parent usually has a ChromaDB client
+        # (and its threads) open already
+        self._pool = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(str(db_path), collection, str(index_path), threads, tuple(embedding_modules)),
+        )
+
+    def __call__(self, texts: list[str]) -> list[Any]:
+        return self._pool.submit(_embed_in_worker, texts).result()
+
+    def close(self) -> None:
+        self._pool.shutdown()
@@ -0,0 +1,138 @@
+"""
+Bounded executor for blocking ChromaDB and embedding work.
+
+Tool handlers are async; every blocking call is sent to a fixed-size thread
+pool so the event loop keeps serving other clients. Each collection gets a
+concurrency limit, and once too many calls are waiting the executor rejects
+new ones immediately with ServerBusyError instead of letting them queue up.
+A call keeps its slot (and its collection's concurrency permit) until its
+thread finishes, even if the caller stops waiting for it on a timeout or
+cancellation, so the busy limit counts the work actually occupying threads.
+"""
+import asyncio
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable
+
+
+class ServerBusyError(RuntimeError):
+    """Raised when the executor's queue is full and a call is rejected."""
+
+
+class BoundedExecutor:
+    """
+    Thread pool with per-collection concurrency limits and queue-depth backpressure.
+
+    Args:
+        max_workers: Threads running blocking calls
+        max_queue: Calls allowed to wait for a free thread before new ones are rejected
+        per_collection: Calls allowed to run at once against a single collection
+        metrics: Optional Metrics registry; time from admission until a thread
+            picks a call up is recorded as "executor.wait"
+    """
+
+    def __init__(self, max_workers: int = 8, max_queue: int = 64, per_collection: int = 4, metrics: Any = None):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.per_collection = per_collection
+        self.metrics = metrics
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="chroma")
+        self._semaphores: dict[str, asyncio.Semaphore] = {}
+        self._lock = threading.Lock()
+        self.pending = 0  # admitted calls, waiting or running
+        self.running = 0  # calls handed to the thread pool
+        self.completed = 0
+        self.rejected = 0
+
+    @property
+    def capacity(self) -> int:
+        """Calls that may be admitted (running or waiting) at the same time."""
+        return self.max_workers + self.max_queue
+
+    def _admit(self) -> None:
+        with self._lock:
+            if self.pending >= self.capacity:
+                self.rejected += 1
+                raise ServerBusyError(
+                    f"Server busy: {self.pending} requests pending (limit {self.capacity}). Retry shortly."
+                )
+            self.pending += 1
+
+    def _release(self) -> None:
+        with self._lock:
+            self.pending -= 1
+            self.completed += 1
+
+    def _semaphore(self, collection: str) -> asyncio.Semaphore:
+        sem = self._semaphores.get(collection)
+        if sem is None:
+            sem = self._semaphores.setdefault(collection, asyncio.Semaphore(self.per_collection))
+        return sem
+
+    async def run(self, fn: Callable[..., Any], *args: Any, collection: str | None = None) -> Any:
+        """
+        Run a blocking function on the pool and await its result.
+
+        Args:
+            fn: The blocking function
+            *args: Positional arguments for fn
+            collection: Collection the call touches, for per-collection limits
+
+        Raises:
+            ServerBusyError: If too many calls are already pending
+        """
+        self._admit()
+        sem = self._semaphore(collection) if collection is not None else None
+        try:
+            if sem is not None:
+                await sem.acquire()
+            try:
+                if self.metrics is not None and self.metrics.enabled:
+                    fn = self._timed(fn, time.perf_counter())
+                future = self._pool.submit(fn, *args)
+            except BaseException:
+                if sem is not None:
+                    sem.release()
+                raise
+        except BaseException:
+            self._release()
+            raise
+        with self._lock:
+            self.running += 1
+        future.add_done_callback(partial(self._finished, asyncio.get_running_loop(), sem))
+        return await asyncio.wrap_future(future)
+
+    def _finished(self, loop: asyncio.AbstractEventLoop, sem: asyncio.Semaphore | None, _: Future) -> None:
+        """Free a call's slot once its thread is done (or it was cancelled before starting)."""
+        with self._lock:
+            self.running -= 1
+        self._release()
+        if sem is not None:
+            try:
+                loop.call_soon_threadsafe(sem.release)
+            except RuntimeError:
+                pass  # the loop is closed; nothing waits on the semaphore any more
+
+    def _timed(self, fn: Callable[..., Any], queued: float) -> Callable[..., Any]:
+        def run_timed(*args: Any) -> Any:
+            self.metrics.observe("executor.wait", time.perf_counter() - queued)
+            return fn(*args)
+        return run_timed
+
+    def shutdown(self) -> None:
+        """Stop accepting work and wait for running calls to finish."""
+        self._pool.shutdown(wait=True)
+
+    def stats(self) -> dict[str, Any]:
+        """Return queue depth and admission counters."""
+        return {
+            "max_workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "per_collection": self.per_collection,
+            "pending": self.pending,
+            "running": self.running,
+            "completed": self.completed,
+            "rejected": self.rejected,
+        }
@@ -0,0 +1,120 @@
+"""
+Federated search across several collections.
+
+A federated search names its collections explicitly or with shell-style
+globs ("docs-*", "kb-202?"), resolved against the current collection list.
+The server embeds the query once per embedding model, searches every
+collection in parallel and gives each one its own deadline: a collection
+that fails or misses the deadline is reported and left out, so one slow
+shard degrades the answer instead of holding it up.
+
+Scores from different collections are not directly comparable, so how
+shards are merged depends on what they share:
+
+- vector hits from shards sharing an embedding model and distance space are
+  merged on their raw distances, so the merged ranking and scores are those
+  of one search over all the shards;
+- anything else (different models or spaces, keyword and fused scores) is
+  merged by reciprocal rank fusion of the shards' rankings, which uses only
+  each hit's rank within its shard.
+
+Each shard's hits are already ranked, so the global top-k is a heap merge
+that stops after k hits.
+"""
+import fnmatch
+import heapq
+import itertools
+from typing import Any
+
+from .lexical import reciprocal_rank_fusion
+
+_GLOB_CHARS = frozenset("*?[")
+
+
+def is_pattern(name: str) -> bool:
+    """Whether a collection argument is a glob rather than a literal name."""
+    return any(c in _GLOB_CHARS for c in name)
+
+
+def resolve_collections(names: list[str], available: list[str]) -> tuple[list[str], list[str]]:
+    """
+    Expand collection names and globs against the existing collections.
+
+    Returns:
+        (collections to search, in first-match order without duplicates;
+        names and globs that matched nothing)
+    """
+    existing = set(available)
+    resolved: dict[str, None] = {}
+    unmatched = []
+    for name in names:
+        if is_pattern(name):
+            matches = fnmatch.filter(sorted(available), name)
+        else:
+            matches = [name] if name in existing else []
+        if not matches:
+            unmatched.append(name)
+        resolved.update(dict.fromkeys(matches))
+    return list(resolved), unmatched
+
+
+def distance_space(coll: Any) -> str:
+    """HNSW distance function of a collection ("l2", "cosine" or "ip")."""
+    try:
+        space = (coll.configuration.get("hnsw") or {}).get("space")
+    except Exception:
+        space = None
+    return space or (coll.metadata or {}).get("hnsw:space") or "l2"
+
+
+def merge_scores(shards: dict[str, dict[str, list]], shared_space: bool, k: int = 60) -> dict[str, list[float]]:
+    """
+    Higher-is-better merge score for every shard's hits.
+
+    Args:
+        shards: Ranked results per collection
+        shared_space: Whether all shards are vector results from the same
+            embedding model and distance space
+        k: Reciprocal rank fusion constant (ignored for a shared space)
+
+    Returns:
+        Per collection, the negated raw distances when shared_space (see
+        merge_top_k), else each hit's reciprocal rank fusion score
+    """
+    if shared_space:
+        return {name: [-d for d in results.get("distances") or []] for name, results in shards.items()}
+    rankings = [[(name, rank) for rank in range(len(results.get("ids") or []))] for name, results in shards.items()]
+    fused = dict(reciprocal_rank_fusion(rankings, k))
+    return {name: [fused[(name, rank)] for rank, _ in enumerate(ranking)] for name, ranking in zip(shards, rankings)}
+
+
+def merge_top_k(
+    shards: dict[str, dict[str, list]], scores: dict[str, list[float]], k: int, shared_space: bool = False
+) -> dict[str, list]:
+    """
+    Heap-merge ranked shards into one global top-k by merge score.
+
+    Ties keep the order the collections were given in.
+
+    Returns:
+        Dict with "ids", "documents", "metadatas", the "collections" each hit
+        came from, and either the hits' raw "distances" (shared_space, so they
+        are scored as in a single-collection search) or their merge "scores"
+    """
+    streams = [
+        [(-score, order, rank, name) for rank, score in enumerate(scores[name])]
+        for order, name in enumerate(shards)
+    ]
+    merged: dict[str, list] = {"ids": [], "documents": [], "metadatas": [], "collections": []}
+    merged["distances" if shared_space else "scores"] = []
+    for neg_score, _, rank, name in itertools.islice(heapq.merge(*streams), k):
+        results = shards[name]
+        merged["ids"].append(results["ids"][rank])
+        merged["documents"].append(results["documents"][rank])
+        merged["metadatas"].append((results.get("metadatas") or [{}] * (rank + 1))[rank])
+        merged["collections"].append(name)
+        if shared_space:
+            merged["distances"].append(results["distances"][rank])
+        else:
+            merged["scores"].append(-neg_score)
+    return merged
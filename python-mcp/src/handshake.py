@@ -0,0 +1,140 @@
+"""
+Answer the MCP handshake on stdio before the server's heavy imports.
+
+Importing fastmcp alone takes about a second, and the server's own modules
+add more, so a stdio client would otherwise wait that long for its
+`initialize` reply. Under fast start, src/server.py calls answer_early()
+before importing anything else: using only the standard library, it reads
+the client's initialize request from the real stdin and answers it at once
+with the capabilities FastMCP would report. The process's stdin and stdout
+are swapped for pipes, so when FastMCP starts it reads the same initialize
+request (its own reply is dropped) followed by everything the client sent
+in the meantime; from then on bytes are simply relayed.
+"""
+import atexit
+import json
+import os
+import sys
+import threading
+from importlib import metadata
+
+# What FastMCP answers for this server; tests/test_startup.py checks they agree
+SUPPORTED_PROTOCOL_VERSIONS = ("2024-11-05", "2025-03-26", "2025-06-18")
+CAPABILITIES = {
+    "experimental": {},
+    "prompts": {"listChanged": False},
+    "resources": {"subscribe": False, "listChanged": False},
+    "tools": {"listChanged": True},
+}
+
+
+def initialize_result(request: dict, server_name: str) -> dict:
+    """The `initialize` result FastMCP would send for a request."""
+    requested = (request.get("params") or {}).get("protocolVersion")
+    version = requested if requested in SUPPORTED_PROTOCOL_VERSIONS else SUPPORTED_PROTOCOL_VERSIONS[-1]
+    return {
+        "protocolVersion": version,
+        "capabilities": CAPABILITIES,
+        "serverInfo": {"name": server_name, "version": metadata.version("mcp")},
+    }
+
+
+def _encode(message: dict) -> bytes:
+    return (json.dumps(message, separators=(",", ":")) + "\n").encode()
+
+
+class _Relay:
+    def __init__(self, server_name: str):
+        self.server_name = server_name
+        self.lock = threading.Lock()
+        self.answered: object = None  # id of the initialize request answered early
+        self.real_in = os.fdopen(os.dup(0), "rb", buffering=0)
+        self.real_out = os.dup(1)
+        in_read, self.in_write = os.pipe()
+        out_read, out_write = os.pipe()
+        os.dup2(in_read, 0)
+        os.dup2(out_write, 1)
+        os.close(in_read)
+        os.close(out_write)
+        self.server_out = os.fdopen(out_read, "rb")
+
+    def _write(self, data: bytes) -> None:
+        with self.lock:
+            view = memoryview(data)
+            while view:
+                view = view[os.write(self.real_out, view):]
+
+    def _forward(self, data: bytes) -> None:
+        view = memoryview(data)
+        while view:
+            view = view[os.write(self.in_write, view):]
+
+    def client_to_server(self) -> None:
+        """Answer the first message if it is initialize, then pass everything on."""
+        try:
+            first = self._readline()
+            if first:
+                try:
+                    request = json.loads(first)
+                except ValueError:
+                    request = None
+                if isinstance(request, dict) and request.get("method") == "initialize" and "id" in request:
+                    self.answered = request["id"]
+                    result = initialize_result(request, self.server_name)
+                    self._write(_encode({"jsonrpc": "2.0", "id": request["id"], "result": result}))
+                self._forward(first)
+            while True:
+                data = self.real_in.read(65536)
+                if not data:
+                    break
+                self._forward(data)
+        finally:
+            os.close(self.in_write)
+
+    def _readline(self) -> bytes:
+        line = bytearray()
+        while not line.endswith(b"\n"):
+            byte = self.real_in.read(1)
+            if not byte:
+                break
+            line += byte
+        return bytes(line)
+
+    def server_to_client(self) -> None:
+        """Pass the server's output on, minus its reply to the already answered initialize."""
+        for line in self.server_out:
+            if self.answered is not None:
+                try:
+                    reply = json.loads(line)
+                except ValueError:
+                    reply = None
+                if isinstance(reply, dict) and reply.get("id") == self.answered and "result" in reply:
+                    self.answered = None
+                    continue
+            self._write(line)
+
+
+def answer_early(server_name: str) -> None:
+    """
+    Start answering the handshake on stdio; the rest of the server is imported afterwards.
+
+    Args:
+        server_name: Name the server reports in serverInfo (the FastMCP name)
+    """
+    relay = _Relay(server_name)
+    threading.Thread(target=relay.client_to_server, name="handshake-in", daemon=True).start()
+    output = threading.Thread(target=relay.server_to_client, name="handshake-out", daemon=True)
+    output.start()
+
+    def drain() -> None:
+        # Releasing our end of the stdout pipe lets the relay pass on the last replies and stop
+        try:
+            sys.stdout.flush()
+        except (OSError, ValueError):
+            pass
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, 1)
+        os.close(devnull)
+        output.join(timeout=5)
+
+    atexit.register(drain)
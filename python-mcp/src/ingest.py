@@ -0,0 +1,344 @@
+"""
+Bulk document ingestion into ChromaDB.
+
+Documents are written in chunks no larger than ChromaDB's maximum batch size.
+Each chunk is embedded across a pool of worker threads and upserted in one
+call. A content hash is stored in each document's metadata so re-ingesting
+an unchanged document is skipped instead of re-embedded.
+
+ingest_stream() runs the same steps over a stream of documents of any length
+in bounded batches, recording its position in a checkpoint file after every
+batch, so memory stays flat and an interrupted load resumes where it stopped.
+"""
+import hashlib
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Iterable, Iterator
+
+HASH_KEY = "content_hash"
+
+# (documents processed so far, total documents)
+ProgressCallback = Callable[[int, int], None]
+
+# (ids, documents, metadatas) written by one upsert, or the previous versions it overwrote
+WriteCallback = Callable[[list[str], list[str], list[dict[str, Any]]], None]
+
+
+def content_hash(content: str, metadata: dict[str, Any] | None = None) -> str:
+    """Stable hash of a document's content and user metadata."""
+    meta = {k: v for k, v in (metadata or {}).items() if k != HASH_KEY}
+    payload = json.dumps([content, meta], sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def document_id(content: str, metadata: dict[str, Any] | None = None) -> str:
+    """Deterministic document id derived from the content hash."""
+    return f"doc-{content_hash(content, metadata)[:24]}"
+
+
+@dataclass
+class IngestReport:
+    """Outcome of an ingestion run."""
+
+    received: int = 0
+    added: int = 0
+    updated: int = 0
+    skipped: int = 0
+    rejected: int = 0
+    chunks: int = 0
+    batches: int = 0
+    seconds: float = 0.0
+    ids: list[str] = field(default_factory=list)
+
+    @property
+    def docs_per_sec(self) -> float:
+        return self.received / self.seconds if self.seconds else 0.0
+
+    def to_dict(self) -> dict[str, Any]:
+        data = asdict(self)
+        data.pop("ids")
+        data["docs_per_sec"] = round(self.docs_per_sec, 1)
+        return data
+
+
+def normalize_documents(documents: Iterable[dict[str, Any]]) -> list[tuple[str, str, dict[str, Any]]]:
+    """
+    Turn raw document dicts into (id, content, metadata) tuples.
+
+    Each dict needs "content" and may carry "id", "title" and "metadata".
+    Documents without an id get one derived from their content hash. When the
+    same id appears twice, the last occurrence wins.
+
+    Raises:
+        ValueError: If a document has no content
+    """
+    normalized = {}
+    for i, doc in enumerate(documents):
+        content = doc.get("content")
+        if not content:
+            raise ValueError(f"Document #{i + 1} has no 'content'")
+        metadata = dict(doc.get("metadata") or {})
+        if doc.get("title"):
+            metadata.setdefault("title", doc["title"])
+        doc_id = doc.get("id") or document_id(content, metadata)
+        metadata[HASH_KEY] = content_hash(content, metadata)
+        normalized[str(doc_id)] = (str(doc_id), content, metadata)
+    return list(normalized.values())
+
+
+def _chunks(items: list, size: int) -> Iterable[list]:
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def ingest_documents(
+    coll: Any,
+    documents: list[tuple[str, str, dict[str, Any]]],
+    batch_size: int = 1000,
+    embed_workers: int = 4,
+    embed_batch_size: int = 64,
+    on_progress: ProgressCallback | None = None,
+    on_write: WriteCallback | None = None,
+    on_replace: WriteCallback | None = None,
+    embed: Callable[[list[str]], list[Any]] | None = None,
+    group_key: str | None = None,
+) -> IngestReport:
+    """
+    Upsert documents into a collection, skipping ones whose content is unchanged.
+
+    Args:
+        coll: Target ChromaDB collection
+        documents: (id, content, metadata) tuples from normalize_documents
+        batch_size: Documents per ChromaDB write; capped by the caller at the
+            client's max batch size
+        embed_workers: Threads embedding sub-batches in parallel
+        embed_batch_size: Documents per embedding call
+        on_progress: Called with (processed, total) after each write batch
+        on_write: Called with the ids, texts and metadatas of each upsert, e.g. to keep
+            side indexes in sync
+        on_replace: Called after each upsert with the previous ids, texts and
+            metadatas of the documents it overwrote
+        embed: Computes document embeddings for a list of texts; the
+            collection's embedding function if None
+        group_key: Metadata key naming the logical document a unit belongs to
+            (e.g. the parent of a chunk). When given, added/updated/skipped
+            count logical documents: added if none of its units existed,
+            skipped if all of them were unchanged, updated otherwise
+
+    Returns:
+        IngestReport with added/updated/skipped counts and throughput
+    """
+    report = IngestReport(received=len(documents))
+    if embed is None:
+        embed = lambda texts: coll._embed(input=texts)
+    start = time.perf_counter()
+    processed = 0
+    # Outcomes of each logical document's units ("added", "updated", "skipped")
+    outcomes: dict[str, set[str]] = {}
+
+    def record(doc_id: str, metadata: dict[str, Any], outcome: str) -> None:
+        if group_key is None:
+            setattr(report, outcome, getattr(report, outcome) + 1)
+        else:
+            outcomes.setdefault(metadata.get(group_key) or doc_id, set()).add(outcome)
+
+    with ThreadPoolExecutor(max_workers=embed_workers) as pool:
+        for batch in _chunks(documents, batch_size):
+            existing = coll.get(ids=[doc_id for doc_id, _, _ in batch], include=["metadatas"])
+            known = {
+                doc_id: (meta or {}).get(HASH_KEY)
+                for doc_id, meta in zip(existing["ids"], existing["metadatas"] or [])
+            }
+
+            changed = [doc for doc in batch if known.get(doc[0]) != doc[2][HASH_KEY]]
+            for doc_id, _, meta in batch:
+                if known.get(doc_id) == meta[HASH_KEY]:
+                    record(doc_id, meta, "skipped")
+
+            if changed:
+                replaced = [doc_id for doc_id, _, _ in changed if doc_id in known]
+                old = None
+                if on_replace is not None and replaced:
+                    old = coll.get(ids=replaced, include=["documents", "metadatas"])
+
+                texts = [content for _, content, _ in changed]
+                embeddings = []
+                for part in pool.map(embed, _chunks(texts, embed_batch_size)):
+                    embeddings.extend(part)
+
+                coll.upsert(
+                    ids=[doc_id for doc_id, _, _ in changed],
+                    documents=texts,
+                    metadatas=[meta for _, _, meta in changed],
+                    embeddings=embeddings,
+                )
+                report.batches += 1
+                if old is not None:
+                    on_replace(old["ids"], old["documents"], old["metadatas"])
+                if on_write is not None:
+                    on_write(
+                        [doc_id for doc_id, _, _ in changed], texts, [meta for _, _, meta in changed]
+                    )
+                for doc_id, _, meta in changed:
+                    record(doc_id, meta, "updated" if doc_id in known else "added")
+
+            report.ids.extend(doc_id for doc_id, _, _ in batch)
+            processed += len(batch)
+            if on_progress is not None:
+                on_progress(processed, report.received)
+
+    for seen in outcomes.values():
+        if seen == {"skipped"}:
+            report.skipped += 1
+        elif seen == {"added"}:
+            report.added += 1
+        else:
+            report.updated += 1
+    report.seconds = time.perf_counter() - start
+    return report
+
+
+class IngestCheckpoint:
+    """
+    Position of a streamed ingestion in each of its sources, saved as JSON.
+
+    Args:
+        path: Checkpoint file
+        collection: Target collection; a checkpoint written for another
+            collection is ignored
+    """
+
+    def __init__(self, path: Path, collection: str):
+        self.path = Path(path)
+        self.collection = collection
+        self.sources: dict[str, dict[str, Any]] = {}
+        self.totals = IngestReport()
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+            if data.get("collection") == collection:
+                self.sources = data["sources"]
+                self.totals = IngestReport(**data.get("totals", {}))
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+
+    @property
+    def resumed(self) -> bool:
+        return bool(self.sources)
+
+    def advance(self, source: str, signature: Any, cursor: Any, complete: bool = False) -> None:
+        self.sources[source] = {"signature": signature, "cursor": cursor, "complete": complete}
+
+    def save(self) -> None:
+        totals = asdict(self.totals)
+        totals.pop("ids")
+        data = {"collection": self.collection, "sources": self.sources, "totals": totals}
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+        tmp.replace(self.path)
+
+    def clear(self) -> None:
+        """Forget the checkpoint (after the load finished)."""
+        self.path.unlink(missing_ok=True)
+        self.sources = {}
+
+
+def _batched(records: Iterable[Any], size: int) -> Iterator[list[Any]]:
+    batch = []
+    for record in records:
+        batch.append(record)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _accumulate(total: IngestReport, part: IngestReport) -> None:
+    for name in ("received", "added", "updated", "skipped", "rejected", "chunks", "batches"):
+        setattr(total, name, getattr(total, name) + getattr(part, name))
+    total.seconds += part.seconds
+
+
+def ingest_stream(
+    coll: Any,
+    records: Iterable[Any],
+    prepare: Callable[[list[tuple[str, str, dict[str, Any]]]], list[tuple[str, str, dict[str, Any]]]],
+    batch_size: int = 512,
+    write_batch_size: int = 1000,
+    embed_workers: int = 4,
+    embed_batch_size: int = 64,
+    embed: Callable[[list[str]], list[Any]] | None = None,
+    group_key: str | None = None,
+    cleanup: Callable[[list[tuple[str, str, dict[str, Any]]], list[tuple[str, str, dict[str, Any]]]], int] | None = None,
+    checkpoint: IngestCheckpoint | None = None,
+    on_batch: Callable[[IngestReport], None] | None = None,
+) -> IngestReport:
+    """
+    Ingest a stream of source records in bounded batches.
+
+    At most batch_size documents (plus their chunks and embeddings) are held
+    at once. After each batch is written, every source it touched is
+    advanced in the checkpoint and the checkpoint is saved.
+
+    Args:
+        coll: Target ChromaDB collection
+        records: sources.Record items; a record without a document marks the
+            end of its source
+        prepare: Turns normalized (id, content, metadata) documents into
+            storable units (e.g. chunk_documents)
+        batch_size: Documents read per batch
+        write_batch_size: Units per ChromaDB write (at most the client's max batch size)
+        embed_workers: Embedding calls in flight at once
+        embed_batch_size: Texts per embedding call
+        embed: Computes document embeddings; the collection's embedding function if None
+        group_key: Metadata key naming a unit's document, so counts are per
+            document rather than per unit (see ingest_documents)
+        cleanup: Called with (documents, units) after a batch is written to
+            delete units earlier versions left behind; returns how many it deleted
+        checkpoint: Progress store, saved after every batch
+        on_batch: Called with the running totals after every batch
+
+    Returns:
+        Totals for this run (plus the checkpointed totals of the run it resumes)
+    """
+    totals = checkpoint.totals if checkpoint is not None else IngestReport()
+    for batch in _batched(records, batch_size):
+        start = time.perf_counter()
+        raw = [record.document for record in batch if record.document is not None]
+        valid = [doc for doc in raw if doc.get("content")]
+        rejected = len(raw) - len(valid)
+        documents = normalize_documents(valid)
+
+        part = IngestReport()
+        if documents:
+            units = prepare(documents)
+            part = ingest_documents(
+                coll,
+                units,
+                batch_size=write_batch_size,
+                embed_workers=embed_workers,
+                embed_batch_size=embed_batch_size,
+                embed=embed,
+                group_key=group_key,
+            )
+            part.received = len(documents)
+            part.chunks = len(units)
+            if cleanup is not None:
+                cleanup(documents, units)
+        part.rejected = rejected
+        part.ids = []
+        part.seconds = time.perf_counter() - start
+        _accumulate(totals, part)
+
+        if checkpoint is not None:
+            for record in batch:
+                checkpoint.advance(record.source, record.signature, record.cursor, complete=record.document is None)
+            checkpoint.totals = totals
+            checkpoint.save()
+        if on_batch is not None:
+            on_batch(totals)
+    return totals
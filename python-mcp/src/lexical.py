@@ -0,0 +1,284 @@
+"""
+In-process BM25 inverted index kept beside each ChromaDB collection.
+
+Lexical search catches identifier-heavy queries ("tsc", "MILD method") that
+dense embeddings miss, and it needs no embedding at all. Indexes are built
+from the documents stored in ChromaDB, updated incrementally on writes, and
+persisted as JSON so a restart doesn't rebuild them.
+"""
+import json
+import math
+import re
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Any, Iterable
+
+from .store import iter_pages
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+# Very common English words that carry no ranking signal
+STOP_WORDS = frozenset(
+    "a an and are as at be by for from has have in is it its of on or that the "
+    "this to was were what when where which who why will with how do does".split()
+)
+
+
+def tokenize(text: str) -> list[str]:
+    """Lowercase word tokens with stop words removed."""
+    return [t for t in _TOKEN_RE.findall(text.lower()) if t not in STOP_WORDS]
+
+
+def reciprocal_rank_fusion(rankings: list[list[str]], k: int = 60) -> list[tuple[str, float]]:
+    """
+    Fuse several ranked id lists with reciprocal rank fusion.
+
+    Scores are normalized so an id ranked first in every list scores 1.0.
+
+    Returns:
+        (id, score) pairs, best first
+    """
+    scores: dict[str, float] = {}
+    for ranking in rankings:
+        for rank, doc_id in enumerate(ranking, 1):
+            scores[doc_id] = scores.get(doc_id, 0.0) + 1.0 / (k + rank)
+    best = len(rankings) / (k + 1) if rankings else 1.0
+    return sorted(((d, s / best) for d, s in scores.items()), key=lambda x: x[1], reverse=True)
+
+
+class BM25Index:
+    """
+    Okapi BM25 inverted index over a set of documents.
+
+    Args:
+        k1: Term-frequency saturation
+        b: Document-length normalization
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.postings: dict[str, dict[str, int]] = {}
+        self.doc_lengths: dict[str, int] = {}
+        self.doc_terms: dict[str, list[str]] = {}
+        self.total_length = 0
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self.doc_lengths)
+
+    def add(self, doc_id: str, text: str) -> None:
+        """Index a document, replacing any previous version with the same id."""
+        terms = Counter(tokenize(text))
+        with self._lock:
+            self.remove(doc_id)
+            for term, tf in terms.items():
+                self.postings.setdefault(term, {})[doc_id] = tf
+            length = sum(terms.values())
+            self.doc_lengths[doc_id] = length
+            self.doc_terms[doc_id] = list(terms)
+            self.total_length += length
+
+    def add_many(self, docs: Iterable[tuple[str, str]]) -> None:
+        """Index many (id, text) pairs."""
+        with self._lock:
+            for doc_id, text in docs:
+                self.add(doc_id, text or "")
+
+    def remove(self, doc_id: str) -> None:
+        """Drop a document from the index if present."""
+        with self._lock:
+            length = self.doc_lengths.pop(doc_id, None)
+            if length is None:
+                return
+            self.total_length -= length
+            for term in self.doc_terms.pop(doc_id, []):
+                docs = self.postings.get(term)
+                if docs is None:
+                    continue
+                docs.pop(doc_id, None)
+                if not docs:
+                    del self.postings[term]
+
+    def search(
+        self, query: str, n_results: int = 10, allowed: set[str] | None = None
+    ) -> list[tuple[str, float]]:
+        """
+        Rank documents for a query.
+
+        Args:
+            query: Query text
+            n_results: Maximum hits returned
+            allowed: Only score these ids (e.g. the candidates of a metadata filter)
+
+        Returns:
+            Up to n_results (id, bm25 score) pairs, best first
+        """
+        terms = set(tokenize(query))
+        with self._lock:
+            n_docs = len(self.doc_lengths)
+            if not n_docs or not terms:
+                return []
+            avg_len = self.total_length / n_docs
+            scores: dict[str, float] = {}
+            for term in terms:
+                docs = self.postings.get(term)
+                if not docs:
+                    continue
+                idf = math.log(1 + (n_docs - len(docs) + 0.5) / (len(docs) + 0.5))
+                for doc_id, tf in docs.items():
+                    if allowed is not None and doc_id not in allowed:
+                        continue
+                    norm = tf + self.k1 * (1 - self.b + self.b * self.doc_lengths[doc_id] / avg_len)
+                    scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (self.k1 + 1) / norm
+
+        ranked = sorted(scores.items(), key=lambda x: x[1], reverse=True)
+        return ranked[:n_results]
+
+    def to_dict(self) -> dict[str, Any]:
+        with self._lock:
+            return {"k1": self.k1, "b": self.b, "postings": self.postings, "doc_lengths": self.doc_lengths}
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "BM25Index":
+        index = cls(k1=data.get("k1", 1.5), b=data.get("b", 0.75))
+        index.postings = data["postings"]
+        index.doc_lengths = data["doc_lengths"]
+        index.total_length = sum(index.doc_lengths.values())
+        for term, docs in index.postings.items():
+            for doc_id in docs:
+                index.doc_terms.setdefault(doc_id, []).append(term)
+        return index
+
+
+class LexicalIndexManager:
+    """
+    One BM25 index per collection, loaded lazily and persisted to disk.
+
+    Args:
+        root: Directory holding one JSON file per collection
+        save_interval: Minimum seconds between writes of a changed index
+        read_only: Never write to root (e.g. a cluster reader serving a
+            published version shared with other readers); indexes built
+            here stay in memory
+    """
+
+    def __init__(self, root: Path, save_interval: float = 5.0, read_only: bool = False):
+        self.root = Path(root)
+        self.save_interval = save_interval
+        self.read_only = read_only
+        self._indexes: dict[str, BM25Index] = {}
+        self._dirty: set[str] = set()
+        self._last_save: dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def _path(self, collection: str) -> Path:
+        return self.root / f"{collection}.json"
+
+    def get(self, collection: str, coll: Any) -> BM25Index:
+        """
+        Return the index for a collection, loading or building it if needed.
+
+        A persisted index whose size no longer matches the collection (e.g.
+        after writes that bypassed the server) is rebuilt.
+        """
+        index = self._indexes.get(collection)
+        if index is not None:
+            return index
+
+        with self._lock:
+            index = self._indexes.get(collection)
+            if index is not None:
+                return index
+
+            count = coll.count()
+            path = self._path(collection)
+            if path.exists():
+                try:
+                    index = BM25Index.from_dict(json.loads(path.read_text(encoding="utf-8")))
+                except (OSError, ValueError, KeyError):
+                    index = None
+                if index is not None and len(index) != count:
+                    index = None
+
+            if index is None:
+                index = self._build(coll)
+                self._indexes[collection] = index
+                self._save(collection)
+            else:
+                self._indexes[collection] = index
+            return index
+
+    @staticmethod
+    def _build(coll: Any, page_size: int = 1000) -> BM25Index:
+        index = BM25Index()
+        for page in iter_pages(coll, ["documents"], page_size):
+            index.add_many(zip(page["ids"], page["documents"] or []))
+        return index
+
+    def upsert(self, collection: str, ids: list[str], texts: list[str]) -> None:
+        """Index new or changed documents of a loaded collection."""
+        index = self._indexes.get(collection)
+        if index is None:
+            # Not loaded: drop any persisted copy so it is rebuilt on first use
+            self._discard(collection)
+            return
+        index.add_many(zip(ids, texts))
+        self._dirty.add(collection)
+
+    def remove(self, collection: str, ids: list[str]) -> None:
+        """Drop documents from a loaded collection's index."""
+        index = self._indexes.get(collection)
+        if index is None:
+            self._discard(collection)
+            return
+        for doc_id in ids:
+            index.remove(doc_id)
+        self._dirty.add(collection)
+
+    def _discard(self, collection: str) -> None:
+        if not self.read_only:
+            self._path(collection).unlink(missing_ok=True)
+
+    def drop(self, collection: str) -> None:
+        """Forget a collection's index in memory and on disk."""
+        self._indexes.pop(collection, None)
+        self._dirty.discard(collection)
+        self._discard(collection)
+
+    def reset(self, root: Path) -> None:
+        """Serve indexes persisted under another directory, dropping those in memory."""
+        with self._lock:
+            self.root = Path(root)
+            self._indexes = {}
+            self._dirty = set()
+            self._last_save = {}
+
+    def flush(self, force: bool = False) -> None:
+        """Persist changed indexes, at most once per save_interval unless forced."""
+        now = time.monotonic()
+        for collection in list(self._dirty):
+            if force or now - self._last_save.get(collection, 0.0) >= self.save_interval:
+                self._save(collection)
+
+    def _save(self, collection: str) -> None:
+        index = self._indexes.get(collection)
+        if index is None or self.read_only:
+            self._dirty.discard(collection)
+            return
+        self.root.mkdir(parents=True, exist_ok=True)
+        path = self._path(collection)
+        tmp = path.with_suffix(".json.tmp")
+        tmp.write_text(json.dumps(index.to_dict(), separators=(",", ":")), encoding="utf-8")
+        tmp.replace(path)
+        self._dirty.discard(collection)
+        self._last_save[collection] = time.monotonic()
+
+    def stats(self) -> dict[str, Any]:
+        """Return per-collection document and term counts of loaded indexes."""
+        return {
+            name: {"documents": len(index), "terms": len(index.postings), "dirty": name in self._dirty}
+            for name, index in self._indexes.items()
+        }
@@ -0,0 +1,288 @@
+"""
+In-memory secondary index over document metadata.
+
+Maps metadata key -> value -> ids for each collection so filtered searches can
+estimate how many documents a `where` filter matches (and which ones) without
+asking ChromaDB, and so facet counts are answered from memory. Keys with too
+many distinct values (titles, hashes) are dropped from the index; filters on
+them are simply pushed down to ChromaDB. Values are keyed by (kind, value)
+with the kinds ChromaDB compares separately (bool, number, str), so True
+and 1, equal and hash-equal in Python, stay apart while 1 and 1.0 match.
+"""
+import operator
+import threading
+from collections import Counter
+from typing import Any, Callable, Iterable
+
+from .store import iter_pages
+
+# Scalar metadata types ChromaDB stores and filters on
+_SCALARS = (str, int, float, bool)
+
+_RANGE_OPS: dict[str, Callable[[Any, Any], bool]] = {
+    "$gt": operator.gt,
+    "$gte": operator.ge,
+    "$lt": operator.lt,
+    "$lte": operator.le,
+}
+
+
+def typed_value(value: Any) -> tuple[str, Any]:
+    """Index key of a metadata value: its kind as ChromaDB filters see it, and the value."""
+    if isinstance(value, bool):
+        return "bool", value
+    if isinstance(value, (int, float)):
+        return "number", value
+    return "str", value
+
+
+class MetadataIndex:
+    """
+    Inverted index from metadata (key, value) pairs to document ids.
+
+    Args:
+        max_values: Distinct values a key may have before it stops being indexed
+        group_key: Metadata key naming the logical document an entry belongs
+            to (e.g. the parent of a chunk); facets count distinct documents
+        exclude: Keys never indexed (bookkeeping fields)
+    """
+
+    def __init__(
+        self,
+        max_values: int = 1000,
+        group_key: str | None = None,
+        exclude: Iterable[str] = (),
+    ):
+        self.max_values = max_values
+        self.group_key = group_key
+        self.exclude = frozenset(exclude) | ({group_key} if group_key else set())
+        self.values: dict[str, dict[tuple[str, Any], set[str]]] = {}
+        self.high_cardinality: set[str] = set()
+        self._docs: dict[str, dict[str, Any]] = {}
+        self._groups: dict[str, str] = {}  # entry id -> logical document id, when they differ
+        self._group_sizes: Counter[str] = Counter()
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    @property
+    def documents(self) -> int:
+        """Number of logical documents (chunks of one parent count once)."""
+        return len(self._group_sizes)
+
+    def _group(self, doc_id: str) -> str:
+        return self._groups.get(doc_id, doc_id)
+
+    def add(self, doc_id: str, metadata: dict[str, Any] | None) -> None:
+        """Index a document's metadata, replacing any previous version."""
+        metadata = metadata or {}
+        pairs = {
+            k: v for k, v in metadata.items()
+            if isinstance(v, _SCALARS) and k not in self.exclude
+        }
+        group = metadata.get(self.group_key) if self.group_key else None
+        with self._lock:
+            self.remove(doc_id)
+            self._docs[doc_id] = pairs
+            if group and group != doc_id:
+                self._groups[doc_id] = group
+            self._group_sizes[self._group(doc_id)] += 1
+            for key, value in pairs.items():
+                if key in self.high_cardinality:
+                    continue
+                by_value = self.values.setdefault(key, {})
+                by_value.setdefault(typed_value(value), set()).add(doc_id)
+                if len(by_value) > self.max_values:
+                    del self.values[key]
+                    self.high_cardinality.add(key)
+
+    def add_many(self, docs: Iterable[tuple[str, dict[str, Any] | None]]) -> None:
+        """Index many (id, metadata) pairs."""
+        with self._lock:
+            for doc_id, metadata in docs:
+                self.add(doc_id, metadata)
+
+    def remove(self, doc_id: str) -> None:
+        """Drop a document from the index if present."""
+        with self._lock:
+            pairs = self._docs.pop(doc_id, None)
+            if pairs is None:
+                return
+            group = self._groups.pop(doc_id, doc_id)
+            self._group_sizes[group] -= 1
+            if not self._group_sizes[group]:
+                del self._group_sizes[group]
+            for key, value in pairs.items():
+                by_value = self.values.get(key)
+                if by_value is None:
+                    continue
+                ids = by_value.get(typed_value(value))
+                if ids is None:
+                    continue
+                ids.discard(doc_id)
+                if not ids:
+                    del by_value[typed_value(value)]
+                    if not by_value:
+                        del self.values[key]
+
+    def candidates(self, where: dict[str, Any] | None) -> tuple[set[str] | None, bool]:
+        """
+        Ids that may match a ChromaDB `where` filter.
+
+        Returns:
+            (ids, exact): ids is a superset of the matches, or None when the
+            index can't narrow the filter (high-cardinality keys, negations);
+            exact is True when ids are precisely the matches, so the filter
+            itself need not be re-applied
+        """
+        if not where:
+            return None, False
+        with self._lock:
+            try:
+                ids, exact = self._match(where)
+            except (TypeError, AttributeError):
+                return None, False  # malformed filter; ChromaDB reports the error
+            # ChromaDB wants one key per filter dict; let it validate anything else
+            return ids, exact and len(where) == 1
+
+    def _match(self, where: dict[str, Any]) -> tuple[set[str] | None, bool]:
+        return _intersect([self._clause(key, cond) for key, cond in where.items()])
+
+    def _clause(self, key: str, cond: Any) -> tuple[set[str] | None, bool]:
+        if key == "$and":
+            return _intersect([self._match(w) for w in cond])
+        if key == "$or":
+            parts = [self._match(w) for w in cond]
+            if any(ids is None for ids, _ in parts):
+                return None, False
+            return set().union(*(ids for ids, _ in parts)), all(exact for _, exact in parts)
+
+        if key in self.high_cardinality or key in self.exclude:
+            return None, False
+        by_value = self.values.get(key, {})
+
+        if not isinstance(cond, dict):
+            return set(by_value.get(typed_value(cond), ())), True
+        if len(cond) != 1:
+            return None, False
+
+        (op, arg), = cond.items()
+        if op == "$eq":
+            return set(by_value.get(typed_value(arg), ())), True
+        if op == "$in":
+            return set().union(*(by_value.get(typed_value(v), ()) for v in arg)), True
+        if op in _RANGE_OPS and isinstance(arg, (int, float)) and not isinstance(arg, bool):
+            compare = _RANGE_OPS[op]
+            return set().union(*(
+                ids for (kind, value), ids in by_value.items()
+                if kind == "number" and compare(value, arg)
+            )), True
+        return None, False  # $ne, $nin: documents without the key are ambiguous
+
+    def facets(self, keys: list[str] | None = None, limit: int = 20) -> dict[str, dict[str, int]]:
+        """
+        Per-value document counts for indexed keys.
+
+        Args:
+            keys: Keys to count (default: every indexed key)
+            limit: Most frequent values returned per key
+
+        Returns:
+            {key: {value: count}}, values ordered by descending count
+        """
+        with self._lock:
+            wanted = sorted(self.values) if keys is None else [k for k in keys if k in self.values]
+            result = {}
+            for key in wanted:
+                counts = sorted(
+                    ((str(value), len({self._group(i) for i in ids})) for (_, value), ids in self.values[key].items()),
+                    key=lambda x: x[1],
+                    reverse=True,
+                )
+                result[key] = dict(counts[:limit])
+            return result
+
+
+def _intersect(parts: list[tuple[set[str] | None, bool]]) -> tuple[set[str] | None, bool]:
+    known = [ids for ids, _ in parts if ids is not None]
+    if not known:
+        return None, False
+    return set.intersection(*known), len(known) == len(parts) and all(exact for _, exact in parts)
+
+
+class MetadataIndexManager:
+    """
+    One metadata index per collection, built lazily from ChromaDB.
+
+    Args:
+        max_values: Distinct values a key may have before it stops being indexed
+        group_key: Metadata key naming an entry's logical document
+        exclude: Keys never indexed
+    """
+
+    def __init__(self, max_values: int = 1000, group_key: str | None = None, exclude: Iterable[str] = ()):
+        self.max_values = max_values
+        self.group_key = group_key
+        self.exclude = tuple(exclude)
+        self._indexes: dict[str, MetadataIndex] = {}
+        self._lock = threading.Lock()
+
+    def get(self, collection: str, coll: Any) -> MetadataIndex:
+        """
+        Return the index for a collection, building it on first use.
+
+        An index whose size no longer matches the collection (e.g. after
+        writes that bypassed the server, such as seed.py or the snapshot CLI)
+        is rebuilt.
+        """
+        count = coll.count()
+        index = self._indexes.get(collection)
+        if index is not None and len(index) == count:
+            return index
+
+        with self._lock:
+            index = self._indexes.get(collection)
+            if index is None or len(index) != count:
+                index = self._build(coll)
+                self._indexes[collection] = index
+            return index
+
+    def _build(self, coll: Any, page_size: int = 1000) -> MetadataIndex:
+        index = MetadataIndex(max_values=self.max_values, group_key=self.group_key, exclude=self.exclude)
+        for page in iter_pages(coll, ["metadatas"], page_size):
+            index.add_many(zip(page["ids"], page["metadatas"] or []))
+        return index
+
+    def upsert(self, collection: str, ids: list[str], metadatas: list[dict[str, Any]]) -> None:
+        """Index new or changed documents of a loaded collection."""
+        index = self._indexes.get(collection)
+        if index is not None:
+            index.add_many(zip(ids, metadatas))
+
+    def remove(self, collection: str, ids: list[str]) -> None:
+        """Drop documents from a loaded collection's index."""
+        index = self._indexes.get(collection)
+        if index is not None:
+            for doc_id in ids:
+                index.remove(doc_id)
+
+    def drop(self, collection: str) -> None:
+        """Forget a collection's index."""
+        self._indexes.pop(collection, None)
+
+    def clear(self) -> None:
+        """Forget every index (e.g. after switching to another copy of the data)."""
+        self._indexes = {}
+
+    def stats(self) -> dict[str, Any]:
+        """Return per-collection document counts and indexed keys."""
+        return {
+            name: {
+                "entries": len(index),
+                "documents": index.documents,
+                "keys": len(index.values),
+                "high_cardinality": sorted(index.high_cardinality),
+            }
+            for name, index in self._indexes.items()
+        }
@@ -0,0 +1,333 @@
+"""
+Low-overhead timing metrics and a sampling profiler.
+
+Code paths are wrapped in named spans (`with metrics.span("search.embed"):`)
+and each span feeds a fixed-bucket histogram, so recording a duration is a
+bisect plus a few increments and memory stays constant however many calls are
+made. Percentiles are estimated from the buckets. When metrics are disabled,
+span() returns a shared no-op context manager.
+
+SamplingProfiler periodically captures the stack of every thread and counts
+identical stacks, which shows where time goes without instrumenting anything.
+It runs in its own thread, is started and stopped at runtime, and costs
+nothing while stopped.
+"""
+import bisect
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import nullcontext
+from typing import Any
+
+from fastmcp.server.middleware import Middleware
+
+# Histogram bucket upper bounds in seconds: 50µs doubling up to ~52s
+DEFAULT_BOUNDS = tuple(0.00005 * 2 ** i for i in range(21))
+
+_NULL_SPAN = nullcontext()
+
+# Innermost frames of threads that are parked waiting for work; not counted as samples
+_IDLE_FRAMES = frozenset({
+    ("threading.py", "wait"),
+    ("selectors.py", "select"),
+    ("thread.py", "_worker"),
+    ("queue.py", "get"),
+})
+
+
+class Histogram:
+    """
+    Fixed-bucket latency histogram.
+
+    Args:
+        bounds: Ascending bucket upper bounds in seconds; one overflow bucket is added
+    """
+
+    def __init__(self, bounds: tuple[float, ...] = DEFAULT_BOUNDS):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        """Record one duration in seconds."""
+        i = bisect.bisect_left(self.bounds, value)
+        with self._lock:
+            self.counts[i] += 1
+            self.count += 1
+            self.sum += value
+            if value > self.max:
+                self.max = value
+
+    def quantile(self, q: float) -> float:
+        """Estimate the q-quantile (0..1) by interpolating inside its bucket."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            if n and seen + n >= rank:
+                low = self.bounds[i - 1] if i else 0.0
+                high = self.bounds[i] if i < len(self.bounds) else self.max
+                return min(low + (high - low) * (rank - seen) / n, self.max)
+            seen += n
+        return self.max
+
+    def summary(self) -> dict[str, Any]:
+        """Count plus mean, p50/p95/p99 and max in milliseconds."""
+        return {
+            "count": self.count,
+            "mean_ms": round(self.sum / self.count * 1000, 3) if self.count else 0.0,
+            "p50_ms": round(self.quantile(0.50) * 1000, 3),
+            "p95_ms": round(self.quantile(0.95) * 1000, 3),
+            "p99_ms": round(self.quantile(0.99) * 1000, 3),
+            "max_ms": round(self.max * 1000, 3),
+            "total_ms": round(self.sum * 1000, 3),
+        }
+
+
+class _Span:
+    __slots__ = ("metrics", "name", "start")
+
+    def __init__(self, metrics: "Metrics", name: str):
+        self.metrics = metrics
+        self.name = name
+
+    def __enter__(self) -> "_Span":
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.metrics.observe(self.name, time.perf_counter() - self.start)
+
+
+class Metrics:
+    """
+    Registry of span histograms and event counters.
+
+    Args:
+        enabled: Record anything at all; when False every call is a no-op
+    """
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self.started = time.time()
+        self._histograms: dict[str, Histogram] = {}
+        self._counters: Counter[str] = Counter()
+        self._lock = threading.Lock()
+
+    def span(self, name: str) -> Any:
+        """Context manager timing the enclosed block into the histogram `name`."""
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name)
+
+    def observe(self, name: str, seconds: float) -> None:
+        """Record a duration measured elsewhere."""
+        if not self.enabled:
+            return
+        histogram = self._histograms.get(name)
+        if histogram is None:
+            with self._lock:
+                histogram = self._histograms.setdefault(name, Histogram())
+        histogram.observe(seconds)
+
+    def count(self, name: str, n: int = 1) -> None:
+        """Increment the event counter `name`."""
+        if self.enabled:
+            with self._lock:
+                self._counters[name] += n
+
+    def reset(self) -> None:
+        """Forget every recorded span and counter."""
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+            self.started = time.time()
+
+    def snapshot(self) -> dict[str, Any]:
+        """Per-span latency summaries and counters, spans sorted by name."""
+        with self._lock:
+            histograms = dict(self._histograms)
+            counters = dict(self._counters)
+        return {
+            "enabled": self.enabled,
+            "uptime_s": round(time.time() - self.started, 1),
+            "spans": {name: histograms[name].summary() for name in sorted(histograms)},
+            "counters": dict(sorted(counters.items())),
+        }
+
+    def prometheus(self, prefix: str = "mcp", gauges: dict[str, float] | None = None) -> str:
+        """
+        Render spans and counters in the Prometheus text exposition format.
+
+        Args:
+            prefix: Metric name prefix
+            gauges: Extra point-in-time values (e.g. queue depth), exported as
+                "<prefix>_<name>" gauges
+        """
+        with self._lock:
+            histograms = sorted(self._histograms.items())
+            counters = sorted(self._counters.items())
+
+        lines = [
+            f"# HELP {prefix}_span_seconds Time spent per instrumented stage.",
+            f"# TYPE {prefix}_span_seconds histogram",
+        ]
+        for name, h in histograms:
+            label = f'span="{_escape(name)}"'
+            cumulative = 0
+            for bound, n in zip(h.bounds, h.counts):
+                cumulative += n
+                lines.append(f'{prefix}_span_seconds_bucket{{{label},le="{bound:g}"}} {cumulative}')
+            lines.append(f'{prefix}_span_seconds_bucket{{{label},le="+Inf"}} {h.count}')
+            lines.append(f"{prefix}_span_seconds_sum{{{label}}} {h.sum:.6f}")
+            lines.append(f"{prefix}_span_seconds_count{{{label}}} {h.count}")
+
+        lines += [
+            f"# HELP {prefix}_events_total Counted server events.",
+            f"# TYPE {prefix}_events_total counter",
+        ]
+        lines += [f'{prefix}_events_total{{event="{_escape(name)}"}} {n}' for name, n in counters]
+        lines += [
+            f"# TYPE {prefix}_uptime_seconds gauge",
+            f"{prefix}_uptime_seconds {time.time() - self.started:.1f}",
+        ]
+        for name, value in sorted((gauges or {}).items()):
+            lines += [f"# TYPE {prefix}_{name} gauge", f"{prefix}_{name} {value}"]
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class SamplingProfiler:
+    """
+    Statistical profiler that samples every thread's stack on a timer.
+
+    Args:
+        interval: Seconds between samples
+        max_depth: Innermost frames kept per stack
+    """
+
+    def __init__(self, interval: float = 0.005, max_depth: int = 48):
+        self.interval = interval
+        self.max_depth = max_depth
+        self.stacks: Counter[str] = Counter()
+        self.samples = 0
+        self.idle = 0
+        self._thread: threading.Thread | None = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self.started_at: float | None = None
+        self.elapsed = 0.0
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None
+
+    def start(self, interval: float | None = None) -> None:
+        """Start sampling (no-op if already running); keeps earlier samples."""
+        with self._lock:
+            if self._thread is not None:
+                return
+            if interval:
+                self.interval = interval
+            self._stop.clear()
+            self.started_at = time.monotonic()
+            self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        """Stop sampling; collected stacks stay available."""
+        with self._lock:
+            thread, self._thread = self._thread, None
+            if thread is None:
+                return
+            self._stop.set()
+            thread.join()
+            self.elapsed += time.monotonic() - (self.started_at or time.monotonic())
+            self.started_at = None
+
+    def clear(self) -> None:
+        """Drop collected stacks."""
+        self.stacks = Counter()
+        self.samples = 0
+        self.idle = 0
+        self.elapsed = 0.0
+
+    def _run(self) -> None:
+        me = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            for ident, frame in sys._current_frames().items():
+                if ident == me:
+                    continue
+                if (frame.f_code.co_filename.rsplit("/", 1)[-1], frame.f_code.co_name) in _IDLE_FRAMES:
+                    self.idle += 1
+                    continue
+                self.stacks[self._collapse(frame)] += 1
+            self.samples += 1
+
+    def _collapse(self, frame: Any) -> str:
+        names = []
+        while frame is not None and len(names) < self.max_depth:
+            code = frame.f_code
+            names.append(f"{code.co_name} ({code.co_filename.rsplit('/', 1)[-1]}:{frame.f_lineno})")
+            frame = frame.f_back
+        return ";".join(reversed(names))
+
+    def collapsed(self) -> str:
+        """Stacks in collapsed format ("outer;...;inner count"), for flame graph tools."""
+        return "\n".join(f"{stack} {n}" for stack, n in self.stacks.most_common())
+
+    def summary(self, top: int = 15) -> dict[str, Any]:
+        """Sampling state plus the functions most often on top of a stack."""
+        leaves: Counter[str] = Counter()
+        for stack, n in list(self.stacks.items()):
+            leaves[stack.rsplit(";", 1)[-1]] += n
+        total = sum(leaves.values()) or 1
+        elapsed = self.elapsed + (time.monotonic() - self.started_at if self.started_at else 0.0)
+        return {
+            "running": self.running,
+            "interval_ms": round(self.interval * 1000, 3),
+            "samples": self.samples,
+            "idle_thread_samples": self.idle,
+            "seconds": round(elapsed, 1),
+            "top_frames": [
+                {"frame": frame, "samples": n, "share": round(n / total, 4)}
+                for frame, n in leaves.most_common(top)
+            ],
+        }
+
+
+class ToolTimingMiddleware(Middleware):
+    """
+    FastMCP middleware timing every tool call into the span "tool.<name>".
+
+    Tools report failures as text starting with "❌", so those are counted as
+    "tool_error.<name>" alongside raised exceptions.
+    """
+
+    def __init__(self, metrics: Metrics):
+        self.metrics = metrics
+
+    async def on_call_tool(self, context: Any, call_next: Any) -> Any:
+        if not self.metrics.enabled:
+            return await call_next(context)
+        name = context.message.name
+        start = time.perf_counter()
+        try:
+            result = await call_next(context)
+        except Exception:
+            self.metrics.count(f"tool_error.{name}")
+            raise
+        finally:
+            self.metrics.observe(f"tool.{name}", time.perf_counter() - start)
+        content = getattr(result, "content", None)
+        if content and getattr(content[0], "text", "").startswith("❌"):
+            self.metrics.count(f"tool_error.{name}")
+        return result
@@ -0,0 +1,137 @@
+"""
+Cursor-based paging over ranked search results.
+
+A search ranks more hits than it returns and parks the ranked set here under
+a random token. The caller gets the first page plus an opaque cursor; asking
+for the next page just slices the stored set, without re-running the query.
+Pages show the collection as it was at search time. Stored sets are bounded
+by count, memory and a short TTL, and a cursor whose set was evicted is
+reported as expired. Tokens carry the name of the process holding the set
+(when it has one), so a dispatcher in front of several processes can send a
+cursor back to where its pages are.
+"""
+import base64
+import secrets
+from dataclasses import dataclass
+from typing import Any
+
+from .cache import LRUCache
+from .query_cache import result_size
+
+
+class CursorExpiredError(LookupError):
+    """Raised when a cursor is malformed or its result set is no longer held."""
+
+
+@dataclass
+class Snapshot:
+    """A ranked result set held for paging."""
+
+    query: str
+    collection: str
+    results: dict[str, list]
+    page_size: int
+    # Searched and failed collections of a federated search
+    federation: dict[str, Any] | None = None
+
+    @property
+    def total(self) -> int:
+        return len(self.results.get("ids") or [])
+
+
+def slice_results(results: dict[str, list], start: int, stop: int) -> dict[str, list]:
+    """Slice every per-hit list of a result set to hits [start, stop)."""
+    total = len(results.get("ids") or [])
+    return {
+        key: value[start:stop] if isinstance(value, list) and len(value) == total else value
+        for key, value in results.items()
+    }
+
+
+class ResultPages:
+    """
+    Short-lived store of ranked result sets, addressed by cursor.
+
+    Args:
+        max_entries: Maximum number of result sets held
+        max_bytes: Approximate memory budget for held documents and metadata
+        ttl: Seconds a result set can be paged after the search that produced it
+        owner: Name of this process, prefixed to every token (see cursor_owner)
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 256,
+        max_bytes: int | None = 32 * 1024 * 1024,
+        ttl: float = 300.0,
+        owner: str | None = None,
+    ):
+        self.owner = owner
+        self.cache = LRUCache(max_size=max_entries, ttl=ttl, max_bytes=max_bytes, sizeof=lambda s: result_size(s.results))
+
+    @staticmethod
+    def _encode(token: str, offset: int) -> str:
+        return base64.urlsafe_b64encode(f"{token}:{offset}".encode()).decode().rstrip("=")
+
+    @staticmethod
+    def _decode(cursor: str) -> tuple[str, int]:
+        try:
+            raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+            token, offset = raw.rsplit(":", 1)
+            offset = int(offset)
+        except (ValueError, UnicodeDecodeError):
+            raise CursorExpiredError("Invalid cursor") from None
+        if offset < 0:
+            raise CursorExpiredError("Invalid cursor")
+        return token, offset
+
+    def first_page(self, snapshot: Snapshot) -> tuple[dict[str, list], str | None]:
+        """
+        Return the first page of a ranked set, storing the rest if there is more.
+
+        Returns:
+            (page, next_cursor); next_cursor is None when everything fit
+        """
+        page = slice_results(snapshot.results, 0, snapshot.page_size)
+        if snapshot.total <= snapshot.page_size:
+            return page, None
+        token = secrets.token_urlsafe(12)
+        if self.owner:
+            token = f"{self.owner}.{token}"
+        self.cache.put(token, snapshot)
+        return page, self._encode(token, snapshot.page_size)
+
+    def next_page(self, cursor: str) -> tuple[Snapshot, int, dict[str, list], str | None]:
+        """
+        Resolve a cursor to the page it points at.
+
+        Returns:
+            (snapshot, offset, page, next_cursor)
+
+        Raises:
+            CursorExpiredError: If the cursor is invalid or its result set expired
+        """
+        token, offset = self._decode(cursor)
+        snapshot = self.cache.get(token)
+        if snapshot is None:
+            raise CursorExpiredError("Cursor expired; run the search again")
+        if offset >= snapshot.total:
+            raise CursorExpiredError("Invalid cursor")
+        stop = offset + snapshot.page_size
+        page = slice_results(snapshot.results, offset, stop)
+        next_cursor = self._encode(token, stop) if stop < snapshot.total else None
+        return snapshot, offset, page, next_cursor
+
+    @classmethod
+    def cursor_owner(cls, cursor: str) -> str | None:
+        """Name of the process holding a cursor's result set, if it has one."""
+        try:
+            token, _ = cls._decode(cursor)
+        except CursorExpiredError:
+            return None
+        owner, sep, _ = token.rpartition(".")
+        return owner if sep else None
+
+    def stats(self) -> dict[str, Any]:
+        """Return cache counters for held result sets."""
+        return self.cache.stats()
@@ -0,0 +1,187 @@
+"""
+Query-embedding and search-result caches.
+
+EmbeddingCache sits in front of the embedding engine (or a collection's
+embedding function) so repeated query texts are embedded once. ResultCache stores ranked hits keyed by
+(collection, write version, query embedding, max_results) and can optionally
+answer near-identical queries whose embeddings exceed a cosine-similarity
+threshold.
+"""
+import hashlib
+import sys
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    import numpy as np
+
+from .cache import LRUCache
+
+
+def normalize_query(text: str) -> str:
+    """Collapse whitespace and case so trivially different queries share a key."""
+    return " ".join(text.split()).casefold()
+
+
+def embedding_model_name(coll: Any) -> str:
+    """
+    Best-effort identifier of the embedding model a collection uses.
+
+    Mirrors ChromaDB's own choice: an explicitly attached function wins, then
+    the one persisted in the collection's configuration. Handles reopened
+    without a function carry a placeholder default, which is skipped.
+    """
+    ef = getattr(coll, "_embedding_function", None)
+    if ef is not None and type(ef).__name__ == "DefaultEmbeddingFunction":
+        ef = None
+    if ef is None:
+        try:
+            ef = coll.configuration.get("embedding_function")
+        except Exception:
+            ef = None
+    if ef is None:
+        return "default"
+    try:
+        return ef.name()
+    except Exception:
+        return type(ef).__name__
+
+
+def result_size(result: dict[str, list]) -> int:
+    """Approximate memory held by a result set (documents and metadata)."""
+    size = sys.getsizeof(result)
+    for doc in result.get("documents") or []:
+        size += len(doc or "")
+    for meta in result.get("metadatas") or []:
+        size += sys.getsizeof(meta)
+    return size
+
+
+class EmbeddingCache:
+    """
+    LRU cache of query embeddings keyed by (model, normalized text).
+
+    Args:
+        max_entries: Maximum number of cached embeddings
+        max_bytes: Memory budget for cached vectors
+        engine: EmbeddingEngine computing missing vectors; the collection's own
+            embedding function if None
+    """
+
+    def __init__(self, max_entries: int = 4096, max_bytes: int | None = 64 * 1024 * 1024, engine: Any = None):
+        self.cache = LRUCache(max_size=max_entries, max_bytes=max_bytes, sizeof=lambda v: v.nbytes)
+        self.engine = engine
+
+    def model(self, coll: Any) -> str:
+        """Name of the model query embeddings for a collection come from."""
+        return self.engine.model_name(coll) if self.engine is not None else embedding_model_name(coll)
+
+    def lookup(self, coll: Any, text: str) -> "np.ndarray | None":
+        """Return the cached embedding for a query, without computing it."""
+        return self.cache.get((self.model(coll), normalize_query(text)))
+
+    def embed(self, coll: Any, texts: list[str]) -> "list[np.ndarray]":
+        """
+        Embed query texts with the collection's embedding function.
+
+        Only texts missing from the cache are sent to the model, in one batch.
+        """
+        model = self.model(coll)
+        keys = [(model, normalize_query(t)) for t in texts]
+        vectors: list[np.ndarray | None] = [self.cache.get(k) for k in keys]
+
+        missing = list(dict.fromkeys(t for t, v in zip(texts, vectors) if v is None))
+        if missing:
+            import numpy as np
+            if self.engine is not None:
+                computed = self.engine.embed(coll, missing, is_query=True)
+            else:
+                computed = coll._embed(input=missing, is_query=True)
+            by_text = {t: np.asarray(e, dtype=np.float32) for t, e in zip(missing, computed)}
+            for i, (text, key) in enumerate(zip(texts, keys)):
+                if vectors[i] is None:
+                    vectors[i] = by_text[text]
+                    self.cache.put(key, vectors[i])
+
+        return vectors
+
+    def stats(self) -> dict[str, Any]:
+        """Size and hit/miss counters of the embedding cache."""
+        return self.cache.stats()
+
+
+class ResultCache:
+    """
+    LRU cache of per-query search results.
+
+    Entries are keyed by collection write version, so any write to a
+    collection makes its older entries unreachable.
+
+    Args:
+        max_entries: Maximum number of cached result sets
+        max_bytes: Approximate memory budget for cached documents and metadata
+        ttl: Seconds a result set stays valid
+        similarity_threshold: Cosine similarity above which a cached result for
+            a different query embedding is reused, or None for exact hits only
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        max_bytes: int | None = 64 * 1024 * 1024,
+        ttl: float | None = 600.0,
+        similarity_threshold: float | None = None,
+    ):
+        self.cache = LRUCache(max_size=max_entries, ttl=ttl, max_bytes=max_bytes, sizeof=lambda v: result_size(v[1]))
+        self.similarity_threshold = similarity_threshold
+        self.semantic_hits = 0
+
+    @staticmethod
+    def _key(collection: str, version: int, embedding: "np.ndarray", n_results: int) -> tuple:
+        digest = hashlib.blake2b(embedding.tobytes(), digest_size=16).digest()
+        return (collection, version, n_results, digest)
+
+    def get(self, collection: str, version: int, embedding: "np.ndarray", n_results: int) -> dict[str, list] | None:
+        """Return cached hits for an exact (or, if enabled, near-identical) query."""
+        entry = self.cache.get(self._key(collection, version, embedding, n_results))
+        if entry is not None:
+            return entry[1]
+        if self.similarity_threshold is None:
+            return None
+
+        candidates = [
+            (key, value) for key, value in self.cache.items()
+            if key[0] == collection and key[1] == version and key[2] == n_results
+        ]
+        if not candidates:
+            return None
+
+        import numpy as np
+        unit = embedding / (np.linalg.norm(embedding) or 1.0)
+        matrix = np.stack([value[0] for _, value in candidates])
+        scores = matrix @ unit
+        best = int(np.argmax(scores))
+        if scores[best] < self.similarity_threshold:
+            return None
+
+        key, (_, result) = candidates[best]
+        self.cache.touch(key)
+        self.semantic_hits += 1
+        return result
+
+    def put(self, collection: str, version: int, embedding: "np.ndarray", n_results: int, result: dict[str, list]) -> None:
+        """Cache the hits returned for a query embedding."""
+        import numpy as np
+        unit = embedding / (np.linalg.norm(embedding) or 1.0)
+        self.cache.put(self._key(collection, version, embedding, n_results), (unit, result))
+
+    def invalidate_collection(self, collection: str) -> None:
+        """Eagerly free every cached result for a collection."""
+        self.cache.invalidate_where(lambda key: key[0] == collection)
+
+    def stats(self) -> dict[str, Any]:
+        """Exact-key counters plus how many exact misses were served semantically."""
+        return {
+            **self.cache.stats(),
+            "semantic_hits": self.semantic_hits,
+            "similarity_threshold": self.similarity_threshold,
+        }
@@ -0,0 +1,358 @@
+"""
+Published index versions for multi-process serving.
+
+In cluster mode (see cluster.py) one writer process owns the live ChromaDB
+directory and applies every write. Readers never open it: they serve
+immutable copies that the writer publishes under a replica root:
+
+    <root>/
+        CURRENT             name of the newest version, replaced atomically
+        00000042/
+            chroma/         consistent copy of the ChromaDB directory
+            index/          lexical indexes and catalog at the same point
+            manifest.json
+
+A version is assembled in a hidden temporary directory and renamed into
+place before CURRENT is switched to it, so a reader never sees a partial
+copy. The SQLite file is copied with SQLite's online backup API; the other
+files are only copied while no write is in progress (PublishLock). Files
+unchanged since the previous version (same size and modification time) are
+hard-linked from it instead of copied, so a publish costs a copy of the
+SQLite file plus whatever index segments the writes touched; the SQLite
+copy still grows with the database, which is why versions are published at
+most every MCP_REPLICA_PUBLISH_INTERVAL seconds rather than per write.
+Readers open versions with their side indexes read-only, so nothing in a
+published version changes after it is made current. Readers
+poll CURRENT (ReplicaWatcher) and move to a new version by opening it next
+to the old one and swapping over. The oldest versions are pruned, keeping
+`keep` of them so readers still finishing a request on the previous version
+are not cut off.
+
+Only the standard library is used, so the cluster supervisor can publish the
+first version without importing ChromaDB.
+"""
+import json
+import os
+import shutil
+import sqlite3
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Iterator
+
+CURRENT = "CURRENT"
+SQLITE_NAME = "chroma.sqlite3"
+
+# Server-side index files published with each version (embedding caches,
+# checkpoints and sockets stay with the writer)
+INDEX_FILES = ("catalog.json", "lexical/*.json")
+
+
+def current_version(root: str | Path) -> str | None:
+    """Name of the newest published version, or None before the first publish."""
+    try:
+        return (Path(root) / CURRENT).read_text(encoding="utf-8").strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def version_path(root: str | Path, version: str) -> Path:
+    return Path(root) / version
+
+
+def _link_or_copy(path: Path, dest: Path, previous: Path | None) -> bool:
+    """
+    Hard-link a file from the previous version if it is unchanged there, else copy it.
+
+    Returns:
+        True if the file was linked
+    """
+    if previous is not None:
+        try:
+            old, new = previous.stat(), path.stat()
+            if (old.st_size, old.st_mtime_ns) == (new.st_size, new.st_mtime_ns):
+                os.link(previous, dest)
+                return True
+        except OSError:
+            pass
+    shutil.copy2(path, dest)
+    return False
+
+
+def _copy_database(source: Path, target: Path, previous: Path | None = None) -> int:
+    """Copy a ChromaDB directory; returns how many files were linked from `previous`."""
+    target.mkdir(parents=True)
+    linked = 0
+    for path in sorted(source.rglob("*")):
+        rel = path.relative_to(source)
+        if path.is_dir():
+            (target / rel).mkdir(parents=True, exist_ok=True)
+        elif path.name == SQLITE_NAME:
+            src = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+            dst = sqlite3.connect(target / rel)
+            try:
+                src.backup(dst)
+            finally:
+                dst.close()
+                src.close()
+        elif not path.name.startswith(SQLITE_NAME):  # -wal/-shm are folded in by the backup
+            linked += _link_or_copy(path, target / rel, previous / rel if previous else None)
+    return linked
+
+
+def _copy_indexes(source: Path, target: Path, previous: Path | None = None) -> int:
+    target.mkdir(parents=True)
+    linked = 0
+    for pattern in INDEX_FILES:
+        for path in source.glob(pattern):
+            rel = path.relative_to(source)
+            (target / rel).parent.mkdir(parents=True, exist_ok=True)
+            linked += _link_or_copy(path, target / rel, previous / rel if previous else None)
+    return linked
+
+
+def publish(db_path: str | Path, index_path: str | Path, root: str | Path, keep: int = 3) -> str:
+    """
+    Copy the database and its side indexes into a new version and make it current.
+
+    The caller must keep writes out for the duration (PublishLock.publishing).
+
+    Args:
+        db_path: Live ChromaDB directory
+        index_path: Live server-side index directory
+        root: Replica root
+        keep: Published versions kept; older ones are deleted
+
+    Returns:
+        The new version's name
+    """
+    root = Path(root)
+    root.mkdir(parents=True, exist_ok=True)
+    previous = current_version(root)
+    version = f"{int(previous) + 1 if previous and previous.isdigit() else 1:08d}"
+    start = time.perf_counter()
+
+    staging = root / f".{version}.tmp"
+    shutil.rmtree(staging, ignore_errors=True)
+    staging.mkdir()
+    base = version_path(root, previous) if previous and version_path(root, previous).is_dir() else None
+    linked = _copy_database(Path(db_path), staging / "chroma", base / "chroma" if base else None)
+    linked += _copy_indexes(Path(index_path), staging / "index", base / "index" if base else None)
+    (staging / "manifest.json").write_text(json.dumps({
+        "version": version,
+        "created": time.time(),
+        "source": str(Path(db_path).resolve()),
+        "linked_files": linked,
+        "copy_seconds": round(time.perf_counter() - start, 3),
+    }), encoding="utf-8")
+    staging.rename(root / version)
+
+    pointer = root / f".{CURRENT}.tmp"
+    pointer.write_text(version, encoding="utf-8")
+    os.replace(pointer, root / CURRENT)
+
+    prune(root, keep)
+    return version
+
+
+def prune(root: str | Path, keep: int = 3) -> list[str]:
+    """Delete all but the newest `keep` versions (never the current one)."""
+    root = Path(root)
+    current = current_version(root)
+    versions = sorted(p.name for p in root.iterdir() if p.is_dir() and p.name.isdigit())
+    removed = [v for v in versions[:-keep] if v != current] if keep > 0 else []
+    for version in removed:
+        shutil.rmtree(root / version, ignore_errors=True)
+    return removed
+
+
+class PublishLock:
+    """
+    Lets writes run alongside each other but never during a snapshot copy.
+
+    A pending publish holds back new writes, so a steady write load cannot
+    starve it.
+    """
+
+    def __init__(self) -> None:
+        self._cond = threading.Condition()
+        self._writers = 0
+        self._publishing = False
+
+    @contextmanager
+    def writing(self) -> Iterator[None]:
+        with self._cond:
+            while self._publishing:
+                self._cond.wait()
+            self._writers += 1
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._writers -= 1
+                self._cond.notify_all()
+
+    @contextmanager
+    def publishing(self) -> Iterator[None]:
+        with self._cond:
+            while self._publishing:
+                self._cond.wait()
+            self._publishing = True
+            while self._writers:
+                self._cond.wait()
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._publishing = False
+                self._cond.notify_all()
+
+
+class ReplicaPublisher:
+    """
+    Writer side: publishes a new version at most every `interval` seconds
+    while there are unpublished writes.
+
+    Args:
+        db_path: Live ChromaDB directory
+        index_path: Live server-side index directory
+        root: Replica root
+        interval: Minimum seconds between versions
+        keep: Published versions kept on disk
+        flush: Persists in-memory side indexes before each copy
+    """
+
+    def __init__(
+        self,
+        db_path: Path,
+        index_path: Path,
+        root: Path,
+        interval: float = 2.0,
+        keep: int = 3,
+        flush: Callable[[], None] | None = None,
+    ):
+        self.db_path = Path(db_path)
+        self.index_path = Path(index_path)
+        self.root = Path(root)
+        self.interval = interval
+        self.keep = keep
+        self.flush = flush
+        self.lock = PublishLock()
+        self.version = current_version(root)
+        self.published = 0
+        self.last_seconds: float | None = None
+        self.last_error: str | None = None
+        self._dirty = threading.Event()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def mark_dirty(self) -> None:
+        """Record a write that the next version must include."""
+        self._dirty.set()
+
+    def publish(self) -> str:
+        """Publish a version now."""
+        start = time.perf_counter()
+        with self.lock.publishing():
+            self._dirty.clear()
+            if self.flush is not None:
+                self.flush()
+            self.version = publish(self.db_path, self.index_path, self.root, self.keep)
+        self.published += 1
+        self.last_seconds = time.perf_counter() - start
+        return self.version
+
+    def start(self) -> None:
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="replica-publisher", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self._dirty.wait(timeout=1.0)
+            if self._stop.is_set() or not self._dirty.is_set():
+                continue
+            try:
+                self.publish()
+                self.last_error = None
+            except Exception as e:
+                self.last_error = str(e)
+                self._dirty.set()
+                print(f"⚠️ Publishing an index version failed: {e}", file=sys.stderr)
+            self._stop.wait(self.interval)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "role": "writer",
+            "version": self.version,
+            "published": self.published,
+            "pending_writes": self._dirty.is_set(),
+            "last_publish_seconds": round(self.last_seconds, 3) if self.last_seconds is not None else None,
+            "last_error": self.last_error,
+        }
+
+
+class ReplicaWatcher:
+    """
+    Reader side: follows CURRENT and hands each new version to `on_change`.
+
+    Args:
+        root: Replica root
+        version: Version this process started on
+        on_change: Switches the process to a version directory
+        interval: Seconds between checks of CURRENT
+    """
+
+    def __init__(self, root: Path, version: str | None, on_change: Callable[[Path], None], interval: float = 0.5):
+        self.root = Path(root)
+        self.version = version
+        self.on_change = on_change
+        self.interval = interval
+        self.swaps = 0
+        self.last_swap_seconds: float | None = None
+        self.last_error: str | None = None
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def check(self) -> bool:
+        """Swap to the current version if it changed; True if a swap happened."""
+        latest = current_version(self.root)
+        if latest is None or latest == self.version:
+            return False
+        start = time.perf_counter()
+        self.on_change(version_path(self.root, latest))
+        self.version = latest
+        self.swaps += 1
+        self.last_swap_seconds = time.perf_counter() - start
+        return True
+
+    def start(self) -> None:
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="replica-watcher", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                self.check()
+                self.last_error = None
+            except Exception as e:
+                self.last_error = str(e)
+                print(f"⚠️ Switching to a new index version failed: {e}", file=sys.stderr)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "role": "reader",
+            "version": self.version,
+            "swaps": self.swaps,
+            "last_swap_seconds": round(self.last_swap_seconds, 3) if self.last_swap_seconds is not None else None,
+            "last_error": self.last_error,
+        }
@@ -0,0 +1,241 @@
+"""
+Second-stage reranking of search hits.
+
+Vector search orders hits by embedding distance alone, which is cheap but
+coarse. With reranking, a search over-fetches candidates and rescores every
+(query, hit text) pair with a more precise scorer:
+
+- CrossEncoder: a local ONNX cross-encoder (e.g. ms-marco-MiniLM-L-6-v2
+  exported with its tokenizer.json) that reads the query and the hit
+  together; its logits are squashed to 0..1
+- LexicalOverlap: how many query terms the hit contains and how many query
+  bigrams it keeps intact; needs no model
+
+Pairs are scored in batches and each score is cached per (query, document id,
+text digest), so paging, repeated queries and overlapping candidate sets only
+score new pairs. A rerank has a hard time budget: when it runs out before
+every candidate is scored, the caller keeps the original order (the scores
+computed so far stay cached for the next request). Only the first-stage top
+candidates are rescored; hits ranked below them are dropped from a reranked
+result rather than left unscored behind it.
+"""
+import hashlib
+import math
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable
+
+from .cache import LRUCache
+from .lexical import tokenize
+from .query_cache import normalize_query
+
+SCORERS = ("lexical", "cross-encoder")
+
+# Query and document tokens the cross-encoder reads per pair
+CROSS_ENCODER_MAX_TOKENS = 512
+
+
+class LexicalOverlap:
+    """
+    Query-term coverage plus intact query bigrams (0..1).
+
+    Scores depend on the pair alone, so they can be cached across requests.
+    """
+
+    name = "lexical-overlap"
+
+    def __call__(self, query: str, texts: list[str]) -> list[float]:
+        terms = tokenize(query)
+        unique = set(terms)
+        bigrams = set(zip(terms, terms[1:]))
+        scores = []
+        for text in texts:
+            tokens = tokenize(text)
+            coverage = len(unique.intersection(tokens)) / len(unique) if unique else 0.0
+            if bigrams:
+                kept = len(bigrams.intersection(zip(tokens, tokens[1:]))) / len(bigrams)
+                scores.append(0.7 * coverage + 0.3 * kept)
+            else:
+                scores.append(coverage)
+        return scores
+
+
+class CrossEncoder:
+    """
+    Local ONNX cross-encoder scoring (query, text) pairs.
+
+    Args:
+        model_dir: Directory with model.onnx and tokenizer.json
+        threads: Intra-op threads per inference call (0 = ONNX Runtime default)
+    """
+
+    def __init__(self, model_dir: str | Path, threads: int = 0):
+        self.model_dir = Path(model_dir).expanduser()
+        self.threads = threads
+        self._session = None
+        self._tokenizer = None
+        self._inputs: set[str] = set()
+        self._lock = threading.Lock()
+
+    @property
+    def name(self) -> str:
+        return f"cross-encoder:{self.model_dir.name}"
+
+    def load(self) -> None:
+        """Load the model and tokenizer."""
+        if self._session is not None:
+            return
+        with self._lock:
+            if self._session is not None:
+                return
+            import onnxruntime as ort
+            from tokenizers import Tokenizer
+
+            if not (self.model_dir / "model.onnx").exists():
+                raise FileNotFoundError(f"No model.onnx in reranker model directory {self.model_dir}")
+            tokenizer = Tokenizer.from_file(str(self.model_dir / "tokenizer.json"))
+            tokenizer.enable_truncation(max_length=CROSS_ENCODER_MAX_TOKENS)
+            tokenizer.enable_padding()
+
+            options = ort.SessionOptions()
+            options.log_severity_level = 3
+            options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+            if self.threads:
+                options.intra_op_num_threads = self.threads
+                options.inter_op_num_threads = 1
+            session = ort.InferenceSession(
+                str(self.model_dir / "model.onnx"), sess_options=options, providers=["CPUExecutionProvider"]
+            )
+            self._inputs = {i.name for i in session.get_inputs()}
+            self._tokenizer = tokenizer
+            self._session = session
+
+    def __call__(self, query: str, texts: list[str]) -> list[float]:
+        import numpy as np
+        self.load()
+        encoded = self._tokenizer.encode_batch([(query, text) for text in texts])
+        feeds = {
+            "input_ids": np.array([e.ids for e in encoded], dtype=np.int64),
+            "attention_mask": np.array([e.attention_mask for e in encoded], dtype=np.int64),
+            "token_type_ids": np.array([e.type_ids for e in encoded], dtype=np.int64),
+        }
+        logits = self._session.run(None, {k: v for k, v in feeds.items() if k in self._inputs})[0]
+        # One relevance logit per pair (ms-marco style); squash to 0..1
+        return [0.5 * (1.0 + math.tanh(float(row) / 2)) for row in np.asarray(logits).reshape(len(texts), -1)[:, 0]]
+
+
+def make_scorer(kind: str, model_dir: str | None = None, threads: int = 0) -> Callable[[str, list[str]], list[float]]:
+    """
+    Build a scorer by name.
+
+    Raises:
+        ValueError: For an unknown scorer, or a cross-encoder without a model directory
+    """
+    if kind == "lexical":
+        return LexicalOverlap()
+    if kind == "cross-encoder":
+        if not model_dir:
+            raise ValueError("The cross-encoder reranker needs MCP_RERANK_MODEL (a directory with model.onnx)")
+        return CrossEncoder(model_dir, threads=threads)
+    raise ValueError(f"Unknown reranker '{kind}' (expected one of {', '.join(SCORERS)})")
+
+
+class Reranker:
+    """
+    Batched, cached pair scoring under a time budget.
+
+    Args:
+        scorer: Maps (query, texts) to one higher-is-better score per text
+        batch_size: Pairs per scorer call; the budget is checked between calls
+        cache_size: Cached (query, document) scores
+    """
+
+    def __init__(self, scorer: Callable[[str, list[str]], list[float]], batch_size: int = 16, cache_size: int = 16384):
+        self.scorer = scorer
+        self.batch_size = batch_size
+        self.cache = LRUCache(max_size=cache_size)
+        self.reranked = 0
+        self.stopped_early = 0
+        self.pairs_scored = 0
+        self.warmup_error: str | None = None
+
+    @property
+    def name(self) -> str:
+        return getattr(self.scorer, "name", type(self.scorer).__name__)
+
+    def warm_up(self) -> None:
+        """Load the scorer's model, if it has one, so the first rerank doesn't pay for it."""
+        load = getattr(self.scorer, "load", None)
+        if load is None:
+            return
+        try:
+            load()
+        except Exception as e:
+            self.warmup_error = str(e)
+            print(f"⚠️ Reranker warm-up failed: {e}", file=sys.stderr)
+
+    def score(self, query: str, ids: list[str], texts: list[str], budget: float) -> list[float] | None:
+        """
+        Score every hit against the query within `budget` seconds.
+
+        Returns:
+            One score per hit, or None when the budget ran out first
+        """
+        deadline = time.perf_counter() + budget
+        qkey = normalize_query(query)
+        keys = [
+            (qkey, doc_id, hashlib.blake2b((text or "").encode("utf-8"), digest_size=8).digest())
+            for doc_id, text in zip(ids, texts)
+        ]
+        scores: list[float | None] = [self.cache.get(key) for key in keys]
+        missing = [i for i, s in enumerate(scores) if s is None]
+        for start in range(0, len(missing), self.batch_size):
+            if time.perf_counter() >= deadline:
+                self.stopped_early += 1
+                return None
+            rows = missing[start:start + self.batch_size]
+            for i, value in zip(rows, self.scorer(query, [texts[i] or "" for i in rows])):
+                scores[i] = float(value)
+                self.cache.put(keys[i], scores[i])
+            self.pairs_scored += len(rows)
+        self.reranked += 1
+        return scores
+
+    def rerank(
+        self, query: str, results: dict[str, list], budget: float, candidates: int | None = None
+    ) -> dict[str, list] | None:
+        """
+        Reorder the first `candidates` hits of a query result by score.
+
+        Lists with one entry per hit are cut to the candidates and reordered
+        together; ties keep the first-stage order.
+
+        Returns:
+            The reranked result with one "scores" entry per hit, or None when
+            the budget ran out first
+        """
+        ids = results.get("ids") or []
+        n = len(ids) if candidates is None else min(candidates, len(ids))
+        scores = self.score(query, ids[:n], (results.get("documents") or [])[:n], budget)
+        if scores is None:
+            return None
+        order = sorted(range(n), key=lambda i: -scores[i])
+        reranked = {
+            key: [value[i] for i in order] if isinstance(value, list) and len(value) == len(ids) else value
+            for key, value in results.items()
+        }
+        reranked["scores"] = [scores[i] for i in order]
+        return reranked
+
+    def stats(self) -> dict[str, Any]:
+        """Scorer, completed and out-of-budget rerank counts and score-cache counters."""
+        return {
+            "scorer": self.name,
+            "reranked": self.reranked,
+            "stopped_early": self.stopped_early,
+            "pairs_scored": self.pairs_scored,
+            "warmup_error": self.warmup_error,
+            "score_cache": self.cache.stats(),
+        }
@@ -0,0 +1,137 @@
+"""
+Search result shaping.
+
+Turns ChromaDB hits into compact typed records for the structured (JSON)
+output mode, and renders the decorated human-readable text used by the
+opt-in text mode.
+"""
+import json
+from typing import Any, NotRequired, TypedDict
+
+from .chunking import CHUNK_KEYS, END_KEY, START_KEY
+from .ingest import HASH_KEY
+
+# Stored bookkeeping that is not part of a document's own metadata
+HIDDEN_KEYS = CHUNK_KEYS | {HASH_KEY}
+
+
+class SearchRecord(TypedDict):
+    """One search hit in the structured output mode."""
+
+    id: str
+    score: float
+    snippet: str
+    metadata: dict[str, Any]
+    span: NotRequired[list[int]]  # [start, end) of a chunk hit in its parent document
+
+
+class FederatedRecord(SearchRecord):
+    """A hit from a multi-collection search, tagged with its collection."""
+
+    collection: str
+
+
+def relevance(distance: float) -> float:
+    """Convert a ChromaDB distance to a 0..1 relevance score."""
+    return max(0.0, 1 - distance / 2)
+
+
+def snippet(text: str, limit: int) -> str:
+    """Truncate text to limit characters (0 or less means no limit)."""
+    if limit <= 0 or len(text) <= limit:
+        return text
+    return f"{text[:limit]}..."
+
+
+def project(metadata: dict[str, Any] | None, fields: list[str] | None) -> dict[str, Any]:
+    """Keep only the requested metadata fields (all of them when fields is None), without bookkeeping keys."""
+    if not metadata:
+        return {}
+    if fields is None:
+        return {k: v for k, v in metadata.items() if k not in HIDDEN_KEYS}
+    return {k: metadata[k] for k in fields if k in metadata and k not in HIDDEN_KEYS}
+
+
+def span(metadata: dict[str, Any] | None) -> list[int] | None:
+    """Character offsets of a chunk hit in its parent document, if it is one."""
+    if not metadata or START_KEY not in metadata or END_KEY not in metadata:
+        return None
+    return [metadata[START_KEY], metadata[END_KEY]]
+
+
+def build_records(
+    results: dict[str, list],
+    fields: list[str] | None = None,
+    snippet_chars: int = 300,
+) -> list[SearchRecord]:
+    """
+    Build structured records from one query's hits.
+
+    Args:
+        results: Dict with "ids", "documents", "metadatas" and "distances" lists;
+            an optional "scores" list (0..1, e.g. from lexical or fused ranking)
+            takes precedence over distances; an optional "collections" list
+            tags each record with the collection it came from
+        fields: Metadata fields to include (None = all, [] = none)
+        snippet_chars: Maximum characters of document text per record
+
+    Returns:
+        Records ordered by rank; chunk hits carry the matching "span"
+    """
+    documents = results.get("documents") or []
+    ids = results.get("ids") or [""] * len(documents)
+    metadatas = results.get("metadatas") or [{}] * len(documents)
+    scores = results.get("scores") or [
+        relevance(d) for d in (results.get("distances") or [0.0] * len(documents))
+    ]
+
+    records = []
+    for doc_id, doc, metadata, score in zip(ids, documents, metadatas, scores):
+        record = SearchRecord(
+            id=doc_id,
+            score=round(score, 4),
+            snippet=snippet(doc or "", snippet_chars),
+            metadata=project(metadata, fields),
+        )
+        offsets = span(metadata)
+        if offsets is not None:
+            record["span"] = offsets
+        records.append(record)
+    if results.get("collections"):
+        return [
+            FederatedRecord(collection=collection, **record)
+            for record, collection in zip(records, results["collections"])
+        ]
+    return records
+
+
+def format_text(
+    query: str,
+    results: dict[str, list],
+    fields: list[str] | None = None,
+    snippet_chars: int = 300,
+    start: int = 1,
+) -> str:
+    """Render one query's hits as the decorated human-readable search output, numbered from start."""
+    if not results.get("documents"):
+        return f"No documents found matching query: '{query}'"
+
+    formatted = [f"🔍 Search Results for: '{query}'\n"]
+    for i, record in enumerate(build_records(results, fields, snippet_chars), start):
+        source = f" | Collection: {record['collection']}" if "collection" in record else ""
+        formatted.append(
+            f"\n{'='*60}\n"
+            f"Result #{i} | Relevance: {record['score']:.1%}{source}\n"
+            f"{'-'*60}\n"
+            f"{record['snippet']}\n"
+        )
+
+        if record["metadata"]:
+            formatted.append(f"Metadata: {json.dumps(record['metadata'], indent=2)}")
+
+    return "".join(formatted)
+
+
+def to_json(payload: dict[str, Any]) -> str:
+    """Compact JSON encoding used for the text content of structured results."""
+    return json.dumps(payload, ensure_ascii=False, separators=(",", ":"))
@@ -5,115 +5,1615 @@ MCP Server for Document Search using ChromaDB.
 Provides semantic document search capabilities via the Model Context Protocol.
 """
 
-from fastmcp import FastMCP
-import json
+import os
+import sys
 from pathlib import Path
 
+# Make the `src` package importable when run as a script
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+SERVER_NAME = "Document Search Server"
+
+# Fast start on stdio: answer the handshake before importing fastmcp and the
+# rest of the server (src/handshake.py uses only the standard library)
+if (
+    __name__ == "__main__"
+    and os.getenv("MCP_TRANSPORT", "stdio") == "stdio"
+    and os.getenv("MCP_FAST_START", "1") == "1"
+):
+    from src.handshake import answer_early
+    answer_early(SERVER_NAME)
+
+from contextlib import asynccontextmanager, nullcontext
+from fastmcp import Context, FastMCP
+from fastmcp.tools.tool import ToolResult
+import asyncio
+import atexit
+import json
+import math
+import threading
+from collections import Counter
+from datetime import datetime, timezone
+from functools import partial
+from typing import Any, Literal
+
+from src.batching import QueryBatcher, run_grouped, split_query_result
+from src.catalog import CollectionCatalog
+from src.chunking import (
+    CHUNK_KEYS, INDEX_KEY, PARENT_KEY, chunk_documents, collapse_chunks, reconstruct, stale_ids,
+)
+from src.embedding import EmbeddingEngine
+from src.executor import BoundedExecutor, ServerBusyError
+from src.federation import distance_space, merge_scores, merge_top_k, resolve_collections
+from src.ingest import HASH_KEY, IngestReport, ingest_documents, normalize_documents
+from src.lexical import LexicalIndexManager, reciprocal_rank_fusion
+from src.metadata_index import MetadataIndexManager
+from src.metrics import Metrics, SamplingProfiler, ToolTimingMiddleware
+from src.pagination import CursorExpiredError, ResultPages, Snapshot, slice_results
+from src.query_cache import EmbeddingCache, ResultCache
+from src.replica import ReplicaPublisher, ReplicaWatcher
+from src.rerank import Reranker, make_scorer
+from src.snapshot import SUFFIX as SNAPSHOT_SUFFIX
+from src.snapshot import SnapshotReader, collection_settings, load_snapshot, write_snapshot
+from src.results import build_records, format_text, to_json
+from src.store import ChromaStore, CollectionNotFoundError
+
+ResponseFormat = Literal["json", "text"]
+SearchMode = Literal["vector", "lexical", "hybrid"]
+SnapshotDtype = Literal["float16", "int8", "float32"]
+
+DB_PATH = Path(os.getenv("MCP_CHROMA_PATH", Path(__file__).parent.parent / "chroma_db"))
+
+# Server-side indexes kept next to the ChromaDB directory
+INDEX_PATH = Path(os.getenv("MCP_INDEX_PATH", DB_PATH.parent / f"{DB_PATH.name}_index"))
+
+# Collection-handle cache tuning
+COLLECTION_CACHE_SIZE = int(os.getenv("MCP_COLLECTION_CACHE_SIZE", "64"))
+COLLECTION_CACHE_TTL = float(os.getenv("MCP_COLLECTION_CACHE_TTL", "300"))
+
+# Micro-batching of concurrent search_documents calls
+BATCH_WINDOW_MS = float(os.getenv("MCP_BATCH_WINDOW_MS", "5"))
+BATCH_MAX_SIZE = int(os.getenv("MCP_BATCH_MAX_SIZE", "64"))
+
+# Bounded executor for blocking ChromaDB / embedding calls
+EXECUTOR_WORKERS = int(os.getenv("MCP_EXECUTOR_WORKERS", "8"))
+EXECUTOR_QUEUE = int(os.getenv("MCP_EXECUTOR_QUEUE", "64"))
+COLLECTION_CONCURRENCY = int(os.getenv("MCP_COLLECTION_CONCURRENCY", "4"))
+
+# Hybrid search: candidates fetched from each ranking per requested result
+HYBRID_FETCH_FACTOR = int(os.getenv("MCP_HYBRID_FETCH_FACTOR", "4"))
+
+# Filtered search: candidate sets up to this size are searched directly by id
+PREFILTER_MAX_IDS = int(os.getenv("MCP_PREFILTER_MAX_IDS", "2000"))
+# Filters matching at least this share of a collection are applied after an unfiltered search
+POSTFILTER_MIN_SELECTIVITY = float(os.getenv("MCP_POSTFILTER_MIN_SELECTIVITY", "0.5"))
+# Metadata keys with more distinct values than this are not indexed for filters and facets
+METADATA_INDEX_MAX_VALUES = int(os.getenv("MCP_METADATA_INDEX_MAX_VALUES", "1000"))
+
+# Chunking: documents longer than MCP_CHUNK_TOKENS are stored as overlapping
+# windows (0 disables); searches over-fetch so chunks can collapse per document
+CHUNK_TOKENS = int(os.getenv("MCP_CHUNK_TOKENS", "256"))
+CHUNK_OVERLAP = int(os.getenv("MCP_CHUNK_OVERLAP", "32"))
+CHUNK_FETCH_FACTOR = int(os.getenv("MCP_CHUNK_FETCH_FACTOR", "3"))
+
+# Pagination: a search ranks this many pages up front (capped at
+# MCP_SEARCH_MAX_DEPTH hits) and keeps the rest for cursor-based paging
+SEARCH_PREFETCH_PAGES = int(os.getenv("MCP_SEARCH_PREFETCH_PAGES", "4"))
+SEARCH_MAX_DEPTH = int(os.getenv("MCP_SEARCH_MAX_DEPTH", "100"))
+CURSOR_CACHE_SIZE = int(os.getenv("MCP_CURSOR_CACHE_SIZE", "256"))
+CURSOR_CACHE_MB = float(os.getenv("MCP_CURSOR_CACHE_MB", "32"))
+CURSOR_TTL = float(os.getenv("MCP_CURSOR_TTL", "300"))
+
+# Federated search: deadline per collection (a late collection is left out of
+# the merged results) and the most collections one search may fan out to
+FEDERATED_TIMEOUT_MS = float(os.getenv("MCP_FEDERATED_TIMEOUT_MS", "2000"))
+FEDERATED_MAX_COLLECTIONS = int(os.getenv("MCP_FEDERATED_MAX_COLLECTIONS", "32"))
+
+# Second-stage reranking (search_documents rerank=True): "lexical" (term
+# overlap, no model) or "cross-encoder" (an ONNX model directory holding
+# model.onnx and tokenizer.json in MCP_RERANK_MODEL). Searches over-fetch
+# MCP_RERANK_CANDIDATES hits; past MCP_RERANK_BUDGET_MS the vector order is kept
+RERANK_MODEL = os.getenv("MCP_RERANK_MODEL")
+RERANKER = os.getenv("MCP_RERANKER", "cross-encoder" if RERANK_MODEL else "lexical")
+RERANK_CANDIDATES = int(os.getenv("MCP_RERANK_CANDIDATES", "50"))
+RERANK_BUDGET_MS = float(os.getenv("MCP_RERANK_BUDGET_MS", "250"))
+RERANK_BATCH_SIZE = int(os.getenv("MCP_RERANK_BATCH_SIZE", "16"))
+RERANK_CACHE_SIZE = int(os.getenv("MCP_RERANK_CACHE_SIZE", "16384"))
+
+# Bulk ingestion
+INGEST_BATCH_SIZE = int(os.getenv("MCP_INGEST_BATCH_SIZE", "1000"))
+INGEST_EMBED_WORKERS = int(os.getenv("MCP_INGEST_EMBED_WORKERS", "4"))
+# Directory export_collection writes to and import_collection reads from
+SNAPSHOT_PATH = Path(os.getenv("MCP_SNAPSHOT_PATH", DB_PATH.parent / f"{DB_PATH.name}_snapshots"))
+
+# Load the embedding model in the background at startup (the engine itself is
+# configured by MCP_EMBEDDING_* variables, shared with seed.py)
+EMBEDDING_PRELOAD = os.getenv("MCP_EMBEDDING_PRELOAD", "1") == "1"
+# Modules imported together with chromadb to register custom embedding functions
+# (comma-separated, e.g. "my_package.embeddings")
+EMBEDDING_MODULES = [m.strip() for m in os.getenv("MCP_EMBEDDING_MODULES", "").split(",") if m.strip()]
+
+# Answer the MCP handshake first and open ChromaDB / load the model in the
+# background (MCP_FAST_START=0 opens the store before the handshake)
+FAST_START = os.getenv("MCP_FAST_START", "1") == "1"
+# Pre-forked warm servers for MCP_TRANSPORT=warm-pool; clients attach with src/attach.py
+WARM_POOL_SOCKET = os.getenv("MCP_WARM_POOL_SOCKET", str(INDEX_PATH / "warm_pool.sock"))
+WARM_POOL_SIZE = int(os.getenv("MCP_WARM_POOL_SIZE", "2"))
+
+# Multi-process serving (MCP_TRANSPORT=cluster, see src/cluster.py): the
+# dispatcher listens on MCP_HOST/MCP_PORT and starts a writer plus
+# MCP_CLUSTER_WORKERS read-only workers on the following ports. MCP_ROLE is set
+# per process by the cluster: "writer" publishes index versions to
+# MCP_REPLICA_PATH at most every MCP_REPLICA_PUBLISH_INTERVAL seconds, "reader"
+# serves the newest one, checking every MCP_REPLICA_POLL_INTERVAL seconds
+ROLE = os.getenv("MCP_ROLE", "standalone")
+CLUSTER_WORKERS = int(os.getenv("MCP_CLUSTER_WORKERS", "4"))
+REPLICA_PATH = Path(os.getenv("MCP_REPLICA_PATH", DB_PATH.parent / f"{DB_PATH.name}_replicas"))
+REPLICA_PUBLISH_INTERVAL = float(os.getenv("MCP_REPLICA_PUBLISH_INTERVAL", "2"))
+REPLICA_POLL_INTERVAL = float(os.getenv("MCP_REPLICA_POLL_INTERVAL", "0.5"))
+REPLICA_KEEP = int(os.getenv("MCP_REPLICA_KEEP", "3"))
+# Serve HTTP without MCP sessions, so any request can be answered by any process
+STATELESS_HTTP = os.getenv("MCP_STATELESS_HTTP", "0") == "1"
+
+# Query-embedding and search-result caches
+EMBEDDING_CACHE_SIZE = int(os.getenv("MCP_EMBEDDING_CACHE_SIZE", "4096"))
+EMBEDDING_CACHE_MB = float(os.getenv("MCP_EMBEDDING_CACHE_MB", "64"))
+RESULT_CACHE_SIZE = int(os.getenv("MCP_RESULT_CACHE_SIZE", "1024"))
+RESULT_CACHE_MB = float(os.getenv("MCP_RESULT_CACHE_MB", "64"))
+RESULT_CACHE_TTL = float(os.getenv("MCP_RESULT_CACHE_TTL", "600"))
+# Cosine similarity for reusing a near-identical query's results (unset = exact only)
+SEMANTIC_CACHE_THRESHOLD = os.getenv("MCP_SEMANTIC_CACHE_THRESHOLD")
+
+# Timing spans per tool and per search stage (MCP_METRICS=0 turns them into no-ops)
+METRICS_ENABLED = os.getenv("MCP_METRICS", "1") != "0"
+# Serve the metrics in Prometheus text format at this path under the HTTP transport (unset = off)
+PROMETHEUS_PATH = os.getenv("MCP_PROMETHEUS_PATH")
+# Start the sampling profiler with the server (it can also be switched on at runtime)
+PROFILE_AT_START = os.getenv("MCP_PROFILE", "0") == "1"
+PROFILE_INTERVAL_MS = float(os.getenv("MCP_PROFILE_INTERVAL_MS", "5"))
+
+_metrics = Metrics(enabled=METRICS_ENABLED)
+_profiler = SamplingProfiler(interval=PROFILE_INTERVAL_MS / 1000)
+if PROFILE_AT_START:
+    _profiler.start()
+
+# One ChromaDB client for the whole process, shared by every tool call
+_store = ChromaStore(
+    DB_PATH,
+    cache_size=COLLECTION_CACHE_SIZE,
+    cache_ttl=COLLECTION_CACHE_TTL,
+    embedding_modules=EMBEDDING_MODULES,
+)
+atexit.register(_store.close)
+
+# Every blocking call runs here so the event loop keeps serving other clients
+_executor = BoundedExecutor(
+    max_workers=EXECUTOR_WORKERS,
+    max_queue=EXECUTOR_QUEUE,
+    per_collection=COLLECTION_CONCURRENCY,
+    metrics=_metrics,
+)
+
+# BM25 index per collection for lexical and hybrid search
+_lexical = LexicalIndexManager(INDEX_PATH / "lexical", read_only=ROLE == "reader")
+atexit.register(_lexical.flush, force=True)
+
+# Metadata value -> ids per collection for filter planning and facet counts
+_metadata = MetadataIndexManager(
+    max_values=METADATA_INDEX_MAX_VALUES, group_key=PARENT_KEY, exclude=CHUNK_KEYS | {HASH_KEY}
+)
+_filter_strategies: Counter[str] = Counter()
+
+# Per-collection statistics kept up to date on write, so listing is O(1)
+_catalog = CollectionCatalog(
+    INDEX_PATH / "catalog.json",
+    max_values=METADATA_INDEX_MAX_VALUES,
+    exclude=CHUNK_KEYS | {HASH_KEY},
+    is_document=lambda meta: meta.get(INDEX_KEY, 0) == 0,
+    # Cluster readers share a published version directory and never write to it
+    read_only=ROLE == "reader",
+)
+atexit.register(_catalog.flush, force=True)
+
+# Ranked result sets held for "next page" requests
+_pages = ResultPages(
+    max_entries=CURSOR_CACHE_SIZE,
+    max_bytes=int(CURSOR_CACHE_MB * 1024 * 1024),
+    ttl=CURSOR_TTL,
+    # Cluster workers tag their cursors so the dispatcher can route next pages back
+    owner=os.getenv("MCP_WORKER_NAME"),
+)
+
+# Batched local inference plus an on-disk cache of document embeddings
+_engine = EmbeddingEngine.from_env(INDEX_PATH)
+atexit.register(_engine.close)
+
+_embedding_cache = EmbeddingCache(
+    max_entries=EMBEDDING_CACHE_SIZE,
+    max_bytes=int(EMBEDDING_CACHE_MB * 1024 * 1024),
+    engine=_engine,
+)
+_reranker = Reranker(
+    make_scorer(RERANKER, RERANK_MODEL, threads=int(os.getenv("MCP_EMBEDDING_THREADS", "0"))),
+    batch_size=RERANK_BATCH_SIZE,
+    cache_size=RERANK_CACHE_SIZE,
+)
+_result_cache = ResultCache(
+    max_entries=RESULT_CACHE_SIZE,
+    max_bytes=int(RESULT_CACHE_MB * 1024 * 1024),
+    ttl=RESULT_CACHE_TTL,
+    similarity_threshold=float(SEMANTIC_CACHE_THRESHOLD) if SEMANTIC_CACHE_THRESHOLD else None,
+)
+
+
+def _flush_indexes() -> None:
+    _lexical.flush(force=True)
+    _catalog.flush(force=True)
+
+
+def _swap_replica(version: Path) -> None:
+    """Start serving a newly published index version (reader role)."""
+    with _metrics.span("replica.swap"):
+        _store.swap(version / "chroma")
+        _lexical.reset(version / "index" / "lexical")
+        _catalog.reload(version / "index" / "catalog.json")
+        _metadata.clear()
+
+
+# Writer: publishes what it writes; reader: follows what the writer publishes
+_publisher = (
+    ReplicaPublisher(
+        DB_PATH, INDEX_PATH, REPLICA_PATH,
+        interval=REPLICA_PUBLISH_INTERVAL, keep=REPLICA_KEEP, flush=_flush_indexes,
+    )
+    if ROLE == "writer" else None
+)
+_watcher = (
+    ReplicaWatcher(REPLICA_PATH, DB_PATH.parent.name, _swap_replica, interval=REPLICA_POLL_INTERVAL)
+    if ROLE == "reader" else None
+)
+
+
+def _writing() -> Any:
+    """Context held while a write is applied, so no index version is copied mid-write."""
+    return _publisher.lock.writing() if _publisher is not None else nullcontext()
+
+
+# Set once the store is open and the model loaded
+_warm = threading.Event()
+
+
+def _open_store() -> None:
+    try:
+        with _metrics.span("store.open"):
+            _store.open()
+    except ImportError:
+        pass  # Reported per call by the tools
+
+
+def _warm_up() -> None:
+    """
+    Open the ChromaDB client, load the catalog and the embedding model.
+
+    Tool calls arriving before it finishes simply wait for the store (or model)
+    they need; running it again is a no-op.
+    """
+    if _warm.is_set():
+        return
+    with _metrics.span("startup.warm_up"):
+        _open_store()
+        _ = _catalog.entries
+        if EMBEDDING_PRELOAD:
+            _engine.warm_up()
+            _reranker.warm_up()
+    _warm.set()
+
+
+@asynccontextmanager
+async def _lifespan(server):
+    """
+    Warm the server up: in the background under fast start, so the handshake
+    is answered while chromadb is still importing; otherwise the store opens
+    before the handshake and only the model loads in the background.
+    """
+    if not FAST_START:
+        _open_store()
+    for replication in (_publisher, _watcher):
+        if replication is not None:
+            replication.start()
+    warm_up = None
+    if not _warm.is_set() and (FAST_START or EMBEDDING_PRELOAD):
+        warm_up = asyncio.create_task(asyncio.to_thread(_warm_up))
+    try:
+        yield {"store": _store}
+    finally:
+        if warm_up is not None:
+            warm_up.cancel()
+
+
 # Create the MCP server
-mcp = FastMCP("Document Search Server")
+mcp = FastMCP(SERVER_NAME, lifespan=_lifespan)
+mcp.add_middleware(ToolTimingMiddleware(_metrics))
+if ROLE == "reader":
+    from src.cluster import ReadOnlyMiddleware
+    mcp.add_middleware(ReadOnlyMiddleware())
+
+
+def _run_query_batch(collection: str, queries: list[str], n_results: int) -> dict[str, Any]:
+    """
+    Run one vectorized ChromaDB query for several query texts.
+    
+    Embeddings come from the embedding cache and queries with cached results
+    are left out of the ChromaDB call entirely.
+    """
+    with _metrics.span("search.collection_lookup"):
+        coll = _store.get_collection(collection)
+    version = _store.version(collection)
+    with _metrics.span("search.embed"):
+        embeddings = _embedding_cache.embed(coll, queries)
+    
+    with _metrics.span("search.result_cache"):
+        per_query: list[dict[str, list] | None] = [
+            _result_cache.get(collection, version, emb, n_results) for emb in embeddings
+        ]
+    misses = [i for i, r in enumerate(per_query) if r is None]
+    if misses:
+        with _metrics.span("search.hnsw_query"):
+            results = coll.query(
+                query_embeddings=[embeddings[i] for i in misses],
+                n_results=n_results
+            )
+        for row, i in enumerate(misses):
+            per_query[i] = split_query_result(results, row, n_results)
+            _result_cache.put(collection, version, embeddings[i], n_results, per_query[i])
+    
+    # Re-assemble a ChromaDB-shaped QueryResult (one row per query)
+    return {
+        key: [r[key] for r in per_query]
+        for key in ("ids", "documents", "metadatas", "distances")
+    }
+
+
+def _cached_search(collection: str, query: str, n_results: int) -> dict[str, list] | None:
+    """Answer a search purely from in-memory caches, or return None."""
+    coll = _store.cached_collection(collection)
+    if coll is None:
+        return None
+    embedding = _embedding_cache.lookup(coll, query)
+    if embedding is None:
+        return None
+    return _result_cache.get(collection, _store.version(collection), embedding, n_results)
+
+
+# Merges concurrent single-query searches into one ChromaDB call per collection
+_batcher = QueryBatcher(
+    _run_query_batch,
+    window=BATCH_WINDOW_MS / 1000,
+    max_batch=BATCH_MAX_SIZE,
+    executor=_executor,
+)
+
+
+_EMPTY_RESULT: dict[str, list] = {"ids": [], "documents": [], "metadatas": [], "distances": []}
+
+
+def _filter_strategy(
+    candidates: set[str] | None, exact: bool, total: int, where_document: dict | None
+) -> str:
+    """
+    Choose how to apply a filter given the metadata index's candidate ids.
+
+    - "empty": no document can match
+    - "prefilter": the exact matches are known and few; search only those ids
+    - "postfilter": the filter keeps most documents; search unfiltered
+      (cached, batched) and drop the rest
+    - "pushdown": let ChromaDB apply the filter during the query
+
+    ChromaDB is slow when an id list is combined with where/where_document,
+    so ids are only passed on their own.
+    """
+    if candidates is None:
+        return "pushdown"
+    if not candidates:
+        return "empty"
+    if where_document is not None:
+        return "pushdown"
+    if exact and len(candidates) <= PREFILTER_MAX_IDS:
+        return "prefilter"
+    if total and len(candidates) / total >= POSTFILTER_MIN_SELECTIVITY:
+        return "postfilter"
+    return "pushdown"
+
+
+def _filtered_vector_search(
+    collection: str,
+    query: str,
+    n_results: int,
+    where: dict[str, Any] | None,
+    where_document: dict[str, Any] | None,
+) -> dict[str, list]:
+    """Vector search restricted by metadata and/or document-text filters."""
+    with _metrics.span("search.collection_lookup"):
+        coll = _store.get_collection(collection)
+    with _metrics.span("search.filter_plan"):
+        total = coll.count()
+        candidates, exact = _metadata.get(collection, coll).candidates(where)
+        strategy = _filter_strategy(candidates, exact, total, where_document)
+    _filter_strategies[strategy] += 1
+
+    if strategy == "empty":
+        return _EMPTY_RESULT
+
+    if strategy == "postfilter":
+        fetch_k = min(total, math.ceil(n_results * total / len(candidates) * 2))
+        results = split_query_result(_run_query_batch(collection, [query], fetch_k), 0, fetch_k)
+        matched = {doc_id for doc_id in results["ids"] if doc_id in candidates}
+        if matched and not exact:
+            # Candidates are a superset for partly-indexed filters: confirm with ChromaDB
+            with _metrics.span("search.filter_verify"):
+                matched = set(coll.get(ids=list(matched), where=where, include=[])["ids"])
+        keep = [i for i, doc_id in enumerate(results["ids"]) if doc_id in matched][:n_results]
+        if len(keep) >= n_results or fetch_k >= total:
+            return {key: [results[key][i] for i in keep] for key in _EMPTY_RESULT}
+        _filter_strategies["postfilter_fallback"] += 1
+
+    with _metrics.span("search.embed"):
+        embedding = _embedding_cache.embed(coll, [query])[0]
+    if strategy == "prefilter":
+        kwargs: dict[str, Any] = {"ids": list(candidates)}
+        n_results = min(n_results, len(candidates))
+    else:
+        kwargs = {"where": where or None, "where_document": where_document or None}
+    with _metrics.span(f"search.hnsw_query.{strategy}"):
+        results = coll.query(query_embeddings=[embedding], n_results=n_results, **kwargs)
+    return split_query_result(results, 0, n_results)
+
+
+async def _vector_search(
+    collection: str,
+    query: str,
+    n_results: int,
+    where: dict[str, Any] | None = None,
+    where_document: dict[str, Any] | None = None,
+) -> dict[str, list]:
+    """Dense search: served from the caches when possible, else micro-batched."""
+    if where or where_document:
+        return await _executor.run(
+            _filtered_vector_search, collection, query, n_results, where, where_document,
+            collection=collection,
+        )
+    with _metrics.span("search.cache_probe"):
+        cached = _cached_search(collection, query, n_results)
+    if cached is not None:
+        _metrics.count("search.cache_hit")
+        return cached
+    # Concurrent calls within the batching window share one ChromaDB query
+    return await _batcher.submit(collection, query, n_results)
+
+
+def _lexical_ranking(
+    collection: str, query: str, n_results: int, where: dict[str, Any] | None = None
+) -> list[tuple[str, float]]:
+    """
+    BM25 (id, score) pairs for a query, building the index on first use.
 
+    With a metadata filter only candidate ids are scored; when the metadata
+    index can't narrow the filter, extra hits are ranked for the caller to
+    filter.
+    """
+    coll = _store.get_collection(collection)
+    allowed, _ = _metadata.get(collection, coll).candidates(where)
+    if where and allowed is None:
+        n_results *= HYBRID_FETCH_FACTOR
+    with _metrics.span("search.bm25"):
+        return _lexical.get(collection, coll).search(query, n_results, allowed=allowed)
+
+
+def _fetch_documents(
+    collection: str,
+    ids: list[str],
+    where: dict[str, Any] | None = None,
+    where_document: dict[str, Any] | None = None,
+) -> dict[str, tuple[str, dict]]:
+    """Look up documents and metadata by id (no embedding), keeping those matching the filters."""
+    if not ids:
+        return {}
+    with _metrics.span("search.fetch_documents"):
+        got = _store.get_collection(collection).get(
+            ids=ids,
+            where=where or None,
+            where_document=where_document or None,
+            include=["documents", "metadatas"],
+        )
+    return {
+        doc_id: (doc, meta or {})
+        for doc_id, doc, meta in zip(got["ids"], got["documents"], got["metadatas"] or [{}] * len(got["ids"]))
+    }
+
+
+def _assemble(ranked: list[tuple[str, float]], docs: dict[str, tuple[str, dict]]) -> dict[str, list]:
+    """Build a result dict with explicit scores from ranked ids and fetched documents."""
+    ranked = [(doc_id, score) for doc_id, score in ranked if doc_id in docs]
+    return {
+        "ids": [doc_id for doc_id, _ in ranked],
+        "documents": [docs[doc_id][0] for doc_id, _ in ranked],
+        "metadatas": [docs[doc_id][1] for doc_id, _ in ranked],
+        "distances": [],
+        "scores": [score for _, score in ranked],
+    }
+
+
+def _lexical_search(
+    collection: str,
+    query: str,
+    n_results: int,
+    where: dict[str, Any] | None = None,
+    where_document: dict[str, Any] | None = None,
+) -> dict[str, list]:
+    """Pure BM25 search; scores are relative to the best hit."""
+    fetch_k = n_results * HYBRID_FETCH_FACTOR if where_document else n_results
+    ranked = _lexical_ranking(collection, query, fetch_k, where)
+    docs = _fetch_documents(collection, [doc_id for doc_id, _ in ranked], where, where_document)
+    ranked = [(doc_id, score) for doc_id, score in ranked if doc_id in docs][:n_results]
+    top = ranked[0][1] if ranked else 1.0
+    return _assemble([(doc_id, score / top) for doc_id, score in ranked], docs)
+
+
+async def _hybrid_search(
+    collection: str,
+    query: str,
+    n_results: int,
+    where: dict[str, Any] | None = None,
+    where_document: dict[str, Any] | None = None,
+) -> dict[str, list]:
+    """Fuse vector and BM25 rankings with reciprocal rank fusion."""
+    fetch_k = n_results * HYBRID_FETCH_FACTOR
+    vector, lexical = await asyncio.gather(
+        _vector_search(collection, query, fetch_k, where, where_document),
+        _executor.run(_lexical_ranking, collection, query, fetch_k, where, collection=collection),
+    )
 
-def _get_chroma_client():
-    """Helper function to get ChromaDB client."""
-    import chromadb
-    db_path = Path(__file__).parent.parent / "chroma_db"
-    return chromadb.PersistentClient(path=str(db_path))
+    docs = {
+        doc_id: (doc, meta or {})
+        for doc_id, doc, meta in zip(vector["ids"], vector["documents"], vector["metadatas"] or [{}] * len(vector["ids"]))
+    }
+    # Lexical-only hits are fetched (and checked against the filters) before fusing
+    extra = [doc_id for doc_id, _ in lexical if doc_id not in docs]
+    if extra:
+        docs.update(await _executor.run(
+            _fetch_documents, collection, extra, where, where_document, collection=collection
+        ))
+    lexical_ids = [doc_id for doc_id, _ in lexical if doc_id in docs]
+    fused = reciprocal_rank_fusion([vector["ids"], lexical_ids])[:n_results]
+    return _assemble(fused, docs)
+
+
+async def _search(
+    collection: str,
+    query: str,
+    n_results: int,
+    mode: SearchMode,
+    where: dict[str, Any] | None = None,
+    where_document: dict[str, Any] | None = None,
+) -> dict[str, list]:
+    """Run one search in the requested retrieval mode, one hit per document."""
+    fetch_k = _fetch_size(n_results)
+    if mode == "lexical":
+        # No embedding at all: BM25 plus an id lookup
+        results = await _executor.run(
+            _lexical_search, collection, query, fetch_k, where, where_document, collection=collection
+        )
+    elif mode == "hybrid":
+        results = await _hybrid_search(collection, query, fetch_k, where, where_document)
+    else:
+        results = await _vector_search(collection, query, fetch_k, where, where_document)
+    with _metrics.span("search.collapse"):
+        return collapse_chunks(results, n_results)
+
+
+def _fetch_size(n_results: int) -> int:
+    """Hits to fetch so that n_results remain after collapsing chunks per document."""
+    return n_results * CHUNK_FETCH_FACTOR if CHUNK_TOKENS > 0 else n_results
+
+
+def _embed_for_collections(collections: list[str], query: str) -> dict[str, tuple[str, str]]:
+    """
+    Embed a query once per embedding model among the collections.
+
+    The vectors land in the embedding cache, where each collection's search
+    picks them up.
+
+    Returns:
+        (embedding model, distance space) per collection
+    """
+    spaces: dict[str, tuple[str, str]] = {}
+    representatives: dict[str, Any] = {}
+    for name in collections:
+        try:
+            coll = _store.get_collection(name)
+        except CollectionNotFoundError:
+            continue  # deleted since the names were resolved; its search reports it
+        model = _embedding_cache.model(coll)
+        spaces[name] = (model, distance_space(coll))
+        representatives.setdefault(model, coll)
+    with _metrics.span("search.embed"):
+        for coll in representatives.values():
+            _embedding_cache.embed(coll, [query])
+    return spaces
+
+
+async def _federated_search(
+    collections: list[str],
+    query: str,
+    n_results: int,
+    mode: SearchMode,
+    where: dict[str, Any] | None = None,
+    where_document: dict[str, Any] | None = None,
+    timeout: float = FEDERATED_TIMEOUT_MS / 1000,
+) -> tuple[dict[str, list], list[dict[str, str]]]:
+    """
+    Search several collections in parallel and merge a global top n_results.
+
+    Every collection gets `timeout` seconds for its search; one that fails or
+    runs late is left out (its executor slot is released, the ChromaDB call
+    finishes in the background and still fills the caches).
+
+    Returns:
+        (merged results tagged with their collections, [{"collection", "error"}]
+        for the collections left out)
+    """
+    spaces: dict[str, tuple[str, str]] = {}
+    if mode != "lexical":
+        spaces = await _executor.run(_embed_for_collections, collections, query)
+    
+    async def search_one(name: str) -> dict[str, list]:
+        return await asyncio.wait_for(_search(name, query, n_results, mode, where, where_document), timeout)
+    
+    with _metrics.span("search.federated_fanout"):
+        outcomes = await asyncio.gather(*(search_one(name) for name in collections), return_exceptions=True)
+    
+    shards: dict[str, dict[str, list]] = {}
+    failed: list[dict[str, str]] = []
+    errors: list[BaseException] = []
+    for name, outcome in zip(collections, outcomes):
+        if isinstance(outcome, asyncio.TimeoutError):
+            _metrics.count("search.federated_timeout")
+            failed.append({"collection": name, "error": f"timed out after {timeout * 1000:.0f} ms"})
+        elif isinstance(outcome, CollectionNotFoundError):
+            failed.append({"collection": name, "error": "collection not found"})
+        elif isinstance(outcome, BaseException):
+            errors.append(outcome)
+            failed.append({"collection": name, "error": str(outcome)})
+        else:
+            shards[name] = outcome
+    if not shards and errors and all(isinstance(e, ValueError) for e in errors):
+        raise errors[0]  # an invalid filter fails every collection alike
+    
+    # Raw distances are only comparable within one embedding model and space
+    models = {spaces.get(name) for name in shards}
+    shared_space = mode == "vector" and len(models) == 1 and None not in models
+    with _metrics.span("search.federated_merge"):
+        merged = merge_top_k(shards, merge_scores(shards, shared_space), n_results, shared_space)
+    return merged, failed
+
+
+async def _rerank(query: str, results: dict[str, list], max_results: int) -> dict[str, list]:
+    """
+    Reorder the top hits by reranker score, within MCP_RERANK_BUDGET_MS.
+    
+    Only the first MCP_RERANK_CANDIDATES hits (at least max_results) are
+    rescored and kept. The budget covers waiting for an executor slot too; when
+    it runs out every hit keeps its original order and score.
+    """
+    budget = RERANK_BUDGET_MS / 1000
+    candidates = max(RERANK_CANDIDATES, max_results)
+    reranked = None
+    with _metrics.span("search.rerank"):
+        try:
+            reranked = await asyncio.wait_for(
+                _executor.run(_reranker.rerank, query, results, budget, candidates), budget
+            )
+        except asyncio.TimeoutError:
+            pass
+    if reranked is None:
+        _metrics.count("search.rerank_fallback")
+        return {**results, "rerank": {"scorer": _reranker.name, "applied": False}}
+    reranked["rerank"] = {"scorer": _reranker.name, "applied": True}
+    return reranked
+
+
+def _render(
+    query: str,
+    collection: str,
+    results: dict[str, list],
+    response_format: ResponseFormat,
+    fields: list[str] | None,
+    snippet_chars: int,
+    next_cursor: str | None = None,
+    offset: int = 0,
+    federation: dict[str, Any] | None = None,
+) -> ToolResult | str:
+    """
+    Return one query's hits as structured records or as decorated text.
+    
+    A federated search reports its searched and failed collections
+    (`federation`) in place of the single collection.
+    """
+    if response_format == "text":
+        text = format_text(query, results, fields, snippet_chars, start=offset + 1)
+        if federation and federation.get("failed"):
+            skipped = ", ".join(f"{f['collection']} ({f['error']})" for f in federation["failed"])
+            text += f"\n\n⚠️ Partial results, not searched: {skipped}"
+        if next_cursor:
+            text += f"\n\n➡️ More results: search again with cursor=\"{next_cursor}\""
+        return text
+    
+    payload: dict[str, Any] = {
+        "query": query,
+        **(federation or {"collection": collection}),
+        "results": build_records(results, fields, snippet_chars),
+    }
+    if "rerank" in results:
+        payload["rerank"] = results["rerank"]
+    if next_cursor:
+        payload["next_cursor"] = next_cursor
+    return ToolResult(content=to_json(payload), structured_content=payload)
+
+
+async def _stream(
+    ctx: Context, held: dict[str, list], offset: int, fields: list[str] | None, snippet_chars: int
+) -> None:
+    """
+    Send every held hit from `offset` on, best first, as MCP progress notifications.
+    
+    That covers the returned page and the deeper hits behind its next_cursor,
+    so a client with a progress handler gets the whole held ranking from one
+    call. Progress counts are ranks within the held set.
+    """
+    total = len(held.get("ids") or [])
+    records = build_records(slice_results(held, offset, total), fields, snippet_chars)
+    for rank, record in enumerate(records, offset + 1):
+        await ctx.report_progress(rank, total, message=to_json(record))
 
 
 @mcp.tool()
-def search_documents(
+async def search_documents(
     query: str,
     collection: str = "default",
-    max_results: int = 5
-) -> str:
+    collections: list[str] | None = None,
+    max_results: int = 5,
+    mode: SearchMode = "vector",
+    where: dict[str, Any] | None = None,
+    where_document: dict[str, Any] | None = None,
+    response_format: ResponseFormat = "json",
+    fields: list[str] | None = None,
+    snippet_chars: int = 300,
+    cursor: str | None = None,
+    stream: bool = False,
+    timeout_ms: float | None = None,
+    rerank: bool = False,
+    ctx: Context | None = None
+) -> ToolResult | str:
     """
-    Search through stored documents using semantic search.
+    Search through stored documents using semantic, keyword or hybrid search.
+    
+    Filters use ChromaDB syntax and are applied inside the search, so
+    max_results counts only matching documents. When more hits exist, the
+    response includes a next_cursor; pass it back as cursor to get the next
+    page instantly from the server-held ranking. A search holds at most
+    min(max_results * MCP_SEARCH_PREFETCH_PAGES (4), MCP_SEARCH_MAX_DEPTH (100))
+    hits, so paging stops there; narrow the query or filters to reach deeper.
+    
+    With `collections`, the collections are searched in parallel and their
+    hits merged into one ranking (on raw distances when the collections share
+    an embedding model and distance space, else by reciprocal rank fusion);
+    each hit names its collection. A collection that fails or misses the
+    timeout is listed under "failed" and the others are still returned.
+    
+    With `rerank`, more candidates are fetched and rescored by the server's
+    reranker (MCP_RERANKER) before the top max_results are returned; if the
+    reranker can't finish within its latency budget, the original order is kept
+    and the response says "applied": false.
     
     Args:
-        query: The search query for semantic matching
+        query: The search query
         collection: The document collection to search in (default: "default")
+        collections: Search several collections at once: names and/or globs
+            such as ["docs-*", "faq"] (overrides collection)
         max_results: Maximum number of results to return (default: 5)
+        mode: "vector" (semantic), "lexical" (BM25 keywords, best for exact names
+            and identifiers) or "hybrid" (both, fused by rank) (default: "vector")
+        where: Metadata filter, e.g. {"category": "science"} or
+            {"$and": [{"category": {"$in": ["science", "history"]}}, {"difficulty": "intermediate"}]}
+        where_document: Document text filter, e.g. {"$contains": "quantum"}
+        response_format: "json" for compact records, "text" for a readable report
+        fields: Metadata fields to include per hit (default: all)
+        snippet_chars: Maximum characters of document text per hit, 0 for full text (default: 300)
+        cursor: next_cursor from a previous response; returns that search's next
+            page (the other search arguments are ignored)
+        stream: Also send this page's hits and the deeper held ones behind
+            next_cursor, best first, as progress notifications (message = the
+            hit's JSON record)
+        timeout_ms: Per-collection deadline when searching several collections
+            (default: MCP_FEDERATED_TIMEOUT_MS)
+        rerank: Rescore over-fetched candidates with the second-stage reranker
     
     Returns:
-        Matching documents with relevance scores and metadata
+        Matching documents as {"query", "collection", "results": [{"id", "score", "snippet", "metadata", "span"?}],
+        "next_cursor"?}, or a formatted report when response_format is "text"; with collections,
+        {"query", "collections", "failed", "results": [{..., "collection"}], "next_cursor"?}; reranked
+        searches add "rerank": {"scorer", "applied"}
     """
     try:
-        client = _get_chroma_client()
+        offset = 0
+        federation = None
+        if cursor:
+            try:
+                snapshot, offset, results, next_cursor = _pages.next_page(cursor)
+            except CursorExpiredError as e:
+                return f"❌ {str(e)}"
+            query, collection, federation = snapshot.query, snapshot.collection, snapshot.federation
+            held = snapshot.results
+        else:
+            depth = min(max_results * max(SEARCH_PREFETCH_PAGES, 1), max(SEARCH_MAX_DEPTH, max_results))
+            if rerank:
+                depth = max(depth, RERANK_CANDIDATES)
+            try:
+                if collections:
+                    with _metrics.span("search.federated_resolve"):
+                        available = await _executor.run(_store.collection_names)
+                        names, unmatched = resolve_collections(collections, available)
+                    if not names:
+                        return f"❌ No collections match {collections}.\nAvailable collections: {available}"
+                    if len(names) > FEDERATED_MAX_COLLECTIONS:
+                        return (
+                            f"❌ {len(names)} collections match {collections}; at most "
+                            f"{FEDERATED_MAX_COLLECTIONS} can be searched at once (MCP_FEDERATED_MAX_COLLECTIONS)."
+                        )
+                    timeout = (timeout_ms if timeout_ms is not None else FEDERATED_TIMEOUT_MS) / 1000
+                    ranked, failed = await _federated_search(
+                        names, query, depth, mode, where, where_document, timeout
+                    )
+                    failed += [{"collection": name, "error": "no matching collection"} for name in unmatched]
+                    collection = ",".join(names)
+                    federation = {"collections": names, "failed": failed}
+                else:
+                    ranked = await _search(collection, query, depth, mode, where, where_document)
+            except CollectionNotFoundError as e:
+                return f"❌ Collection '{collection}' not found.\nAvailable collections: {e.available}"
+            except ValueError as e:
+                return f"❌ Invalid filter: {str(e)}"
+            if rerank:
+                ranked = await _rerank(query, ranked, max_results)
+            with _metrics.span("search.paginate"):
+                results, next_cursor = _pages.first_page(
+                    Snapshot(query, collection, ranked, max_results, federation)
+                )
+            held = ranked
         
-        # Get collection
-        try:
-            coll = client.get_collection(name=collection)
-        except Exception:
-            available = [c.name for c in client.list_collections()]
-            return f"❌ Collection '{collection}' not found.\nAvailable collections: {available}"
-        
-        # Perform semantic search
-        results = coll.query(
-            query_texts=[query],
-            n_results=max_results
-        )
+        if stream and ctx is not None:
+            with _metrics.span("search.stream"):
+                await _stream(ctx, held, offset, fields, snippet_chars)
         
-        if not results['documents'] or not results['documents'][0]:
-            return f"No documents found matching query: '{query}'"
-        
-        # Format results
-        formatted = [f"🔍 Search Results for: '{query}'\n"]
-        for i, (doc, metadata, distance) in enumerate(zip(
-            results['documents'][0],
-            results['metadatas'][0] if results['metadatas'] else [{}] * len(results['documents'][0]),
-            results['distances'][0] if results['distances'] else [0] * len(results['documents'][0])
-        ), 1):
-            relevance = max(0, 1 - distance / 2)  # Convert distance to relevance score
-            
-            # Show full content or truncate
-            content = doc if len(doc) <= 300 else f"{doc[:300]}..."
-            
-            formatted.append(
-                f"\n{'='*60}\n"
-                f"Result #{i} | Relevance: {relevance:.1%}\n"
-                f"{'-'*60}\n"
-                f"{content}\n"
+        with _metrics.span("search.format"):
+            return _render(
+                query, collection, results, response_format, fields, snippet_chars, next_cursor, offset, federation
             )
+        
+    except ServerBusyError as e:
+        return f"❌ {str(e)}"
+    except ImportError:
+        return "❌ ChromaDB not available. Install with: uv pip install chromadb"
+    except Exception as e:
+        return f"❌ Error searching documents: {str(e)}"
+
+
+@mcp.tool()
+async def search_documents_batch(
+    queries: list[str | dict[str, Any]],
+    collection: str = "default",
+    max_results: int = 5,
+    response_format: ResponseFormat = "json",
+    fields: list[str] | None = None,
+    snippet_chars: int = 300
+) -> ToolResult | str:
+    """
+    Run several semantic searches in one call.
+    
+    Queries are grouped per collection and each group is embedded and searched
+    with a single vectorized ChromaDB query.
+    
+    Args:
+        queries: Query strings, or objects like
+            {"query": "...", "collection": "...", "max_results": 3}
+        collection: Collection for queries that don't name one (default: "default")
+        max_results: Result limit for queries that don't set one (default: 5)
+        response_format: "json" for compact records, "text" for a readable report
+        fields: Metadata fields to include per hit (default: all)
+        snippet_chars: Maximum characters of document text per hit, 0 for full text (default: 300)
+    
+    Returns:
+        Search results for every query, in the order given; in JSON mode
+        {"searches": [{"query", "collection", "results": [...]} or {"query", "collection", "error"}]}
+    """
+    try:
+        requests = []
+        for item in queries:
+            if isinstance(item, str):
+                item = {"query": item}
+            if not item.get("query"):
+                return f"❌ Every batch entry needs a 'query': {json.dumps(item)}"
+            requests.append((
+                item.get("collection", collection),
+                item["query"],
+                _fetch_size(int(item.get("max_results", max_results))),
+                int(item.get("max_results", max_results)),
+            ))
+        
+        if not requests:
+            return "❌ No queries given."
+        
+        # One vectorized query per collection, collections searched in parallel
+        groups: dict[str, list[int]] = {}
+        for i, (coll_name, _, _, _) in enumerate(requests):
+            groups.setdefault(coll_name, []).append(i)
+        
+        group_results = await asyncio.gather(*[
+            _executor.run(run_grouped, _run_query_batch, [requests[i][:3] for i in indices], collection=coll_name)
+            for coll_name, indices in groups.items()
+        ])
+        
+        results: list[Any] = [None] * len(requests)
+        for indices, group in zip(groups.values(), group_results):
+            for i, result in zip(indices, group):
+                n = requests[i][3]
+                results[i] = result if isinstance(result, Exception) else collapse_chunks(result, n)
+        
+        searches = []
+        sections = []
+        for (coll_name, query, _, _), result in zip(requests, results):
+            if isinstance(result, CollectionNotFoundError):
+                error = f"Collection '{coll_name}' not found. Available collections: {result.available}"
+            elif isinstance(result, Exception):
+                error = f"Error searching '{coll_name}' for '{query}': {str(result)}"
+            else:
+                error = None
             
-            if metadata:
-                formatted.append(f"Metadata: {json.dumps(metadata, indent=2)}")
+            if response_format == "text":
+                text = f"❌ {error}" if error else format_text(query, result, fields, snippet_chars)
+                sections.append(f"### [{coll_name}] {query}\n{text}")
+            elif error:
+                searches.append({"query": query, "collection": coll_name, "error": error})
+            else:
+                searches.append({
+                    "query": query,
+                    "collection": coll_name,
+                    "results": build_records(result, fields, snippet_chars),
+                })
         
-        return "".join(formatted)
+        if response_format == "text":
+            return "\n\n".join(sections)
+        payload = {"searches": searches}
+        return ToolResult(content=to_json(payload), structured_content=payload)
         
+    except ServerBusyError as e:
+        return f"❌ {str(e)}"
     except ImportError:
         return "❌ ChromaDB not available. Install with: uv pip install chromadb"
     except Exception as e:
-        return f"❌ Error searching documents: {str(e)}"
+        return f"❌ Error running batch search: {str(e)}"
+
+
+def _format_bytes(n: float) -> str:
+    for unit in ("B", "KB", "MB"):
+        if n < 1024:
+            return f"{n:.0f} {unit}" if unit == "B" else f"{n:.1f} {unit}"
+        n /= 1024
+    return f"{n:.1f} GB"
+
+
+def _format_collection(stats: dict[str, Any]) -> str:
+    """One list_collections entry: counts and size, then metadata keys."""
+    count = stats["documents"]
+    line = f"  • {stats['name']}: {count} document{'s' if count != 1 else ''}"
+    details = []
+    if stats["entries"] != count:
+        details.append(f"{stats['entries']} chunks")
+    details.append(_format_bytes(stats["bytes"]))
+    if stats["dimension"]:
+        details.append(f"dim {stats['dimension']}")
+    if stats["modified"]:
+        details.append("updated " + datetime.fromtimestamp(stats["modified"], timezone.utc).strftime("%Y-%m-%d %H:%M UTC"))
+    line += f" ({', '.join(details)})"
+    keys = [
+        f"{key} ({METADATA_INDEX_MAX_VALUES}+)" if n is None else f"{key} ({n})"
+        for key, n in stats["metadata_keys"].items()
+    ]
+    if keys:
+        line += "\n      keys: " + ", ".join(keys)
+    return line
 
 
 @mcp.tool()
-def list_collections() -> str:
+async def list_collections(
+    refresh: bool = False,
+    response_format: ResponseFormat = "text"
+) -> ToolResult | str:
     """
     List all available document collections with statistics.
     
+    Answered from a statistics catalog that the server updates on every write,
+    so no collection is counted or scanned per call. Pass refresh=True to
+    rescan every collection, e.g. after writes made outside this server.
+    
+    Args:
+        refresh: Rebuild every collection's statistics from the database first
+        response_format: "text" for a readable list, "json" for structured stats
+    
     Returns:
-        List of collection names with document counts
+        Collection names with document counts, stored text size, embedding
+        dimension, last write time and distinct values per metadata key
     """
+    def _reconcile() -> None:
+        # New, deleted or externally modified collections are picked up once per process
+        _catalog.reconcile(_store.list_collections(), full=refresh)
+    
     try:
-        client = _get_chroma_client()
-        collections = client.list_collections()
+        if refresh or not _catalog.reconciled:
+            await _executor.run(_reconcile)
+        collections = [stats.summary() for stats in _catalog.all()]
+        
+        if response_format == "json":
+            payload = {"collections": collections}
+            return ToolResult(content=to_json(payload), structured_content=payload)
         
         if not collections:
             return "📚 No collections found in the database.\n\nTip: Use add_document() to create your first collection and add documents."
         
-        result = ["📚 Available Collections:\n"]
-        for coll in collections:
-            count = coll.count()
-            result.append(f"  • {coll.name}: {count} document{'s' if count != 1 else ''}")
-        
-        return "\n".join(result)
+        return "\n".join(["📚 Available Collections:\n"] + [_format_collection(c) for c in collections])
         
+    except ServerBusyError as e:
+        return f"❌ {str(e)}"
     except ImportError:
         return "❌ ChromaDB not available. Install with: uv pip install chromadb"
     except Exception as e:
         return f"❌ Error listing collections: {str(e)}"
 
 
+@mcp.tool()
+async def facets(
+    collection: str = "default",
+    keys: list[str] | None = None,
+    limit: int = 20
+) -> ToolResult | str:
+    """
+    Count documents per metadata value in a collection.
+    
+    Useful for discovering which values `where` filters can use. Counts come
+    from an in-memory metadata index, so no documents are scanned per call.
+    
+    Args:
+        collection: The collection to summarize (default: "default")
+        keys: Metadata keys to count (default: all indexed keys)
+        limit: Most frequent values returned per key (default: 20)
+    
+    Returns:
+        {"collection", "documents", "facets": {key: {value: count}}, "high_cardinality": [keys not counted]}
+    """
+    def _facets() -> dict[str, Any]:
+        coll = _store.get_collection(collection)
+        index = _metadata.get(collection, coll)
+        return {
+            "collection": collection,
+            "documents": index.documents,
+            "facets": index.facets(keys, limit),
+            "high_cardinality": sorted(index.high_cardinality),
+        }
+    
+    try:
+        payload = await _executor.run(_facets, collection=collection)
+        return ToolResult(content=to_json(payload), structured_content=payload)
+        
+    except CollectionNotFoundError as e:
+        return f"❌ Collection '{collection}' not found.\nAvailable collections: {e.available}"
+    except ServerBusyError as e:
+        return f"❌ {str(e)}"
+    except ImportError:
+        return "❌ ChromaDB not available. Install with: uv pip install chromadb"
+    except Exception as e:
+        return f"❌ Error counting facets: {str(e)}"
+
+
+def _after_write(collection: str, coll: Any = None) -> None:
+    """Make caches that depend on a collection's contents go stale."""
+    _store.bump_version(collection)
+    _result_cache.invalidate_collection(collection)
+    _lexical.flush()
+    _catalog.touch(collection, coll)
+    _catalog.flush()
+    if _publisher is not None:
+        _publisher.mark_dirty()
+
+
+def _delete_ids(coll: Any, collection: str, ids: list[str]) -> None:
+    """Delete stored units and drop them from the side indexes."""
+    old = coll.get(ids=ids, include=["documents", "metadatas"]) if collection in _catalog else None
+    coll.delete(ids=ids)
+    if old is not None:
+        _catalog.remove(collection, old["documents"], old["metadatas"])
+    _lexical.remove(collection, ids)
+    _metadata.remove(collection, ids)
+
+
+def _index_write(collection: str, ids: list[str], texts: list[str], metadatas: list[dict[str, Any]]) -> None:
+    """Keep the side indexes of a collection in sync with an upsert."""
+    with _metrics.span("ingest.index_update"):
+        _lexical.upsert(collection, ids, texts)
+        _metadata.upsert(collection, ids, metadatas)
+        _catalog.add(collection, texts, metadatas)
+
+
+def _progress_reporter(ctx: Context | None) -> Any:
+    """Callback reporting (done, total) progress to the client from a worker thread."""
+    if ctx is None:
+        return None
+    loop = asyncio.get_running_loop()
+    
+    def on_progress(done: int, total: int) -> None:
+        asyncio.run_coroutine_threadsafe(ctx.report_progress(done, total), loop)
+    
+    return on_progress
+
+
+async def _ingest(
+    documents: list[dict[str, Any]],
+    collection: str,
+    ctx: Context | None = None,
+) -> IngestReport:
+    """Normalize and upsert documents off the event loop, reporting progress."""
+    normalized = normalize_documents(documents)
+    
+    on_progress = _progress_reporter(ctx)
+    
+    with _metrics.span("ingest.chunk"):
+        units = chunk_documents(normalized, CHUNK_TOKENS, CHUNK_OVERLAP)
+    
+    def _write() -> IngestReport:
+        with _writing():
+            return _apply()
+    
+    def _apply() -> IngestReport:
+        coll = _store.get_or_create_collection(collection)
+        _catalog.ensure(collection, coll)
+        try:
+            with _metrics.span("ingest.write"):
+                report = ingest_documents(
+                    coll,
+                    units,
+                    batch_size=min(INGEST_BATCH_SIZE, _store.client.get_max_batch_size()),
+                    embed_workers=INGEST_EMBED_WORKERS,
+                    on_progress=on_progress,
+                    on_write=lambda ids, texts, metadatas: _index_write(collection, ids, texts, metadatas),
+                    on_replace=lambda ids, texts, metadatas: _catalog.remove(collection, texts, metadatas),
+                    embed=lambda texts: _engine.embed(coll, texts),
+                    group_key=PARENT_KEY,
+                )
+            # Drop chunks left over from an earlier, longer version of a document
+            with _metrics.span("ingest.stale_cleanup"):
+                stale = stale_ids(coll, normalized, units)
+                if stale:
+                    _delete_ids(coll, collection, stale)
+        finally:
+            _after_write(collection, coll)
+        report.received = len(normalized)
+        report.chunks = len(units)
+        report.ids = [doc_id for doc_id, _, _ in normalized]
+        return report
+    
+    return await _executor.run(_write, collection=collection)
+
+
+def _format_report(report: IngestReport, collection: str) -> str:
+    return (
+        f"✅ Ingested {report.received} document{'s' if report.received != 1 else ''} into '{collection}'\n"
+        f"  • added: {report.added}\n"
+        f"  • updated: {report.updated}\n"
+        f"  • skipped (unchanged): {report.skipped}\n"
+        + (f"  • stored as {report.chunks} chunks\n" if report.chunks != report.received else "")
+        + f"  • time: {report.seconds:.2f}s ({report.docs_per_sec:.0f} docs/sec)"
+    )
+
+
+@mcp.tool()
+async def add_document(
+    content: str,
+    document_name: str | None = None,
+    source: str | None = None,
+    metadata: dict[str, Any] | None = None,
+    document_id: str | None = None,
+    collection: str = "default",
+    ctx: Context | None = None
+) -> str:
+    """
+    Add a single document (or update it if the ID already exists).
+    
+    Args:
+        content: The document text
+        document_name: Optional title stored as metadata
+        source: Optional source (URL, file path, ...) stored as metadata
+        metadata: Optional extra metadata fields
+        document_id: Optional ID; derived from the content hash if omitted
+        collection: Collection to add to, created if missing (default: "default")
+    
+    Returns:
+        The document ID and whether it was added, updated or unchanged
+    """
+    try:
+        meta = dict(metadata or {})
+        if source:
+            meta["source"] = source
+        doc = {"content": content, "title": document_name, "metadata": meta, "id": document_id}
+        
+        report = await _ingest([doc], collection, ctx)
+        status = "added" if report.added else "updated" if report.updated else "unchanged"
+        return f"✅ Document {status} in '{collection}'\nID: {report.ids[0]}"
+        
+    except (ValueError, ServerBusyError) as e:
+        return f"❌ {str(e)}"
+    except ImportError:
+        return "❌ ChromaDB not available. Install with: uv pip install chromadb"
+    except Exception as e:
+        return f"❌ Error adding document: {str(e)}"
+
+
+@mcp.tool()
+async def add_documents_batch(
+    documents: list[dict[str, Any]],
+    collection: str = "default",
+    ctx: Context | None = None
+) -> str:
+    """
+    Add or update many documents at once.
+    
+    Documents are written in chunks of ChromaDB's maximum batch size and
+    embedded in parallel worker threads. Documents whose content hash is
+    unchanged are skipped, so re-ingesting the same data is cheap.
+    
+    Args:
+        documents: Objects like {"content": "...", "title": "...", "metadata": {...}, "id": "..."};
+            only "content" is required
+        collection: Collection to add to, created if missing (default: "default")
+    
+    Returns:
+        Counts of added, updated and skipped documents plus throughput
+    """
+    try:
+        if not documents:
+            return "❌ No documents given."
+        
+        report = await _ingest(documents, collection, ctx)
+        return _format_report(report, collection)
+        
+    except (ValueError, ServerBusyError) as e:
+        return f"❌ {str(e)}"
+    except ImportError:
+        return "❌ ChromaDB not available. Install with: uv pip install chromadb"
+    except Exception as e:
+        return f"❌ Error adding documents: {str(e)}"
+
+
+@mcp.tool()
+async def get_document_by_id(
+    document_id: str,
+    collection: str = "default"
+) -> str:
+    """
+    Retrieve a specific document by its ID.
+    
+    Args:
+        document_id: The document ID
+        collection: The collection holding the document (default: "default")
+    
+    Returns:
+        The full document content and metadata
+    """
+    def _get() -> str:
+        try:
+            coll = _store.get_collection(collection)
+        except CollectionNotFoundError as e:
+            return f"❌ Collection '{collection}' not found.\nAvailable collections: {e.available}"
+        
+        result = coll.get(ids=[document_id], include=["documents", "metadatas"])
+        if result['ids']:
+            content = result['documents'][0]
+            metadata = result['metadatas'][0] if result['metadatas'] else None
+        else:
+            # Chunked documents are stitched back together from their chunks
+            chunks = coll.get(where={PARENT_KEY: document_id}, include=["documents", "metadatas"])
+            if not chunks['ids']:
+                return f"❌ Document '{document_id}' not found in '{collection}'"
+            content, metadata = reconstruct(list(zip(chunks['documents'], chunks['metadatas'])))
+        # The content hash is ingestion bookkeeping, not part of the document
+        metadata = {k: v for k, v in (metadata or {}).items() if k != HASH_KEY}
+        
+        formatted = f"📄 Document {document_id}\n{'-'*60}\n{content}\n"
+        if metadata:
+            formatted += f"Metadata: {json.dumps(metadata, indent=2)}"
+        return formatted
+    
+    try:
+        return await _executor.run(_get, collection=collection)
+        
+    except ServerBusyError as e:
+        return f"❌ {str(e)}"
+    except ImportError:
+        return "❌ ChromaDB not available. Install with: uv pip install chromadb"
+    except Exception as e:
+        return f"❌ Error getting document: {str(e)}"
+
+
+@mcp.tool()
+async def delete_document(
+    document_id: str,
+    collection: str = "default"
+) -> str:
+    """
+    Remove a document from a collection.
+    
+    Args:
+        document_id: The document ID
+        collection: The collection holding the document (default: "default")
+    
+    Returns:
+        Confirmation message
+    """
+    def _delete() -> str:
+        try:
+            coll = _store.get_collection(collection)
+        except CollectionNotFoundError as e:
+            return f"❌ Collection '{collection}' not found.\nAvailable collections: {e.available}"
+        
+        ids = coll.get(ids=[document_id], include=[])['ids']
+        ids += coll.get(where={PARENT_KEY: document_id}, include=[])['ids']
+        if not ids:
+            return f"❌ Document '{document_id}' not found in '{collection}'"
+        
+        with _writing():
+            _delete_ids(coll, collection, ids)
+            _after_write(collection, coll)
+        return f"🗑️ Deleted document '{document_id}' from '{collection}'"
+    
+    try:
+        return await _executor.run(_delete, collection=collection)
+        
+    except ServerBusyError as e:
+        return f"❌ {str(e)}"
+    except ImportError:
+        return "❌ ChromaDB not available. Install with: uv pip install chromadb"
+    except Exception as e:
+        return f"❌ Error deleting document: {str(e)}"
+
+
+def _snapshot_file(name: str) -> Path:
+    """Resolve a snapshot name to its file in MCP_SNAPSHOT_PATH."""
+    if not name or Path(name).name != name or name.startswith("."):
+        raise ValueError(f"Invalid snapshot name '{name}': expected a plain file name")
+    return SNAPSHOT_PATH / (name if name.endswith(SNAPSHOT_SUFFIX) else name + SNAPSHOT_SUFFIX)
+
+
+def _snapshot_names() -> list[str]:
+    return sorted(p.name for p in SNAPSHOT_PATH.glob(f"*{SNAPSHOT_SUFFIX}"))
+
+
+@mcp.tool()
+async def export_collection(
+    collection: str = "default",
+    name: str | None = None,
+    dtype: SnapshotDtype = "float16",
+    ctx: Context | None = None
+) -> str:
+    """
+    Export a collection, with its embeddings, to a snapshot file.
+    
+    The snapshot holds ids, documents, metadata and stored vectors in a
+    compact, checksummed binary file; import_collection restores it here or
+    on another server without re-embedding anything.
+    
+    Args:
+        collection: Collection to export (default: "default")
+        name: Snapshot file name in the server's snapshot directory (default: the collection name)
+        dtype: Stored vector precision: "float16" (default), "int8" (smallest) or "float32" (exact)
+    
+    Returns:
+        The snapshot's path, size and entry count
+    """
+    def _export() -> str:
+        try:
+            coll = _store.get_collection(collection)
+        except CollectionNotFoundError as e:
+            return f"❌ Collection '{collection}' not found.\nAvailable collections: {e.available}"
+        
+        with _metrics.span("snapshot.export"):
+            info = write_snapshot(coll, path, dtype=dtype, on_progress=on_progress)
+        return (
+            f"📦 Exported {info.count:,} entries from '{collection}' in {info.seconds:.2f}s\n"
+            f"File: {info.path} ({info.size / 1024 / 1024:.1f} MB, {info.dtype} vectors)\n"
+            f"SHA-256: {info.sha256}"
+        )
+    
+    try:
+        path = _snapshot_file(name or collection)
+        on_progress = _progress_reporter(ctx)
+        return await _executor.run(_export, collection=collection)
+        
+    except (ValueError, ServerBusyError) as e:
+        return f"❌ {str(e)}"
+    except ImportError:
+        return "❌ ChromaDB not available. Install with: uv pip install chromadb"
+    except Exception as e:
+        return f"❌ Error exporting collection: {str(e)}"
+
+
+@mcp.tool()
+async def import_collection(
+    name: str,
+    collection: str | None = None,
+    overwrite: bool = False,
+    verify: bool = True,
+    ctx: Context | None = None
+) -> str:
+    """
+    Restore a collection from a snapshot written by export_collection.
+    
+    Stored vectors are loaded as they are, so nothing is re-embedded. The
+    collection is recreated with the snapshot's distance space and
+    embedding function.
+    
+    Args:
+        name: Snapshot file name in the server's snapshot directory
+        collection: Target collection (default: the collection the snapshot was exported from)
+        overwrite: Replace the target collection if it already exists
+        verify: Check the snapshot's checksum before loading it
+    
+    Returns:
+        The restored collection and entry count
+    """
+    def _import() -> str:
+        with SnapshotReader(path) as reader:
+            if verify:
+                with _metrics.span("snapshot.verify"):
+                    reader.verify()
+            target = collection or reader.collection
+            with _writing():
+                if target in _store.collection_names():
+                    if not overwrite:
+                        return f"❌ Collection '{target}' already exists; pass overwrite=True to replace it"
+                    _store.delete_collection(target)
+                _lexical.drop(target)
+                _metadata.drop(target)
+                _catalog.drop(target)
+                coll = _store.create_collection(target, **collection_settings(reader.header))
+                # Start the side indexes empty so every restored batch is fed into them
+                _catalog.ensure(target, coll)
+                _lexical.get(target, coll)
+                _metadata.get(target, coll)
+                try:
+                    with _metrics.span("snapshot.import"):
+                        count = load_snapshot(
+                            reader,
+                            coll,
+                            batch_size=min(INGEST_BATCH_SIZE, _store.client.get_max_batch_size()),
+                            on_write=lambda ids, texts, metadatas: _index_write(target, ids, texts, metadatas),
+                            on_progress=on_progress,
+                        )
+                finally:
+                    _after_write(target, coll)
+        return f"✅ Imported {count:,} entries into '{target}' from {path.name}"
+    
+    try:
+        path = _snapshot_file(name)
+        if not path.exists():
+            return f"❌ Snapshot '{name}' not found in {SNAPSHOT_PATH}.\nAvailable snapshots: {_snapshot_names()}"
+        on_progress = _progress_reporter(ctx)
+        return await _executor.run(_import, collection=collection or name)
+        
+    except (ValueError, ServerBusyError) as e:
+        return f"❌ {str(e)}"
+    except ImportError:
+        return "❌ ChromaDB not available. Install with: uv pip install chromadb"
+    except Exception as e:
+        return f"❌ Error importing collection: {str(e)}"
+
+
+@mcp.resource("metrics://cache")
+def cache_metrics() -> str:
+    """
+    Get cache, query-batching and executor statistics (hits, misses, queue depth).
+    """
+    return json.dumps({
+        **_store.stats(),
+        "embedding_cache": _embedding_cache.stats(),
+        "embedding_engine": _engine.stats(),
+        "result_cache": _result_cache.stats(),
+        "reranker": _reranker.stats(),
+        "query_batching": _batcher.stats(),
+        "executor": _executor.stats(),
+        "cursors": _pages.stats(),
+        "lexical_indexes": _lexical.stats(),
+        "metadata_indexes": _metadata.stats(),
+        "filter_strategies": dict(_filter_strategies),
+        "catalog": _catalog.stats(),
+    }, indent=2)
+
+
+@mcp.resource("metrics://server")
+def server_metrics() -> str:
+    """
+    Get latency histograms per tool and per search/ingest stage, plus profiler state.
+    
+    Spans are named "tool.<name>" for whole tool calls and "<area>.<stage>"
+    (e.g. "search.embed", "search.hnsw_query", "executor.wait") for the parts.
+    """
+    return json.dumps({
+        **_metrics.snapshot(),
+        "startup": {"fast_start": FAST_START, "warm": _warm.is_set()},
+        "replica": (_publisher or _watcher).stats() if (_publisher or _watcher) else {"role": ROLE},
+        "profiler": _profiler.summary(top=10),
+    }, indent=2)
+
+
+@mcp.resource("metrics://profile")
+def profile_stacks() -> str:
+    """
+    Get the sampling profiler's stacks in collapsed format ("outer;...;inner count"),
+    ready for flame graph tools.
+    """
+    return _profiler.collapsed() or "No samples yet. Start the profiler with the profiler tool."
+
+
+@mcp.tool()
+async def profiler(
+    action: Literal["start", "stop", "status", "reset"] = "status",
+    interval_ms: float | None = None,
+    top: int = 15
+) -> ToolResult | str:
+    """
+    Switch the sampling profiler on or off at runtime and see where time goes.
+    
+    While running, every thread's stack is sampled each interval_ms; stopped,
+    it costs nothing. Full stacks are available from the metrics://profile resource.
+    
+    Args:
+        action: "start", "stop", "status" or "reset" (drop collected samples)
+        interval_ms: Sampling interval when starting (default: MCP_PROFILE_INTERVAL_MS)
+        top: Number of hottest frames to list
+    
+    Returns:
+        {"running", "interval_ms", "samples", "seconds", "top_frames": [{"frame", "samples", "share"}]}
+    """
+    if action == "start":
+        _profiler.start(interval_ms / 1000 if interval_ms else None)
+    elif action == "stop":
+        _profiler.stop()
+    elif action == "reset":
+        _profiler.clear()
+    payload = _profiler.summary(top)
+    return ToolResult(content=to_json(payload), structured_content=payload)
+
+
+if PROMETHEUS_PATH:
+    from starlette.requests import Request
+    from starlette.responses import PlainTextResponse
+    
+    @mcp.custom_route(PROMETHEUS_PATH, methods=["GET"])
+    async def prometheus_metrics(request: Request) -> PlainTextResponse:
+        """Span histograms and executor gauges for Prometheus scraping (HTTP transport only)."""
+        gauges = {
+            "executor_pending": _executor.pending,
+            "executor_running": _executor.running,
+            "profiler_running": int(_profiler.running),
+        }
+        return PlainTextResponse(_metrics.prometheus(gauges=gauges), media_type="text/plain; version=0.0.4")
 
 
 @mcp.resource("search://help")
@@ -129,7 +1629,11 @@ This server provides semantic document search using ChromaDB and FastMCP.
 ## Available Tools:
 
 ### Search Operations
-- search_documents: Semantic search across documents
+- search_documents: Semantic, keyword or hybrid search, with optional
+  `where` (metadata) and `where_document` (text) filters; pass `collections`
+  (names or globs like "kb-*") to search several collections in one ranking,
+  and `rerank=True` to rescore more candidates with the second-stage reranker
+- search_documents_batch: Run many searches (across collections) in one call
 - get_document_by_id: Retrieve a specific document by ID
 
 ### Document Management
@@ -139,6 +1643,14 @@ This server provides semantic document search using ChromaDB and FastMCP.
 
 ### Collection Management
 - list_collections: View all collections with document counts
+- facets: Document counts per metadata value (e.g. per category)
+- export_collection / import_collection: Save a collection with its embeddings
+  to a snapshot file and restore it without re-embedding
+
+### Diagnostics
+- profiler: Start/stop the sampling profiler at runtime
+- Resources: metrics://server (latency per tool and stage), metrics://cache,
+  metrics://profile (collapsed stacks)
 
 ## Learn More:
 - FastMCP: https://github.com/jlowin/fastmcp
@@ -149,6 +1661,38 @@ This server provides semantic document search using ChromaDB and FastMCP.
 if __name__ == "__main__":
     # Run the server
     # Default transport is STDIO (for local use)
-    # Use transport="http" for web deployment
-    mcp.run()
+    # Set MCP_TRANSPORT=http (plus MCP_HOST / MCP_PORT) for web deployment,
+    # MCP_TRANSPORT=cluster for a writer plus read-only HTTP workers behind a
+    # dispatcher, or MCP_TRANSPORT=warm-pool to keep pre-forked stdio servers ready
+    transport = os.getenv("MCP_TRANSPORT", "stdio")
+    if transport == "stdio":
+        mcp.run()
+    elif transport == "cluster":
+        from src.cluster import serve_cluster
+        serve_cluster(
+            [sys.executable, sys.argv[0]],
+            DB_PATH,
+            INDEX_PATH,
+            REPLICA_PATH,
+            host=os.getenv("MCP_HOST", "127.0.0.1"),
+            port=int(os.getenv("MCP_PORT", "8000")),
+            workers=CLUSTER_WORKERS,
+            keep=REPLICA_KEEP,
+        )
+    elif transport == "warm-pool":
+        from src.warm_pool import serve_warm_pool
+        serve_warm_pool(
+            partial(mcp.run, show_banner=False),
+            _warm_up,
+            WARM_POOL_SOCKET,
+            size=WARM_POOL_SIZE,
+            preload=["numpy", "chromadb", *EMBEDDING_MODULES, "onnxruntime", "tokenizers"],
+        )
+    else:
+        mcp.run(
+            transport=transport,
+            host=os.getenv("MCP_HOST", "127.0.0.1"),
+            port=int(os.getenv("MCP_PORT", "8000")),
+            stateless_http=STATELESS_HTTP or None,
+        )
 
@@ -0,0 +1,455 @@
+"""
+Portable collection snapshots.
+
+A snapshot file holds one collection: its ids, documents, metadata and
+stored embeddings, plus the configuration (distance space, embedding
+function) and metadata needed to recreate it. Restoring a snapshot writes
+the stored vectors back as they are, so nothing is re-embedded and another
+environment can be brought up without the embedding model's cost.
+
+Layout (integers little-endian):
+
+    b"MCPSNAP\\0"  format u32  header length u32  SHA-256 digest (32 bytes)
+    header         JSON: collection, count, dimension, dtype, metadata,
+                   configuration and the offset/length of every column
+    columns        each starting on a 64-byte boundary:
+        ids.offsets           uint64[count + 1], byte ranges in ids.data
+        ids.data              UTF-8
+        documents.offsets     uint64[count + 1]
+        documents.data        UTF-8
+        documents.missing     uint8[count], 1 where the entry has no document
+        metadatas.offsets     uint64[count + 1]
+        metadatas.data        one JSON value per entry (object or null)
+        embeddings            float32, float16 or int8 [count, dimension]
+        scales                float32[count], per-entry scale of int8 vectors
+
+Every column is a flat array at a known offset, so a reader memory-maps the
+file and slices entries straight out of it without parsing what it doesn't
+use. The digest covers everything after the fixed prefix (header and
+columns) and is checked before a restore unless asked not to.
+
+int8 vectors are quantized symmetrically per entry (scale = max |x| / 127),
+which keeps cosine and inner-product rankings close to the originals at a
+quarter of the size; float16 halves the size with a relative error around
+1e-3. Exports are written to a temporary file next to the target and renamed
+into place, so an interrupted export never leaves a truncated snapshot.
+"""
+import hashlib
+import json
+import os
+import struct
+import tempfile
+import time
+from array import array
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, BinaryIO, Callable, Iterator
+
+from .store import iter_pages
+
+if TYPE_CHECKING:
+    import numpy as np
+
+MAGIC = b"MCPSNAP\0"
+FORMAT_VERSION = 1
+SUFFIX = ".mcpsnap"
+DTYPES = ("float16", "int8", "float32")
+
+# magic, format version, header length, SHA-256 of everything after the prefix
+_PREFIX = struct.Struct("<8sII32s")
+_ALIGN = 64
+_COPY_CHUNK = 8 * 1024 * 1024
+
+# Per-entry string columns, stored as offsets plus data
+_STRING_COLUMNS = ("ids", "documents", "metadatas")
+
+
+class SnapshotError(ValueError):
+    """Raised for a file that is not a snapshot, is corrupt, or cannot be restored."""
+
+
+@dataclass
+class SnapshotInfo:
+    """Summary of a written or opened snapshot."""
+
+    path: Path
+    collection: str
+    count: int
+    dimension: int | None
+    dtype: str
+    size: int
+    sha256: str
+    seconds: float = 0.0
+
+
+def _pad(n: int) -> int:
+    return -n % _ALIGN
+
+
+class _Spool:
+    """One column being written to a temporary file, with per-entry offsets if it has them."""
+
+    def __init__(self, directory: Path, offsets: bool):
+        self.file: BinaryIO = tempfile.TemporaryFile(dir=directory)
+        self.offsets = array("Q", [0]) if offsets else None
+        self.size = 0
+
+    def append(self, data: bytes) -> None:
+        self.file.write(data)
+        self.size += len(data)
+        if self.offsets is not None:
+            self.offsets.append(self.size)
+
+
+def _quantize(vectors: "np.ndarray", dtype: str) -> tuple["np.ndarray", "np.ndarray | None"]:
+    import numpy as np
+    vectors = np.asarray(vectors, dtype=np.float32)
+    if dtype == "float32":
+        return vectors, None
+    if dtype == "float16":
+        return vectors.astype(np.float16), None
+    scales = np.abs(vectors).max(axis=1) / 127.0
+    scales[scales == 0] = 1.0
+    return np.rint(vectors / scales[:, None]).astype(np.int8), scales.astype(np.float32)
+
+
+def write_snapshot(
+    coll: Any,
+    path: str | Path,
+    dtype: str = "float16",
+    page_size: int = 1000,
+    on_progress: Callable[[int, int], None] | None = None,
+) -> SnapshotInfo:
+    """
+    Export a collection to a snapshot file.
+
+    Entries are read in pages by id (store.iter_pages), so memory stays
+    bounded by the page size plus the id list and eight bytes of offsets per
+    entry. Writes made to the collection during
+    the export may or may not be included.
+
+    Args:
+        coll: Collection to export
+        path: Snapshot file to write (replaced if it exists)
+        dtype: Stored embedding precision: "float16", "int8" or "float32"
+        page_size: Entries read from the collection per call
+        on_progress: Called with (entries written, total) after each page
+
+    Raises:
+        ValueError: For an unknown dtype
+    """
+    from chromadb.api.collection_configuration import collection_configuration_to_json
+
+    if dtype not in DTYPES:
+        raise ValueError(f"Unknown embedding dtype '{dtype}' (expected one of {', '.join(DTYPES)})")
+    start = time.perf_counter()
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    spools = {
+        "ids": _Spool(path.parent, offsets=True),
+        "documents": _Spool(path.parent, offsets=True),
+        "documents.missing": _Spool(path.parent, offsets=False),
+        "metadatas": _Spool(path.parent, offsets=True),
+        "embeddings": _Spool(path.parent, offsets=False),
+        "scales": _Spool(path.parent, offsets=False),
+    }
+    total = coll.count()
+    count = 0
+    dimension = None
+    try:
+        for page in iter_pages(coll, ["documents", "metadatas", "embeddings"], page_size):
+            if not page["ids"]:
+                continue
+            for doc_id, document, metadata in zip(page["ids"], page["documents"], page["metadatas"]):
+                spools["ids"].append(doc_id.encode("utf-8"))
+                spools["documents"].append((document or "").encode("utf-8"))
+                spools["documents.missing"].append(b"\1" if document is None else b"\0")
+                spools["metadatas"].append(json.dumps(metadata, ensure_ascii=False, separators=(",", ":")).encode("utf-8"))
+            vectors, scales = _quantize(page["embeddings"], dtype)
+            dimension = dimension or int(vectors.shape[1])
+            spools["embeddings"].append(vectors.tobytes())
+            if scales is not None:
+                spools["scales"].append(scales.tobytes())
+            count += len(page["ids"])
+            if on_progress is not None:
+                on_progress(count, total)
+
+        # Columns in file order, as (name, spooled file or in-memory bytes)
+        sections: list[tuple[str, Any]] = []
+        for name in _STRING_COLUMNS:
+            sections.append((f"{name}.offsets", spools[name].offsets.tobytes()))
+            sections.append((f"{name}.data", spools[name]))
+            if name == "documents":
+                sections.append(("documents.missing", spools["documents.missing"]))
+        sections.append(("embeddings", spools["embeddings"]))
+        if dtype == "int8":
+            sections.append(("scales", spools["scales"]))
+
+        columns: dict[str, dict[str, int]] = {}
+        position = 0
+        for name, content in sections:
+            length = content.size if isinstance(content, _Spool) else len(content)
+            columns[name] = {"offset": position, "length": length}
+            position += length + _pad(length)
+
+        header = json.dumps({
+            "collection": coll.name,
+            "count": count,
+            "dimension": dimension,
+            "dtype": dtype,
+            "metadata": coll.metadata,
+            "configuration": collection_configuration_to_json(coll.configuration),
+            "created": time.time(),
+            "columns": columns,
+        }, ensure_ascii=False).encode("utf-8")
+        header += b" " * _pad(_PREFIX.size + len(header))
+
+        digest = hashlib.sha256()
+        fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as out:
+                out.write(_PREFIX.pack(MAGIC, FORMAT_VERSION, len(header), bytes(32)))
+                for data in _sections_bytes(header, sections):
+                    digest.update(data)
+                    out.write(data)
+                out.seek(0)
+                out.write(_PREFIX.pack(MAGIC, FORMAT_VERSION, len(header), digest.digest()))
+                out.flush()
+                os.fsync(out.fileno())
+            os.chmod(tmp, 0o644)  # mkstemp creates the file private to the owner
+            os.replace(tmp, path)
+        except BaseException:
+            Path(tmp).unlink(missing_ok=True)
+            raise
+    finally:
+        for spool in spools.values():
+            spool.file.close()
+
+    return SnapshotInfo(
+        path=path,
+        collection=coll.name,
+        count=count,
+        dimension=dimension,
+        dtype=dtype,
+        size=path.stat().st_size,
+        sha256=digest.hexdigest(),
+        seconds=time.perf_counter() - start,
+    )
+
+
+def _sections_bytes(header: bytes, sections: list[tuple[str, Any]]) -> Iterator[bytes]:
+    """The file body after the prefix: the header, then every column padded to the alignment."""
+    yield header
+    for _, content in sections:
+        if isinstance(content, _Spool):
+            content.file.seek(0)
+            for chunk in iter(lambda: content.file.read(_COPY_CHUNK), b""):
+                yield chunk
+            length = content.size
+        else:
+            yield content
+            length = len(content)
+        yield bytes(_pad(length))
+
+
+class SnapshotReader:
+    """
+    Memory-mapped read access to a snapshot file.
+
+    Args:
+        path: Snapshot file
+
+    Raises:
+        SnapshotError: If the file is not a snapshot of a supported format
+    """
+
+    def __init__(self, path: str | Path):
+        import mmap
+        self.path = Path(path)
+        try:
+            with self.path.open("rb") as f:
+                self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except FileNotFoundError:
+            raise SnapshotError(f"Snapshot not found: {path}") from None
+        except ValueError:  # empty file
+            raise SnapshotError(f"Not a snapshot file: {path}") from None
+        if len(self._mmap) < _PREFIX.size:
+            self.close()
+            raise SnapshotError(f"Not a snapshot file: {path}")
+        magic, version, header_length, self.digest = _PREFIX.unpack_from(self._mmap)
+        if magic != MAGIC:
+            self.close()
+            raise SnapshotError(f"Not a snapshot file: {path}")
+        if version != FORMAT_VERSION:
+            self.close()
+            raise SnapshotError(f"Unsupported snapshot format {version} (this server reads format {FORMAT_VERSION})")
+        try:
+            self.header = json.loads(self._mmap[_PREFIX.size:_PREFIX.size + header_length])
+        except ValueError:
+            self.close()
+            raise SnapshotError(f"Corrupt snapshot header: {path}") from None
+        self._body = _PREFIX.size + header_length
+        self._arrays: dict[str, "np.ndarray"] = {}
+
+    def __enter__(self) -> "SnapshotReader":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        # Views into the map must go before it can be closed
+        self._arrays = {}
+        try:
+            self._mmap.close()
+        except BufferError:
+            pass
+
+    @property
+    def collection(self) -> str:
+        return self.header["collection"]
+
+    @property
+    def count(self) -> int:
+        return self.header["count"]
+
+    @property
+    def dimension(self) -> int | None:
+        return self.header["dimension"]
+
+    @property
+    def dtype(self) -> str:
+        return self.header["dtype"]
+
+    def info(self) -> SnapshotInfo:
+        return SnapshotInfo(
+            path=self.path,
+            collection=self.collection,
+            count=self.count,
+            dimension=self.dimension,
+            dtype=self.dtype,
+            size=len(self._mmap),
+            sha256=self.digest.hex(),
+        )
+
+    def verify(self) -> None:
+        """
+        Check the file against its SHA-256 digest.
+
+        Raises:
+            SnapshotError: If the contents don't match (truncated or corrupt)
+        """
+        digest = hashlib.sha256()
+        view = memoryview(self._mmap)
+        try:
+            for start in range(_PREFIX.size, len(view), _COPY_CHUNK):
+                digest.update(view[start:start + _COPY_CHUNK])
+        finally:
+            view.release()
+        if digest.digest() != self.digest:
+            raise SnapshotError(f"Checksum mismatch in {self.path}: the snapshot is truncated or corrupt")
+
+    def _column(self, name: str, dtype: str) -> "np.ndarray":
+        array_ = self._arrays.get(name)
+        if array_ is None:
+            import numpy as np
+            column = self.header["columns"][name]
+            start = self._body + column["offset"]
+            if start + column["length"] > len(self._mmap):
+                raise SnapshotError(f"Snapshot {self.path} is truncated")
+            array_ = np.frombuffer(self._mmap, dtype=dtype, count=column["length"] // np.dtype(dtype).itemsize, offset=start)
+            self._arrays[name] = array_
+        return array_
+
+    def _strings(self, name: str, start: int, stop: int) -> list[str]:
+        offsets = self._column(f"{name}.offsets", "<u8")[start:stop + 1].tolist()
+        data = self._body + self.header["columns"][f"{name}.data"]["offset"]
+        raw = self._mmap[data + offsets[0]:data + offsets[-1]]
+        base = offsets[0]
+        return [raw[a - base:b - base].decode("utf-8") for a, b in zip(offsets, offsets[1:])]
+
+    def embeddings(self, start: int, stop: int) -> "np.ndarray":
+        """Entries [start, stop) as float32 vectors."""
+        import numpy as np
+        dtype = {"float32": "<f4", "float16": "<f2", "int8": "i1"}[self.dtype]
+        vectors = self._column("embeddings", dtype).reshape(-1, self.dimension)[start:stop].astype(np.float32)
+        if self.dtype == "int8":
+            vectors *= self._column("scales", "<f4")[start:stop, None]
+        return vectors
+
+    def rows(self, start: int, stop: int) -> dict[str, Any]:
+        """Entries [start, stop) as ids, documents, metadatas and float32 embeddings."""
+        stop = min(stop, self.count)
+        missing = self._column("documents.missing", "u1")[start:stop]
+        documents = self._strings("documents", start, stop)
+        return {
+            "ids": self._strings("ids", start, stop),
+            "documents": [None if gone else doc for doc, gone in zip(documents, missing.tolist())],
+            "metadatas": [json.loads(m) for m in self._strings("metadatas", start, stop)],
+            "embeddings": self.embeddings(start, stop) if self.dimension else None,
+        }
+
+    def batches(self, batch_size: int) -> Iterator[dict[str, Any]]:
+        """Every entry, in batches of rows()."""
+        for start in range(0, self.count, batch_size):
+            yield self.rows(start, start + batch_size)
+
+
+def collection_settings(header: dict[str, Any]) -> dict[str, Any]:
+    """
+    Keyword arguments recreating a snapshot's collection with create_collection().
+
+    Raises:
+        SnapshotError: If the snapshot's embedding function is not registered
+            in this process (see MCP_EMBEDDING_MODULES)
+    """
+    from chromadb.api.collection_configuration import load_create_collection_configuration_from_json
+
+    try:
+        configuration = load_create_collection_configuration_from_json(header.get("configuration") or {})
+    except KeyError as e:
+        raise SnapshotError(
+            f"The snapshot's embedding function {e} is not registered; "
+            "add the module defining it to MCP_EMBEDDING_MODULES"
+        ) from None
+    settings: dict[str, Any] = {"configuration": configuration}
+    if header.get("metadata"):
+        settings["metadata"] = header["metadata"]
+    return settings
+
+
+def load_snapshot(
+    reader: SnapshotReader,
+    coll: Any,
+    batch_size: int = 1000,
+    on_write: Callable[[list[str], list[str | None], list[dict[str, Any] | None]], None] | None = None,
+    on_progress: Callable[[int, int], None] | None = None,
+) -> int:
+    """
+    Upsert every entry of a snapshot into a collection with its stored embeddings.
+
+    Args:
+        reader: Open snapshot
+        coll: Target collection
+        batch_size: Entries per upsert (at most the client's maximum batch size)
+        on_write: Called with each batch's ids, documents and metadatas after it is stored
+        on_progress: Called with (entries written, total) after each batch
+
+    Returns:
+        Number of entries written
+    """
+    written = 0
+    for batch in reader.batches(batch_size):
+        coll.upsert(
+            ids=batch["ids"],
+            documents=batch["documents"],
+            metadatas=batch["metadatas"],
+            embeddings=batch["embeddings"],
+        )
+        if on_write is not None:
+            on_write(batch["ids"], batch["documents"], batch["metadatas"])
+        written += len(batch["ids"])
+        if on_progress is not None:
+            on_progress(written, reader.count)
+    return written
@@ -0,0 +1,190 @@
+"""
+Streaming document sources for bulk ingestion.
+
+Directories, JSONL files and CSV files are read lazily, one document at a
+time, into the dicts accepted by normalize_documents ({"id", "content",
+"title", "metadata"}). Every document comes with a cursor: the position to
+resume from once it has been stored, so an interrupted load can restart from
+a checkpoint without reading what was already written.
+
+- Directory: every file matching the glob patterns, in sorted order. A file's
+  id is derived from its path, so an edited file replaces its earlier
+  version. Cursor: the relative path of the last file.
+- JSONL: one JSON object per line. Cursor: the byte offset after the line.
+- CSV: one row per document, with a header. Cursor: the number of rows read.
+
+JSONL and CSV records without an id get a content-hash id from
+normalize_documents. Fields other than id, content and title become metadata.
+"""
+import csv
+import hashlib
+import json
+from pathlib import Path
+from typing import Any, Iterable, Iterator, NamedTuple
+
+DEFAULT_PATTERNS = ("*.txt", "*.md", "*.markdown", "*.rst")
+
+# Fields read as the document's id, text and title; everything else is metadata
+ID_FIELDS = ("id",)
+CONTENT_FIELDS = ("content", "text", "body")
+TITLE_FIELDS = ("title", "name")
+
+
+class Record(NamedTuple):
+    """One document read from a source, or the end of that source."""
+
+    source: str  # checkpoint key (resolved path)
+    signature: list[int] | None  # changes when the source file changes; None for directories
+    cursor: Any  # position after this record
+    document: dict[str, Any] | None  # None marks the end of the source
+
+
+def source_signature(path: Path) -> list[int] | None:
+    """Size and modification time of a file; None for a directory."""
+    if path.is_dir():
+        return None
+    stat = path.stat()
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def _metadata_value(value: Any) -> Any:
+    """ChromaDB metadata accepts scalars only; other values are stored as JSON."""
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    return json.dumps(value, ensure_ascii=False, sort_keys=True)
+
+
+def _first(row: dict[str, Any], fields: Iterable[str]) -> tuple[str | None, Any]:
+    for name in fields:
+        if row.get(name) not in (None, ""):
+            return name, row[name]
+    return None, None
+
+
+def to_document(row: dict[str, Any], content_field: str | None = None) -> dict[str, Any]:
+    """
+    Map a JSONL object or CSV row to a document dict.
+
+    Args:
+        row: Parsed record
+        content_field: Field holding the text; "content", "text" or "body" if None
+    """
+    content_key, content = (
+        (content_field, row.get(content_field)) if content_field else _first(row, CONTENT_FIELDS)
+    )
+    id_key, doc_id = _first(row, ID_FIELDS)
+    title_key, title = _first(row, TITLE_FIELDS)
+    metadata = dict(row.get("metadata") or {}) if isinstance(row.get("metadata"), dict) else {}
+    for key, value in row.items():
+        if key in (content_key, id_key, title_key, "metadata") or value in (None, ""):
+            continue
+        metadata.setdefault(key, value)
+    metadata = {k: _metadata_value(v) for k, v in metadata.items() if v is not None}
+    return {
+        "id": str(doc_id) if doc_id is not None else None,
+        "content": content if isinstance(content, str) else (None if content is None else str(content)),
+        "title": str(title) if title is not None else None,
+        "metadata": metadata,
+    }
+
+
+def read_directory(
+    root: Path, cursor: str | None = None, patterns: Iterable[str] = DEFAULT_PATTERNS
+) -> Iterator[tuple[str, dict[str, Any]]]:
+    """Yield (relative path, document) for matching files after the cursor, in sorted order."""
+    paths = sorted({p for pattern in patterns for p in root.rglob(pattern) if p.is_file()})
+    for path in paths:
+        rel = path.relative_to(root).as_posix()
+        if cursor is not None and rel <= cursor:
+            continue
+        content = path.read_text(encoding="utf-8", errors="replace")
+        title = next(
+            (line.lstrip("#").strip() for line in content.splitlines()[:20] if line.startswith("# ")),
+            path.stem,
+        )
+        yield rel, {
+            "id": f"file-{hashlib.sha256(rel.encode('utf-8')).hexdigest()[:24]}",
+            "content": content,
+            "title": title,
+            "metadata": {"source": rel},
+        }
+
+
+def read_jsonl(
+    path: Path, cursor: int | None = None, content_field: str | None = None
+) -> Iterator[tuple[int, dict[str, Any]]]:
+    """Yield (byte offset after the line, document) for each non-empty line after the cursor."""
+    with path.open("rb") as f:
+        if cursor:
+            f.seek(cursor)
+        for raw in iter(f.readline, b""):
+            offset = f.tell()
+            if not raw.strip():
+                continue
+            try:
+                row = json.loads(raw)
+            except ValueError as e:
+                raise ValueError(f"{path}: invalid JSON at byte {offset - len(raw)}: {e}") from None
+            if not isinstance(row, dict):
+                raise ValueError(f"{path}: expected a JSON object at byte {offset - len(raw)}")
+            yield offset, to_document(row, content_field)
+
+
+def read_csv(
+    path: Path, cursor: int | None = None, content_field: str | None = None
+) -> Iterator[tuple[int, dict[str, Any]]]:
+    """Yield (rows read, document) for each row after the cursor."""
+    csv.field_size_limit(1 << 30)  # whole documents can exceed the 128 KiB default
+    with path.open(newline="", encoding="utf-8") as f:
+        for n, row in enumerate(csv.DictReader(f), start=1):
+            if cursor and n <= cursor:
+                continue
+            yield n, to_document(row, content_field)
+
+
+def read_sources(
+    paths: Iterable[str | Path],
+    resume: dict[str, dict[str, Any]] | None = None,
+    patterns: Iterable[str] = DEFAULT_PATTERNS,
+    content_field: str | None = None,
+) -> Iterator[Record]:
+    """
+    Stream documents from directories, .jsonl/.ndjson and .csv files.
+
+    Args:
+        paths: Sources, read in the given order
+        resume: Checkpointed state per source ({"signature", "cursor",
+            "complete"}); a source whose signature no longer matches is read
+            from the start
+        patterns: File globs read from directories
+        content_field: JSONL/CSV field holding the document text
+
+    Raises:
+        ValueError: For a missing source or an unsupported file type
+    """
+    resume = resume or {}
+    for raw in paths:
+        path = Path(raw).expanduser().resolve()
+        if not path.exists():
+            raise ValueError(f"Source not found: {raw}")
+        key = str(path)
+        signature = source_signature(path)
+        state = resume.get(key)
+        cursor = None
+        if state is not None and state.get("signature") == signature:
+            if state.get("complete"):
+                continue
+            cursor = state.get("cursor")
+
+        if path.is_dir():
+            reader = read_directory(path, cursor, patterns)
+        elif path.suffix.lower() in (".jsonl", ".ndjson"):
+            reader = read_jsonl(path, cursor, content_field)
+        elif path.suffix.lower() == ".csv":
+            reader = read_csv(path, cursor, content_field)
+        else:
+            raise ValueError(f"Unsupported source '{raw}' (expected a directory, .jsonl or .csv)")
+
+        for cursor, document in reader:
+            yield Record(key, signature, cursor, document)
+        yield Record(key, signature, cursor, None)
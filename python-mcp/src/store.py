@@ -0,0 +1,207 @@
+"""
+Process-wide ChromaDB access for the MCP server.
+
+A single PersistentClient is opened once and shared by every tool call.
+Collection handles are kept in a bounded LRU cache with a TTL so repeated
+searches skip the name lookup, and the cache is invalidated whenever a
+collection is created or deleted.
+"""
+import importlib
+import threading
+from pathlib import Path
+from typing import Any, Iterable, Iterator
+
+from .cache import LRUCache
+
+
+class CollectionNotFoundError(LookupError):
+    """Raised when a collection name does not exist in the database."""
+
+    def __init__(self, name: str, available: list[str]):
+        super().__init__(f"Collection '{name}' not found")
+        self.name = name
+        self.available = available
+
+
+class ChromaStore:
+    """
+    Long-lived ChromaDB client plus a cache of collection handles.
+
+    Args:
+        path: Directory holding the persistent ChromaDB data
+        cache_size: Maximum number of collection handles kept
+        cache_ttl: Seconds before a cached handle is looked up again
+        embedding_modules: Modules imported together with chromadb, before any
+            collection is opened, to register custom embedding functions
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        cache_size: int = 64,
+        cache_ttl: float | None = 300.0,
+        embedding_modules: Iterable[str] = (),
+    ):
+        self.path = Path(path)
+        self.embedding_modules = tuple(embedding_modules)
+        self._client = None
+        self._lock = threading.Lock()
+        self.collections = LRUCache(max_size=cache_size, ttl=cache_ttl)
+        self._versions: dict[str, int] = {}
+        self._retired: Path | None = None
+
+    def _connect(self, path: Path) -> Any:
+        import chromadb
+        for module in self.embedding_modules:
+            importlib.import_module(module)
+        return chromadb.PersistentClient(path=str(path))
+
+    @property
+    def client(self) -> Any:
+        """The shared PersistentClient, created on first use."""
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    self._client = self._connect(self.path)
+        return self._client
+
+    def swap(self, path: Path) -> list[str]:
+        """
+        Switch to another database directory, e.g. a newly published replica.
+
+        The new client is opened before the switch, so calls keep being served
+        throughout; calls already holding a collection handle finish against
+        the old data. The client replaced by the previous swap is released
+        now, one swap later, once nothing can still be using it. Every
+        collection's version is bumped so caches keyed on it go stale.
+
+        Returns:
+            The collections in the new directory
+        """
+        client = self._connect(path)
+        names = [c.name for c in client.list_collections()]
+        with self._lock:
+            retired, self._retired = self._retired, self.path
+            self._client, self.path = client, Path(path)
+            self.collections.clear()
+            for name in {*self._versions, *names}:
+                self._versions[name] = self._versions.get(name, 0) + 1
+        if retired is not None and retired != self.path:
+            _release(retired)
+        return names
+
+    def open(self) -> None:
+        """Create the client eagerly (e.g. at server start)."""
+        _ = self.client
+
+    def close(self) -> None:
+        """Drop the client and every cached handle."""
+        with self._lock:
+            self.collections.clear()
+            self._client = None
+
+    def get_collection(self, name: str) -> Any:
+        """
+        Return a collection handle, served from the cache when possible.
+
+        Raises:
+            CollectionNotFoundError: If no collection with that name exists
+        """
+        coll = self.collections.get(name)
+        if coll is not None:
+            return coll
+
+        try:
+            coll = self.client.get_collection(name=name)
+        except Exception:
+            raise CollectionNotFoundError(name, self.collection_names())
+
+        self.collections.put(name, coll)
+        return coll
+
+    def cached_collection(self, name: str) -> Any | None:
+        """Return a cached collection handle without touching the database."""
+        return self.collections.get(name)
+
+    def get_or_create_collection(self, name: str, **kwargs: Any) -> Any:
+        """Return a collection handle, creating the collection if needed."""
+        coll = self.collections.get(name)
+        if coll is not None:
+            return coll
+
+        coll = self.client.get_or_create_collection(name=name, **kwargs)
+        self.collections.put(name, coll)
+        return coll
+
+    def version(self, name: str) -> int:
+        """Write version of a collection; changes whenever its contents change."""
+        return self._versions.get(name, 0)
+
+    def bump_version(self, name: str) -> int:
+        """Record a write to a collection so caches keyed on its version go stale."""
+        with self._lock:
+            self._versions[name] = self._versions.get(name, 0) + 1
+            return self._versions[name]
+
+    def create_collection(self, name: str, **kwargs: Any) -> Any:
+        """Create a new collection and cache its handle."""
+        self.collections.invalidate(name)
+        self.bump_version(name)
+        coll = self.client.create_collection(name=name, **kwargs)
+        self.collections.put(name, coll)
+        return coll
+
+    def delete_collection(self, name: str) -> None:
+        """Delete a collection and drop its cached handle."""
+        self.collections.invalidate(name)
+        self.bump_version(name)
+        self.client.delete_collection(name=name)
+
+    def list_collections(self) -> list[Any]:
+        """Return every collection in the database."""
+        return list(self.client.list_collections())
+
+    def collection_names(self) -> list[str]:
+        """Return the names of every collection in the database."""
+        return [c.name for c in self.list_collections()]
+
+    def stats(self) -> dict[str, Any]:
+        """Return client state and collection-handle cache counters."""
+        return {
+            "client_open": self._client is not None,
+            "path": str(self.path),
+            "collection_cache": self.collections.stats(),
+        }
+
+
+def iter_pages(coll: Any, include: list[str], page_size: int = 1000) -> Iterator[dict[str, Any]]:
+    """
+    Read a whole collection in pages, addressed by id.
+
+    Paging with get(offset=...) makes ChromaDB skip `offset` rows on every
+    call, which is quadratic over a large collection. Instead every id is
+    listed once (no documents or vectors) and each page is fetched by its ids.
+    Entries deleted in between are simply missing from their page.
+
+    Args:
+        coll: Collection to read
+        include: Fields per entry, as for coll.get()
+        page_size: Entries per call
+
+    Yields:
+        coll.get() results of up to page_size entries
+    """
+    ids = coll.get(include=[])["ids"]
+    for start in range(0, len(ids), page_size):
+        yield coll.get(ids=ids[start:start + page_size], include=include)
+
+
+def _release(path: Path) -> None:
+    """Stop ChromaDB's cached system for a directory that is no longer served (best effort)."""
+    try:
+        from chromadb.api.shared_system_client import SharedSystemClient
+        system = SharedSystemClient._identifier_to_system.pop(str(path), None)
+        if system is not None:
+            system.stop()
+    except Exception:
+        pass
@@ -0,0 +1,151 @@
+"""
+Pre-forked pool of warm stdio servers.
+
+Spawning server.py for every client pays for interpreter start, imports
+(fastmcp alone takes about a second) and opening ChromaDB before the first
+result. The pool parent pays for the imports once, then forks workers. Each
+worker opens its own ChromaDB client and loads the embedding model (neither
+survives a fork, so this happens after it) and blocks in accept() on a Unix
+socket. A client attaches with src/attach.py, which relays its stdin/stdout
+to the socket; the worker that accepts serves that one MCP session over the
+connection exactly as it would over stdio, and exits when the session ends.
+The parent forks a replacement as soon as a worker is taken, so `size` warm
+workers are always waiting.
+"""
+import importlib
+import os
+import select
+import signal
+import socket
+import struct
+import sys
+import time
+import traceback
+from pathlib import Path
+from typing import Callable, Iterable
+
+# Seconds to wait before replacing a worker that died before serving anyone
+_RESPAWN_DELAY = 1.0
+
+
+def _import(modules: Iterable[str]) -> None:
+    """Import modules in the parent so every worker inherits them."""
+    for module in modules:
+        try:
+            importlib.import_module(module)
+        except ImportError:
+            pass  # optional dependency; the worker reports it when used
+
+
+def _worker(listener: socket.socket, notify: int, run: Callable[[], None], warm_up: Callable[[], None]) -> None:
+    """Warm up, take one connection, serve it over stdio and exit."""
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    warm_up()
+    conn, _ = listener.accept()
+    listener.close()
+    os.write(notify, struct.pack("i", os.getpid()))
+    os.close(notify)
+    os.dup2(conn.fileno(), 0)
+    os.dup2(conn.fileno(), 1)
+    conn.close()
+    # The inherited stdio objects describe the parent's streams (e.g. a seekable log file)
+    sys.stdin = open(0, "r", encoding="utf-8", closefd=False)
+    sys.stdout = open(1, "w", encoding="utf-8", closefd=False)
+    run()
+
+
+def serve_warm_pool(
+    run: Callable[[], None],
+    warm_up: Callable[[], None],
+    socket_path: str | Path,
+    size: int = 2,
+    preload: Iterable[str] = (),
+) -> None:
+    """
+    Keep `size` warm workers accepting MCP sessions on a Unix socket until
+    SIGTERM or SIGINT.
+
+    Args:
+        run: Serves one MCP session over stdin/stdout (e.g. FastMCP.run)
+        warm_up: Opens per-process state; called in each worker before accept()
+        socket_path: Unix socket the workers accept on (replaced if stale)
+        size: Idle workers kept ready
+        preload: Modules imported once in the parent and shared by every worker
+    """
+    _import(preload)
+    path = Path(socket_path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.unlink(missing_ok=True)
+    listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    listener.bind(str(path))
+    listener.listen(64)
+
+    taken_r, taken_w = os.pipe()
+    idle: set[int] = set()
+    busy: set[int] = set()
+    stopping = False
+    last_failure = 0.0
+
+    def spawn() -> None:
+        sys.stdout.flush()
+        sys.stderr.flush()
+        pid = os.fork()
+        if pid == 0:
+            os.close(taken_r)
+            code = 0
+            try:
+                _worker(listener, taken_w, run, warm_up)
+            except BaseException:
+                traceback.print_exc()
+                code = 1
+            finally:
+                os._exit(code)
+        idle.add(pid)
+
+    def stop(signum: int, frame: object) -> None:
+        nonlocal stopping
+        stopping = True
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    print(f"🔥 Warm pool: {size} workers on {path}", file=sys.stderr)
+
+    try:
+        while not stopping:
+            # Keep the idle set full; back off if workers die while warming up
+            while len(idle) < size and time.monotonic() - last_failure >= _RESPAWN_DELAY:
+                spawn()
+            try:
+                ready, _, _ = select.select([taken_r], [], [], 0.5)
+            except InterruptedError:
+                continue
+            if ready:
+                data = os.read(taken_r, 4096)
+                for (pid,) in struct.iter_unpack("i", data[: len(data) // 4 * 4]):
+                    idle.discard(pid)
+                    busy.add(pid)
+            while True:
+                try:
+                    pid, _ = os.waitpid(-1, os.WNOHANG)
+                except ChildProcessError:
+                    break
+                if pid == 0:
+                    break
+                if pid in idle:
+                    idle.discard(pid)
+                    last_failure = time.monotonic()
+                busy.discard(pid)
+    finally:
+        for pid in idle | busy:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        for pid in idle | busy:
+            try:
+                os.waitpid(pid, 0)
+            except ChildProcessError:
+                pass
+        listener.close()
+        path.unlink(missing_ok=True)
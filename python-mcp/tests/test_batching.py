@@ -0,0 +1,100 @@
+"""Tests for merging concurrent searches into batched ChromaDB queries."""
+import asyncio
+import threading
+
+from src.batching import QueryBatcher, run_grouped, split_query_result
+
+
+class Runner:
+    """Stands in for one vectorized coll.query: hit ids echo the query text."""
+
+    def __init__(self, fail: set[str] = frozenset()):
+        self.calls: list[tuple[str, list[str], int]] = []
+        self.fail = fail
+        self.lock = threading.Lock()
+
+    def __call__(self, collection: str, queries: list[str], n_results: int) -> dict:
+        with self.lock:
+            self.calls.append((collection, list(queries), n_results))
+        if collection in self.fail:
+            raise RuntimeError(f"{collection} is down")
+        return {
+            "ids": [[f"{collection}:{q}:{i}" for i in range(n_results)] for q in queries],
+            "documents": [[q] * n_results for q in queries],
+            "metadatas": [[{"rank": i} for i in range(n_results)] for q in queries],
+            "distances": [[i / 10 for i in range(n_results)] for q in queries],
+        }
+
+
+def test_split_query_result_takes_one_row():
+    results = Runner()("kb", ["a", "b"], 3)
+    single = split_query_result(results, 1, 2)
+    assert single["ids"] == ["kb:b:0", "kb:b:1"]
+    assert single["distances"] == [0.0, 0.1]
+    assert split_query_result({"ids": [["x"]]}, 0, 1)["documents"] == []
+
+
+def test_run_grouped_runs_one_query_per_collection():
+    runner = Runner(fail={"down"})
+    out = run_grouped(runner, [("kb", "a", 2), ("faq", "a", 1), ("kb", "b", 3), ("kb", "a", 1), ("down", "x", 1)])
+    assert sorted(runner.calls) == [("down", ["x"], 1), ("faq", ["a"], 1), ("kb", ["a", "b"], 3)]
+    assert out[0]["ids"] == ["kb:a:0", "kb:a:1"]
+    assert out[1]["ids"] == ["faq:a:0"]
+    assert out[2]["ids"] == ["kb:b:0", "kb:b:1", "kb:b:2"]
+    assert out[3]["ids"] == ["kb:a:0"]
+    assert isinstance(out[4], RuntimeError)
+
+
+def test_concurrent_queries_share_one_call():
+    runner = Runner()
+    batcher = QueryBatcher(runner, window=0.05)
+
+    async def main():
+        return await asyncio.gather(*(batcher.submit("kb", f"q{i}", i + 1) for i in range(5)))
+
+    results = asyncio.run(main())
+    assert runner.calls == [("kb", ["q0", "q1", "q2", "q3", "q4"], 5)]
+    for i, result in enumerate(results):
+        assert result["ids"] == [f"kb:q{i}:{r}" for r in range(i + 1)]
+        assert result["documents"] == [f"q{i}"] * (i + 1)
+    assert batcher.stats() == {"batches": 1, "queries": 5, "avg_batch_size": 5.0}
+
+
+def test_collections_are_batched_separately_and_errors_stay_with_their_callers():
+    runner = Runner(fail={"down"})
+    batcher = QueryBatcher(runner)
+
+    async def main():
+        return await asyncio.gather(
+            batcher.submit("kb", "a", 1),
+            batcher.submit("down", "b", 1),
+            batcher.submit("kb", "c", 1),
+            return_exceptions=True,
+        )
+
+    kb_a, down, kb_c = asyncio.run(main())
+    assert sorted(runner.calls) == [("down", ["b"], 1), ("kb", ["a", "c"], 1)]
+    assert kb_a["ids"] == ["kb:a:0"] and kb_c["ids"] == ["kb:c:0"]
+    assert isinstance(down, RuntimeError)
+
+
+def test_max_batch_flushes_immediately():
+    runner = Runner()
+    batcher = QueryBatcher(runner, max_batch=2)
+
+    async def main():
+        return await asyncio.gather(*(batcher.submit("kb", q, 1) for q in "abc"))
+
+    results = asyncio.run(main())
+    assert [call[1] for call in runner.calls] == [["a", "b"], ["c"]]
+    assert [r["ids"] for r in results] == [["kb:a:0"], ["kb:b:0"], ["kb:c:0"]]
+
+
+def test_an_isolated_query_does_not_wait_for_the_window():
+    runner = Runner()
+    batcher = QueryBatcher(runner, window=10.0)
+
+    async def main():
+        return await asyncio.wait_for(batcher.submit("kb", "a", 1), timeout=5)
+
+    assert asyncio.run(main())["ids"] == ["kb:a:0"]
@@ -0,0 +1,113 @@
+"""Tests for the LRU cache and the query-embedding / search-result caches."""
+import pytest
+
+from src import cache
+from src.cache import LRUCache
+
+np = pytest.importorskip("numpy")
+
+from src.query_cache import EmbeddingCache, ResultCache, normalize_query  # noqa: E402
+from src.store import ChromaStore  # noqa: E402
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cache.time, "monotonic", lambda: now[0])
+    return now
+
+
+def _hits(*ids: str) -> dict[str, list]:
+    return {"ids": list(ids), "documents": [f"doc {i}" for i in ids], "metadatas": [{} for _ in ids]}
+
+
+def test_least_recently_used_entry_is_evicted():
+    lru = LRUCache(max_size=2)
+    lru.put("a", 1)
+    lru.put("b", 2)
+    assert lru.get("a") == 1
+    lru.put("c", 3)
+    assert lru.get("b") is None
+    assert (lru.get("a"), lru.get("c")) == (1, 3)
+    assert lru.stats()["evictions"] == 1
+
+
+def test_entries_expire_after_ttl(clock):
+    lru = LRUCache(ttl=60)
+    lru.put("a", 1)
+    clock[0] += 60
+    assert lru.get("a") == 1
+    clock[0] += 1
+    assert lru.get("a") is None
+    assert len(lru) == 0
+    assert (lru.hits, lru.misses) == (1, 1)
+
+
+def test_byte_budget_evicts_oldest_entries():
+    lru = LRUCache(max_size=100, max_bytes=10, sizeof=len)
+    lru.put("a", "xxxx")
+    lru.put("b", "xxxx")
+    lru.put("c", "xxxx")
+    assert lru.get("a") is None and lru.nbytes == 8
+    lru.put("b", "x")
+    assert lru.nbytes == 5
+    # A single value over budget is not kept
+    lru.put("d", "x" * 11)
+    assert lru.get("d") is None and lru.nbytes == 0
+
+
+def test_embedding_cache_embeds_each_normalized_query_once():
+    class Collection:
+        def __init__(self):
+            self.calls = []
+
+        def _embed(self, input, is_query):
+            self.calls.append(list(input))
+            return [[float(len(t)), 1.0] for t in input]
+
+    coll = Collection()
+    embeddings = EmbeddingCache()
+    first = embeddings.embed(coll, ["Bees  make honey", "wax"])
+    second = embeddings.embed(coll, ["bees make HONEY", "wax", "hive"])
+    assert coll.calls == [["Bees  make honey", "wax"], ["hive"]]
+    np.testing.assert_array_equal(first[0], second[0])
+    assert normalize_query(" Bees\tmake  HONEY ") == "bees make honey"
+    assert embeddings.lookup(coll, "WAX") is not None
+
+
+def test_exact_hits_are_keyed_by_collection_and_max_results():
+    results = ResultCache()
+    vector = np.array([1.0, 0.0], dtype=np.float32)
+    results.put("kb", 0, vector, 5, _hits("a"))
+    assert results.get("kb", 0, vector, 5)["ids"] == ["a"]
+    assert results.get("kb", 0, vector, 3) is None
+    assert results.get("other", 0, vector, 5) is None
+
+
+def test_semantic_threshold():
+    results = ResultCache(similarity_threshold=0.95)
+    results.put("kb", 0, np.array([1.0, 0.0], dtype=np.float32), 5, _hits("a"))
+    close = np.array([0.99, 0.1], dtype=np.float32)   # cosine ~0.995
+    far = np.array([0.7, 0.7], dtype=np.float32)      # cosine ~0.707
+    assert results.get("kb", 0, close, 5)["ids"] == ["a"]
+    assert results.get("kb", 0, far, 5) is None
+    assert results.stats()["semantic_hits"] == 1
+    # Exact-only caches never answer a different embedding
+    assert ResultCache().get("kb", 0, close, 5) is None
+
+
+def test_a_write_makes_cached_results_unreachable():
+    store = ChromaStore("/nonexistent")
+    results = ResultCache(similarity_threshold=0.5)
+    vector = np.array([1.0, 0.0], dtype=np.float32)
+    results.put("kb", store.version("kb"), vector, 5, _hits("a"))
+    results.put("faq", store.version("faq"), vector, 5, _hits("q"))
+
+    store.bump_version("kb")
+    assert results.get("kb", store.version("kb"), vector, 5) is None
+    assert results.get("faq", store.version("faq"), vector, 5)["ids"] == ["q"]
+
+    results.invalidate_collection("faq")
+    assert len(results.cache) == 1
+    results.invalidate_collection("kb")
+    assert len(results.cache) == 0
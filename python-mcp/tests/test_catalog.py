@@ -0,0 +1,121 @@
+"""Tests for the write-maintained collection statistics catalog."""
+from src.catalog import CollectionCatalog
+
+
+class FakeCollection:
+    """The slice of a ChromaDB collection the catalog reads."""
+
+    def __init__(self, name: str, rows: dict[str, tuple[str, dict]], dimension: int = 3):
+        self.name = name
+        self.rows = rows
+        self.dimension = dimension
+
+    def count(self) -> int:
+        return len(self.rows)
+
+    def get(self, ids=None, include=(), limit=None, offset=0):
+        chosen = list(self.rows) if ids is None else [i for i in ids if i in self.rows]
+        chosen = chosen[offset:None if limit is None else offset + limit]
+        return {
+            "ids": chosen,
+            "documents": [self.rows[i][0] for i in chosen],
+            "metadatas": [self.rows[i][1] for i in chosen],
+            "embeddings": [[0.0] * self.dimension for _ in chosen],
+        }
+
+
+def _catalog(tmp_path, **kwargs) -> CollectionCatalog:
+    return CollectionCatalog(
+        tmp_path / "catalog.json",
+        exclude=["content_hash"],
+        is_document=lambda meta: meta.get("chunk_index", 0) == 0,
+        **kwargs,
+    )
+
+
+def test_scan_counts_entries_documents_and_values(tmp_path):
+    coll = FakeCollection("kb-main", {
+        "a#0": ("Bees", {"category": "science", "chunk_index": 0, "content_hash": "x"}),
+        "a#1": ("make honey", {"category": "science", "chunk_index": 1}),
+        "b": ("Rome", {"category": "history"}),
+    })
+    stats = _catalog(tmp_path).ensure("kb-main", coll)
+    assert (stats.entries, stats.documents, stats.bytes, stats.dimension) == (3, 2, 18, 3)
+    assert stats.cardinalities() == {"category": 2, "chunk_index": 2}
+
+
+def test_add_and_remove(tmp_path):
+    catalog = _catalog(tmp_path)
+    catalog.ensure("kb-main", FakeCollection("kb-main", {}))
+    catalog.add("kb-main", ["Bees", "Wax"], [{"category": "science"}, {"category": "craft"}])
+    stats = catalog.get("kb-main")
+    assert (stats.entries, stats.documents, stats.bytes) == (2, 2, 7)
+    assert stats.cardinalities() == {"category": 2}
+
+    catalog.remove("kb-main", ["Wax"], [{"category": "craft"}])
+    assert stats.cardinalities() == {"category": 1}
+    catalog.remove("kb-main", ["Bees"], [{"category": "science"}])
+    assert (stats.entries, stats.bytes, stats.values) == (0, 0, {})
+    # Writes to collections not catalogued yet are picked up by their first scan
+    catalog.add("other", ["x"], [{}])
+    assert "other" not in catalog
+
+
+def test_bool_and_number_values_stay_apart(tmp_path):
+    catalog = _catalog(tmp_path)
+    catalog.ensure("kb-main", FakeCollection("kb-main", {}))
+    catalog.add("kb-main", ["a", "b", "c", "d"], [{"flag": True}, {"flag": 1}, {"flag": 1.0}, {"flag": False}])
+    assert catalog.get("kb-main").cardinalities() == {"flag": 3}
+    catalog.remove("kb-main", ["a"], [{"flag": True}])
+    catalog.remove("kb-main", ["b"], [{"flag": 1}])
+    assert catalog.get("kb-main").cardinalities() == {"flag": 2}
+
+    catalog.flush(force=True)
+    reloaded = _catalog(tmp_path).get("kb-main")
+    assert reloaded.values == catalog.get("kb-main").values
+
+
+def test_high_cardinality_keys_stop_being_counted(tmp_path):
+    catalog = _catalog(tmp_path, max_values=2)
+    catalog.ensure("kb-main", FakeCollection("kb-main", {}))
+    catalog.add("kb-main", ["a", "b", "c"], [{"title": f"t{i}", "kind": "doc"} for i in range(3)])
+    stats = catalog.get("kb-main")
+    assert stats.cardinalities() == {"kind": 1, "title": None}
+    catalog.add("kb-main", ["d"], [{"title": "t0"}])
+    assert "title" not in stats.values
+
+
+def test_persisted_and_reloaded(tmp_path):
+    catalog = _catalog(tmp_path, save_interval=60)
+    catalog.ensure("kb-main", FakeCollection("kb-main", {"a": ("Bees", {"n": 1})}))
+    catalog.flush()
+    catalog.touch("kb-main")
+    catalog.flush()  # within save_interval: not saved again
+    assert _catalog(tmp_path).get("kb-main").modified is None
+    catalog.flush(force=True)
+    assert _catalog(tmp_path).get("kb-main").summary() == catalog.get("kb-main").summary()
+
+    read_only = _catalog(tmp_path, read_only=True)
+    read_only.drop("kb-main")
+    read_only.flush(force=True)
+    assert "kb-main" in _catalog(tmp_path)
+
+
+def test_reconcile_rescans_collections_written_elsewhere(tmp_path):
+    kept = FakeCollection("kb-kept", {"a": ("Bees", {})})
+    changed = FakeCollection("kb-changed", {"a": ("Bees", {})})
+    catalog = _catalog(tmp_path)
+    for coll in (kept, changed, FakeCollection("kb-gone", {})):
+        catalog.ensure(coll.name, coll)
+    before = catalog.get("kb-kept")
+
+    changed.rows["b"] = ("Wax", {"category": "craft"})  # e.g. seed.py
+    created = FakeCollection("kb-new", {"a": ("Rome", {})})
+    catalog.reconcile([kept, changed, created])
+    assert [stats.name for stats in catalog.all()] == ["kb-changed", "kb-kept", "kb-new"]
+    assert catalog.get("kb-kept") is before
+    assert catalog.get("kb-changed").entries == 2 and catalog.get("kb-new").entries == 1
+    assert catalog.reconciled and (tmp_path / "catalog.json").exists()
+
+    catalog.reconcile([kept, changed, created], full=True)
+    assert catalog.get("kb-kept") is not before
@@ -0,0 +1,128 @@
+"""Tests for token-window chunking, hit collapsing and parent reconstruction."""
+import random
+import re
+
+import pytest
+
+from src.chunking import (
+    COUNT_KEY, INDEX_KEY, PARENT_KEY, START_KEY, chunk_documents, chunk_text, collapse_chunks, reconstruct,
+)
+from src.ingest import HASH_KEY
+
+WORDS = "bees honey hive flower spring pollen queen worker wax comb nectar".split()
+
+
+def _text(sentences: int, seed: int = 0) -> str:
+    rng = random.Random(seed)
+    return " ".join(
+        " ".join(rng.choice(WORDS) for _ in range(rng.randint(4, 12))).capitalize() + "."
+        for _ in range(sentences)
+    )
+
+
+def _tokens(text: str) -> int:
+    return len(re.findall(r"\w+|[^\w\s]", text))
+
+
+def test_short_text_is_one_chunk():
+    assert chunk_text("Bees make honey.", max_tokens=8) == [(0, "Bees make honey.", 0, 16)]
+    assert chunk_text("", max_tokens=8) == [(0, "", 0, 0)]
+
+
+@pytest.mark.parametrize("max_tokens,overlap", [(16, 4), (32, 8), (50, 0), (20, 30)])
+def test_chunks_are_bounded_contiguous_slices(max_tokens, overlap):
+    text = _text(40)
+    chunks = chunk_text(text, max_tokens=max_tokens, overlap=overlap)
+    assert len(chunks) > 1
+    assert [c.index for c in chunks] == list(range(len(chunks)))
+    assert chunks[0].start == 0 and chunks[-1].end == len(text)
+    for chunk, following in zip(chunks, chunks[1:]):
+        assert following.start > chunk.start
+        assert following.start <= chunk.end  # windows overlap or touch, nothing is skipped
+    for chunk in chunks:
+        assert chunk.text == text[chunk.start:chunk.end]
+        assert _tokens(chunk.text) <= max_tokens
+
+
+def test_windows_prefer_sentence_ends():
+    text = _text(40, seed=3)
+    chunks = chunk_text(text, max_tokens=40, overlap=5)
+    ends = [c.text.rstrip()[-1] for c in chunks[:-1]]
+    assert ends.count(".") >= len(ends) - 1
+
+
+def test_chunk_documents_tags_chunks_and_keeps_short_documents():
+    long = _text(30)
+    units = chunk_documents(
+        [("short", "Bees make honey.", {"lang": "en", HASH_KEY: "h"}), ("long", long, {"lang": "en", HASH_KEY: "h"})],
+        max_tokens=32,
+        overlap=4,
+    )
+    assert units[0] == ("short", "Bees make honey.", {"lang": "en", HASH_KEY: "h"})
+    chunks = units[1:]
+    assert [doc_id for doc_id, _, _ in chunks] == [f"long#{i}" for i in range(len(chunks))]
+    for i, (_, _, meta) in enumerate(chunks):
+        assert meta[PARENT_KEY] == "long" and meta[INDEX_KEY] == i and meta[COUNT_KEY] == len(chunks)
+        assert meta["lang"] == "en" and meta[HASH_KEY] != "h"
+    assert len({meta[HASH_KEY] for _, _, meta in chunks}) == len(chunks)
+
+
+def test_chunking_disabled():
+    long = _text(30)
+    assert chunk_documents([("long", long, {})], max_tokens=0) == [("long", long, {})]
+
+
+def test_reconstruct_restores_text_and_metadata():
+    text = _text(30, seed=7)
+    units = chunk_documents([("doc", text, {"lang": "en"})], max_tokens=24, overlap=6)
+    shuffled = [(chunk, meta) for _, chunk, meta in units]
+    random.Random(1).shuffle(shuffled)
+    assert reconstruct(shuffled) == (text, {"lang": "en"})
+
+
+def test_reconstruct_single_unchunked_document():
+    assert reconstruct([("Bees make honey.", {"lang": "en", HASH_KEY: "h"})]) == ("Bees make honey.", {"lang": "en"})
+
+
+def test_collapse_keeps_best_hit_per_parent():
+    results = {
+        "ids": ["a#2", "b", "a#0", "c#1", "c#0"],
+        "documents": ["a2", "b", "a0", "c1", "c0"],
+        "metadatas": [
+            {PARENT_KEY: "a", INDEX_KEY: 2, START_KEY: 10},
+            {"lang": "en"},
+            {PARENT_KEY: "a", INDEX_KEY: 0},
+            {PARENT_KEY: "c", INDEX_KEY: 1},
+            {PARENT_KEY: "c", INDEX_KEY: 0},
+        ],
+        "distances": [0.1, 0.2, 0.3, 0.4, 0.5],
+        "included": ["documents"],
+    }
+    collapsed = collapse_chunks(results, n_results=5)
+    assert collapsed["ids"] == ["a", "b", "c"]
+    assert collapsed["documents"] == ["a2", "b", "c1"]
+    assert collapsed["distances"] == [0.1, 0.2, 0.4]
+    assert collapsed["metadatas"][0] == {INDEX_KEY: 2, START_KEY: 10}
+    assert collapsed["included"] == ["documents"]
+
+    assert collapse_chunks(results, n_results=2)["ids"] == ["a", "b"]
+    assert collapse_chunks({"ids": []}, n_results=3)["ids"] == []
+
+
+def test_ingest_report_counts_documents_not_chunks():
+    chromadb = pytest.importorskip("chromadb")
+    from src.ingest import ingest_documents, normalize_documents
+
+    coll = chromadb.EphemeralClient().get_or_create_collection("chunk-report", embedding_function=None)
+    embed = lambda texts: [[float(len(t)), 1.0] for t in texts]  # noqa: E731
+    docs = [{"id": "long", "content": _text(30)}, {"id": "short", "content": "Bees make honey."}]
+    units = chunk_documents(normalize_documents(docs), max_tokens=32, overlap=4)
+    assert len(units) > 2
+
+    report = ingest_documents(coll, units, embed=embed, group_key=PARENT_KEY)
+    assert (report.added, report.updated, report.skipped) == (2, 0, 0)
+
+    docs[0]["content"] += " One more sentence about wax."
+    units = chunk_documents(normalize_documents(docs), max_tokens=32, overlap=4)
+    report = ingest_documents(coll, units, embed=embed, group_key=PARENT_KEY)
+    assert (report.added, report.updated, report.skipped) == (0, 1, 1)
@@ -0,0 +1,110 @@
+"""Tests for how the cluster dispatcher routes MCP requests."""
+import json
+
+import pytest
+
+httpx = pytest.importorskip("httpx")
+
+from starlette.testclient import TestClient  # noqa: E402
+
+from src.cluster import Backend, Dispatcher, cursor_owner, write_calls  # noqa: E402
+from src.pagination import ResultPages, Snapshot  # noqa: E402
+
+
+def _call(name: str, **arguments) -> bytes:
+    return json.dumps({
+        "jsonrpc": "2.0", "id": 1, "method": "tools/call", "params": {"name": name, "arguments": arguments},
+    }).encode()
+
+
+class Body(httpx.AsyncByteStream):
+    """A streamed response body, as a backend sends it."""
+
+    def __init__(self, payload: dict):
+        self.data = json.dumps(payload).encode()
+
+    async def __aiter__(self):
+        yield self.data
+
+
+def _cursor(owner: str) -> str:
+    ranked = {"ids": ["a", "b", "c"], "documents": ["a", "b", "c"], "metadatas": [{}] * 3, "distances": [0.1] * 3}
+    return ResultPages(owner=owner).first_page(Snapshot("q", "kb", ranked, page_size=1))[1]
+
+
+@pytest.fixture
+def dispatcher(tmp_path):
+    writer = Backend("writer", 9001, {})
+    readers = [Backend(f"reader-{i}", 9002 + i, {}) for i in range(3)]
+    return Dispatcher(writer, readers, tmp_path)
+
+
+def test_write_calls():
+    assert write_calls(_call("add_document", content="x"))
+    assert write_calls(json.dumps([json.loads(_call("search_documents")), json.loads(_call("delete_document"))]).encode())
+    assert not write_calls(_call("search_documents", query="x"))
+    assert not write_calls(b'{"jsonrpc": "2.0", "id": 1, "method": "tools/list"}')
+    assert not write_calls(b"not json")
+
+
+def test_writes_go_to_the_writer(dispatcher):
+    assert dispatcher.route(_call("add_document", content="x")) is dispatcher.writer
+    assert dispatcher.route(_call("delete_document", document_id="x")) is dispatcher.writer
+
+
+def test_reads_go_to_the_least_busy_reader(dispatcher):
+    busy = {"reader-0": 2, "reader-1": 0, "reader-2": 1}
+    for reader in dispatcher.readers:
+        reader.inflight = busy[reader.name]
+    assert dispatcher.route(_call("search_documents", query="x")).name == "reader-1"
+    assert dispatcher.route(b'{"jsonrpc": "2.0", "id": 1, "method": "tools/list"}').name == "reader-1"
+    assert dispatcher.pick(exclude={"reader-1"}).name == "reader-2"
+    assert dispatcher.pick(exclude={r.name for r in dispatcher.readers}) is None
+
+
+def test_idle_readers_take_turns(dispatcher):
+    names = [dispatcher.route(_call("search_documents", query="x")).name for _ in range(6)]
+    assert sorted(set(names)) == ["reader-0", "reader-1", "reader-2"]
+
+
+def test_a_cursor_goes_back_to_its_reader(dispatcher):
+    body = _call("search_documents", query="q", cursor=_cursor("reader-2"))
+    assert cursor_owner(body) == "reader-2"
+    dispatcher.readers[2].inflight = 5
+    assert dispatcher.route(body).name == "reader-2"
+    # A cursor from a reader that is gone is served by any reader (and expires there)
+    assert dispatcher.route(_call("search_documents", query="q", cursor=_cursor("reader-9"))).name != "reader-9"
+
+
+def test_forward_retries_reads_on_another_reader(dispatcher):
+    seen = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.append(request.url.port)
+        if request.url.port == 9002:
+            raise httpx.ConnectError("refused")
+        return httpx.Response(200, stream=Body({"port": request.url.port}))
+
+    dispatcher._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    dispatcher.readers[1].inflight = dispatcher.readers[2].inflight = 1
+    with TestClient(dispatcher.app) as client:
+        response = client.post("/mcp", content=_call("search_documents", query="x"))
+        assert response.status_code == 200 and response.json()["port"] in (9003, 9004)
+        assert seen[0] == 9002 and dispatcher.readers[0].errors == 1
+
+        response = client.post("/mcp", content=_call("add_document", content="x"))
+        assert response.json() == {"port": 9001}
+        assert [b.inflight for b in dispatcher.readers] == [0, 1, 1] and dispatcher.writer.inflight == 0
+
+
+def test_writes_are_not_retried_on_a_reader(dispatcher):
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.port == 9001:
+            raise httpx.ConnectError("refused")
+        return httpx.Response(200, stream=Body({}))
+
+    dispatcher._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    with TestClient(dispatcher.app) as client:
+        response = client.post("/mcp", content=_call("add_document", content="x"))
+    assert response.status_code == 503
+    assert sum(b.requests for b in dispatcher.readers) == 0
@@ -0,0 +1,144 @@
+"""Tests for the embedding engine's disk cache, warm start and model naming."""
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from src.embedding import MODEL_NAME, DiskEmbeddingCache, EmbeddingEngine, OnnxMiniLM  # noqa: E402
+
+
+class StubFunction:
+    """Embedding function with a fixed name, as attached to a collection."""
+
+    def __init__(self, name: str):
+        self._name = name
+
+    def name(self) -> str:
+        return self._name
+
+
+class StubCollection:
+    """Collection whose own embedding function counts what it embeds."""
+
+    def __init__(self, function: str = "stub"):
+        self._embedding_function = StubFunction(function)
+        self.embedded: list[str] = []
+
+    def _embed(self, input, is_query=False):
+        self.embedded.extend(input)
+        return [[float(len(text)), float(is_query)] for text in input]
+
+
+class StubModel(OnnxMiniLM):
+    """OnnxMiniLM without the model files: vectors come from text lengths."""
+
+    def __init__(self, quantize: bool = False, fail: bool = False):
+        super().__init__(quantize=quantize)
+        self.fail = fail
+        self.calls: list[list[str]] = []
+
+    def load(self) -> None:
+        if self.fail:
+            raise RuntimeError("model files missing")
+        self._session = object()
+
+    def __call__(self, texts):
+        self.load()
+        self.calls.append(list(texts))
+        return np.array([[float(len(text)), 1.0] for text in texts], dtype=np.float32)
+
+
+def test_disk_cache_round_trip(tmp_path):
+    cache = DiskEmbeddingCache(tmp_path / "embeddings.sqlite3")
+    cache.put_many("m", ["a", "b"], [[1.0, 2.0], np.array([3.0, 4.0])])
+    found = cache.get_many("m", ["b", "x", "a", "b"])
+    assert found[1] is None
+    np.testing.assert_array_equal(found[0], [3.0, 4.0])
+    np.testing.assert_array_equal(found[2], [1.0, 2.0])
+    assert cache.get_many("other", ["a"]) == [None]
+    assert cache.stats()["hits"] == 3 and cache.stats()["misses"] == 2
+    cache.close()
+    # Stored vectors survive a restart
+    assert DiskEmbeddingCache(cache.path).get_many("m", ["a"])[0] is not None
+
+
+def test_cached_documents_are_not_embedded_again(tmp_path):
+    path = tmp_path / "embeddings.sqlite3"
+    coll = StubCollection()
+    engine = EmbeddingEngine(backend="chroma", cache_path=path)
+    first = engine.embed(coll, ["bees", "wax", "bees"])
+    assert coll.embedded == ["bees", "wax"] and engine.computed == 2
+    engine.close()
+
+    engine = EmbeddingEngine(backend="chroma", cache_path=path)
+    again = engine.embed(coll, ["wax", "bees", "hive"])
+    assert coll.embedded == ["bees", "wax", "hive"]
+    np.testing.assert_array_equal(again[1], first[0])
+    assert engine.stats()["disk_cache"]["hits"] == 2
+
+
+def test_queries_skip_the_disk_cache(tmp_path):
+    coll = StubCollection()
+    engine = EmbeddingEngine(backend="chroma", cache_path=tmp_path / "embeddings.sqlite3")
+    engine.embed(coll, ["bees"], is_query=True)
+    engine.embed(coll, ["bees"], is_query=True)
+    assert coll.embedded == ["bees", "bees"]
+    assert engine.cache.writes == 0
+
+
+def test_cache_key_follows_the_model(tmp_path):
+    path = tmp_path / "embeddings.sqlite3"
+    engine = EmbeddingEngine(backend="chroma", cache_path=path)
+    stub, other = StubCollection("stub"), StubCollection("other")
+    engine.embed(stub, ["bees"])
+    engine.embed(other, ["bees"])
+    assert stub.embedded == other.embedded == ["bees"]
+
+    # The int8 model gets its own entries, since its vectors differ slightly
+    assert OnnxMiniLM().name == MODEL_NAME
+    assert OnnxMiniLM(quantize=True).name == f"{MODEL_NAME}-int8"
+    default = StubCollection("default")
+    for quantize in (False, True):
+        engine = EmbeddingEngine(cache_path=path, quantize=quantize)
+        engine.onnx = StubModel(quantize=quantize)
+        assert engine.model_name(default) == engine.onnx.name
+        engine.embed(default, ["bees"])
+        assert engine.onnx.calls == [["bees"]]
+    assert default.embedded == []
+
+
+def test_collections_with_other_functions_keep_them():
+    engine = EmbeddingEngine()
+    engine.onnx = StubModel()
+    coll = StubCollection("bench-hash")
+    assert engine.model_name(coll) == "bench-hash"
+    engine.embed(coll, ["bees"])
+    assert coll.embedded == ["bees"] and engine.onnx.calls == []
+
+
+def test_warm_up_loads_the_model_before_the_first_request():
+    engine = EmbeddingEngine()
+    engine.onnx = StubModel()
+    engine.warm_up()
+    assert engine.onnx.calls == [["warm up"]]
+    stats = engine.stats()
+    assert stats["loaded"] and stats["warmup_seconds"] is not None and stats["warmup_error"] is None
+
+
+def test_failed_warm_up_is_reported_not_raised():
+    engine = EmbeddingEngine()
+    engine.onnx = StubModel(fail=True)
+    engine.warm_up()
+    assert engine.stats()["warmup_error"] == "model files missing"
+
+
+def test_existing_int8_model_is_reused(tmp_path):
+    model = tmp_path / "model.onnx"
+    model.write_bytes(b"fp32")
+    (tmp_path / "model_int8.onnx").write_bytes(b"int8")
+    assert OnnxMiniLM._quantized(model) == tmp_path / "model_int8.onnx"
+    assert (tmp_path / "model_int8.onnx").read_bytes() == b"int8"
+
+
+def test_unknown_backend():
+    with pytest.raises(ValueError, match="Unknown embedding backend"):
+        EmbeddingEngine(backend="gpu")
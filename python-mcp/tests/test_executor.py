@@ -0,0 +1,113 @@
+"""Tests for per-collection limits and backpressure in the bounded executor."""
+import asyncio
+import threading
+import time
+
+import pytest
+
+from src.executor import BoundedExecutor, ServerBusyError
+
+
+class Tracker:
+    """Blocking call that records how many copies run at once per collection."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.running: dict[str, int] = {}
+        self.peak: dict[str, int] = {}
+
+    def __call__(self, collection: str, seconds: float) -> str:
+        with self.lock:
+            self.running[collection] = self.running.get(collection, 0) + 1
+            self.peak[collection] = max(self.peak.get(collection, 0), self.running[collection])
+        time.sleep(seconds)
+        with self.lock:
+            self.running[collection] -= 1
+        return collection
+
+
+def test_per_collection_limit():
+    executor = BoundedExecutor(max_workers=6, max_queue=20, per_collection=2)
+    tracker = Tracker()
+
+    async def main():
+        return await asyncio.gather(*(
+            executor.run(tracker, name, 0.05, collection=name)
+            for name in ["kb"] * 6 + ["faq"] * 2
+        ))
+
+    try:
+        assert asyncio.run(main()) == ["kb"] * 6 + ["faq"] * 2
+    finally:
+        executor.shutdown()
+    assert tracker.peak == {"kb": 2, "faq": 2}
+    assert executor.stats()["completed"] == 8
+    assert (executor.pending, executor.running) == (0, 0)
+
+
+def test_full_queue_rejects_new_calls():
+    executor = BoundedExecutor(max_workers=1, max_queue=1)
+    release = threading.Event()
+
+    async def main():
+        first = asyncio.ensure_future(executor.run(release.wait))
+        second = asyncio.ensure_future(executor.run(release.wait))
+        await asyncio.sleep(0.01)
+        with pytest.raises(ServerBusyError, match="Server busy"):
+            await executor.run(release.wait)
+        release.set()
+        await asyncio.gather(first, second)
+        # Capacity frees up once calls complete
+        return await executor.run(lambda: "ok")
+
+    try:
+        assert asyncio.run(main()) == "ok"
+    finally:
+        release.set()
+        executor.shutdown()
+    assert executor.stats()["rejected"] == 1
+
+
+def test_errors_propagate_and_free_the_slot():
+    executor = BoundedExecutor(max_workers=1, max_queue=0)
+
+    def fail():
+        raise ValueError("boom")
+
+    async def main():
+        with pytest.raises(ValueError, match="boom"):
+            await executor.run(fail, collection="kb")
+        return await executor.run(lambda: 1, collection="kb")
+
+    try:
+        assert asyncio.run(main()) == 1
+    finally:
+        executor.shutdown()
+    assert executor.pending == 0
+
+
+def test_slot_is_held_until_an_abandoned_call_finishes():
+    executor = BoundedExecutor(max_workers=2, max_queue=0, per_collection=1)
+    release = threading.Event()
+    tracker = Tracker()
+
+    async def main():
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(executor.run(release.wait, collection="kb"), timeout=0.05)
+        # The thread is still busy, so its slot and its collection permit stay taken
+        assert (executor.pending, executor.running) == (1, 1)
+        queued = asyncio.ensure_future(executor.run(tracker, "kb", 0, collection="kb"))
+        await asyncio.sleep(0.05)
+        assert not queued.done() and tracker.peak == {}
+        with pytest.raises(ServerBusyError):
+            await executor.run(lambda: None)
+
+        release.set()
+        assert await asyncio.wait_for(queued, timeout=5) == "kb"
+
+    try:
+        asyncio.run(main())
+    finally:
+        release.set()
+        executor.shutdown()
+    assert (executor.pending, executor.running, executor.completed) == (0, 0, 2)
@@ -0,0 +1,80 @@
+"""Tests for collection globs and the federated merge."""
+import pytest
+
+from src.federation import is_pattern, merge_scores, merge_top_k, resolve_collections
+from src.results import build_records
+
+
+def _shard(prefix: str, distances: list[float]) -> dict[str, list]:
+    return {
+        "ids": [f"{prefix}{i}" for i in range(len(distances))],
+        "documents": [f"{prefix} doc {i}" for i in range(len(distances))],
+        "metadatas": [{"i": i} for i in range(len(distances))],
+        "distances": distances,
+    }
+
+
+def test_resolve_collections():
+    available = ["kb-history", "kb-science", "faq", "misc"]
+    assert is_pattern("kb-*") and not is_pattern("faq")
+    assert resolve_collections(["kb-*", "faq", "kb-science"], available) == (["kb-history", "kb-science", "faq"], [])
+    assert resolve_collections(["nope*", "gone", "misc"], available) == (["misc"], ["nope*", "gone"])
+
+
+def test_shared_space_merges_on_raw_distances():
+    shards = {"a": _shard("a", [0.2, 0.9, 1.5]), "b": _shard("b", [0.1, 0.3])}
+    merged = merge_top_k(shards, merge_scores(shards, shared_space=True), 4, shared_space=True)
+    assert merged["ids"] == ["b0", "a0", "b1", "a1"]
+    assert merged["collections"] == ["b", "a", "b", "a"]
+    assert merged["distances"] == [0.1, 0.2, 0.3, 0.9]
+    assert "scores" not in merged
+    assert merged["metadatas"] == [{"i": 0}, {"i": 0}, {"i": 1}, {"i": 1}]
+
+
+def test_shared_space_scores_match_a_single_collection_search():
+    shards = {"a": _shard("a", [0.8, 1.0]), "b": _shard("b", [1.2])}
+    merged = merge_top_k(shards, merge_scores(shards, shared_space=True), 3, shared_space=True)
+    alone = build_records(shards["a"])
+    federated = [r for r in build_records(merged) if r["collection"] == "a"]
+    assert [r["score"] for r in federated] == [r["score"] for r in alone]
+
+
+def test_mixed_spaces_merge_by_rank():
+    # Raw values on different scales: only the ranks within each shard count
+    shards = {
+        "a": {**_shard("a", []), "ids": ["a0", "a1"], "documents": ["x", "y"], "metadatas": [{}, {}],
+              "scores": [40.0, 39.0]},
+        "b": _shard("b", [0.01, 0.02, 0.03]),
+    }
+    scores = merge_scores(shards, shared_space=False)
+    assert scores["a"] == pytest.approx(scores["b"][:2])
+    merged = merge_top_k(shards, scores, 5)
+    assert merged["ids"] == ["a0", "b0", "a1", "b1", "b2"]
+    assert merged["scores"] == sorted(merged["scores"], reverse=True)
+    assert "distances" not in merged
+
+
+def test_weak_shard_ranks_by_distance_in_a_shared_space():
+    shards = {"strong": _shard("s", [0.1, 0.2, 0.3]), "weak": _shard("w", [1.9])}
+    shared = merge_top_k(shards, merge_scores(shards, shared_space=True), 4, shared_space=True)
+    assert shared["ids"] == ["s0", "s1", "s2", "w0"]
+    # Without a shared space only ranks are comparable, so each shard's best hit
+    # gets the same fused score
+    scores = merge_scores(shards, shared_space=False)
+    assert max(scores["strong"]) == pytest.approx(max(scores["weak"]))
+    assert max(scores["weak"]) < 1.0
+
+
+def test_merge_top_k_stops_at_k_and_handles_empty_shards():
+    shards = {"a": _shard("a", [0.1, 0.2]), "b": _shard("b", []), "c": _shard("c", [0.15])}
+    merged = merge_top_k(shards, merge_scores(shards, shared_space=True), 2, shared_space=True)
+    assert merged["ids"] == ["a0", "c0"]
+    assert merge_top_k({}, {}, 3)["ids"] == []
+
+
+def test_ties_keep_collection_order():
+    shards = {"b": _shard("b", [0.5]), "a": _shard("a", [0.5])}
+    merged = merge_top_k(shards, merge_scores(shards, shared_space=True), 2, shared_space=True)
+    assert merged["collections"] == ["b", "a"]
+    merged = merge_top_k(shards, merge_scores(shards, shared_space=False), 2)
+    assert merged["collections"] == ["b", "a"]
@@ -0,0 +1,160 @@
+"""Tests for idempotent ingestion: content hashes, stale chunks and checkpoints."""
+import json
+
+import pytest
+
+from src.chunking import PARENT_KEY, chunk_documents, stale_ids
+from src.ingest import HASH_KEY, IngestCheckpoint, ingest_documents, ingest_stream, normalize_documents
+from src.sources import read_sources
+
+
+class FakeCollection:
+    """The slice of a ChromaDB collection ingestion reads and writes."""
+
+    def __init__(self):
+        self.rows: dict[str, tuple[str, dict]] = {}
+        self.embedded: list[str] = []
+        self.upserts = 0
+
+    def _embed(self, input):
+        self.embedded.extend(input)
+        return [[float(len(text)), 1.0] for text in input]
+
+    def get(self, ids=None, where=None, include=()):
+        chosen = list(self.rows) if ids is None else [i for i in ids if i in self.rows]
+        if where is not None:
+            (key, condition), = where.items()
+            chosen = [i for i in chosen if self.rows[i][1].get(key) in condition["$in"]]
+        return {
+            "ids": chosen,
+            "documents": [self.rows[i][0] for i in chosen],
+            "metadatas": [self.rows[i][1] for i in chosen],
+        }
+
+    def upsert(self, ids, documents, metadatas, embeddings):
+        assert len(embeddings) == len(ids)
+        self.upserts += 1
+        for doc_id, doc, meta in zip(ids, documents, metadatas):
+            self.rows[doc_id] = (doc, dict(meta))
+
+    def delete(self, ids):
+        for doc_id in ids:
+            self.rows.pop(doc_id, None)
+
+
+def _counts(report) -> tuple[int, int, int]:
+    return report.added, report.updated, report.skipped
+
+
+def test_normalize_documents():
+    docs = normalize_documents([
+        {"content": "Bees make honey", "title": "Bees"},
+        {"id": "x", "content": "first"},
+        {"id": "x", "content": "second", "metadata": {"lang": "en"}},
+    ])
+    assert [doc_id for doc_id, _, _ in docs][1:] == ["x"]
+    assert docs[0][0].startswith("doc-") and docs[0][2]["title"] == "Bees"
+    assert docs[1][1:] == ("second", {"lang": "en", HASH_KEY: docs[1][2][HASH_KEY]})
+    # Ids and hashes are derived from content, so they are stable across runs
+    assert normalize_documents([{"content": "Bees make honey", "title": "Bees"}]) == docs[:1]
+    with pytest.raises(ValueError, match="#2"):
+        normalize_documents([{"content": "ok"}, {"content": ""}])
+
+
+def test_unchanged_documents_are_skipped():
+    coll = FakeCollection()
+    docs = [{"id": str(i), "content": f"document {i}"} for i in range(5)]
+    report = ingest_documents(coll, normalize_documents(docs), batch_size=2)
+    assert _counts(report) == (5, 0, 0) and report.batches == 3
+
+    report = ingest_documents(coll, normalize_documents(docs), batch_size=2)
+    assert _counts(report) == (0, 0, 5)
+    assert report.batches == 0 and coll.upserts == 3
+    assert len(coll.embedded) == 5
+
+
+def test_changed_documents_are_updated():
+    coll = FakeCollection()
+    docs = [{"id": "a", "content": "bees"}, {"id": "b", "content": "wax"}]
+    ingest_documents(coll, normalize_documents(docs))
+
+    docs[0]["content"] = "bees make honey"
+    docs[1]["metadata"] = {"lang": "en"}  # metadata is part of the hash too
+    docs.append({"id": "c", "content": "hive"})
+    progress = []
+    report = ingest_documents(coll, normalize_documents(docs), on_progress=lambda done, total: progress.append(done))
+    assert _counts(report) == (1, 2, 0)
+    assert coll.rows["a"][0] == "bees make honey" and coll.rows["b"][1]["lang"] == "en"
+    assert coll.embedded[2:] == ["bees make honey", "wax", "hive"]
+    assert progress == [3]
+
+
+def test_a_shorter_update_removes_stale_chunks():
+    def store(content: str) -> list[str]:
+        documents = normalize_documents([{"id": "doc", "content": content}, {"id": "other", "content": "wax"}])
+        units = chunk_documents(documents, max_tokens=16, overlap=0)
+        ingest_documents(coll, units)
+        stale = stale_ids(coll, documents, units)
+        coll.delete(ids=stale)
+        return stale
+
+    def chunks() -> list[str]:
+        return sorted(coll.get(where={PARENT_KEY: {"$in": ["doc"]}})["ids"], key=lambda i: int(i.split("#")[1]))
+
+    coll = FakeCollection()
+    assert store(" ".join(f"Sentence number {i} about bees." for i in range(12))) == []
+    before = chunks()
+    assert len(before) > 3
+
+    stale = store(" ".join(f"Sentence number {i} about bees." for i in range(5)))
+    after = chunks()
+    assert stale and after == before[:len(after)]
+    assert sorted(stale) == sorted(before[len(after):])
+
+    # Short enough for one window: stored under its own id and every chunk goes
+    assert store("Bees.") == sorted(after)
+    assert sorted(coll.rows) == ["doc", "other"]
+
+
+def test_checkpoint_resumes_after_an_interruption(tmp_path):
+    source = tmp_path / "docs.jsonl"
+    source.write_text("".join(json.dumps({"id": str(i), "text": f"document {i}"}) + "\n" for i in range(7)))
+    path = tmp_path / "ingest.json"
+    coll = FakeCollection()
+
+    def run(stop_after: int | None = None):
+        checkpoint = IngestCheckpoint(path, "kb")
+        batches = []
+
+        def on_batch(totals):
+            batches.append(totals.received)
+            if len(batches) == stop_after:
+                raise KeyboardInterrupt
+
+        totals = ingest_stream(
+            coll, read_sources([source], resume=checkpoint.sources), prepare=list,
+            batch_size=3, checkpoint=checkpoint, on_batch=on_batch,
+        )
+        return checkpoint, totals
+
+    with pytest.raises(KeyboardInterrupt):
+        run(stop_after=1)
+    assert sorted(coll.rows) == ["0", "1", "2"]
+    assert IngestCheckpoint(path, "kb").resumed
+    assert not IngestCheckpoint(path, "other").resumed
+
+    checkpoint, totals = run()
+    assert sorted(coll.rows) == [str(i) for i in range(7)]
+    assert coll.embedded == [f"document {i}" for i in range(7)]  # nothing read twice
+    assert (totals.received, totals.added) == (7, 7)
+
+    # A finished source is not read again; an edited one is read from the start
+    assert run()[1].received == 7
+    assert coll.embedded == [f"document {i}" for i in range(7)]
+    with source.open("a") as f:
+        f.write(json.dumps({"id": "7", "text": "document 7"}) + "\n")
+    checkpoint, totals = run()
+    # Totals carry on from the checkpointed run: 7 + 8 received
+    assert (totals.received, totals.added, totals.skipped) == (15, 8, 7)
+    checkpoint.clear()
+    assert not path.exists()
@@ -0,0 +1,105 @@
+"""Tests for the BM25 index, rank fusion and the per-collection index manager."""
+import json
+
+import pytest
+
+from src.lexical import BM25Index, LexicalIndexManager, reciprocal_rank_fusion, tokenize
+
+
+class FakeCollection:
+    """The slice of a ChromaDB collection the index manager reads."""
+
+    def __init__(self, docs: dict[str, str]):
+        self.docs = docs
+
+    def count(self) -> int:
+        return len(self.docs)
+
+    def get(self, include=(), limit=None, offset=0, ids=None):
+        chosen = list(self.docs) if ids is None else [i for i in ids if i in self.docs]
+        chosen = chosen[offset:None if limit is None else offset + limit]
+        return {"ids": chosen, "documents": [self.docs[i] for i in chosen]}
+
+
+@pytest.fixture
+def index() -> BM25Index:
+    index = BM25Index()
+    index.add_many([
+        ("bees", "Bees make honey in hives"),
+        ("tsc", "Run tsc to compile TypeScript"),
+        ("honey", "Honey honey honey, a sweet food made by bees"),
+        ("rome", "The Roman empire fell"),
+    ])
+    return index
+
+
+def test_tokenize_drops_stop_words_and_case():
+    assert tokenize("The Quick, brown FOX is here") == ["quick", "brown", "fox", "here"]
+
+
+def test_search_ranks_term_frequency_and_rarity(index):
+    ranked = index.search("honey")
+    assert [doc_id for doc_id, _ in ranked] == ["honey", "bees"]
+    assert ranked[0][1] > ranked[1][1] > 0
+
+
+def test_search_finds_identifiers(index):
+    assert index.search("tsc")[0][0] == "tsc"
+
+
+def test_search_without_matching_terms(index):
+    assert index.search("the of and") == []
+    assert index.search("quasar") == []
+    assert BM25Index().search("honey") == []
+
+
+def test_search_limits_and_filters(index):
+    assert len(index.search("honey bees", n_results=1)) == 1
+    assert [doc_id for doc_id, _ in index.search("honey", allowed={"bees"})] == ["bees"]
+
+
+def test_add_replaces_and_remove_forgets(index):
+    index.add("rome", "Rome had honey too")
+    assert "rome" in {doc_id for doc_id, _ in index.search("honey")}
+    assert index.search("empire") == []
+
+    index.remove("rome")
+    index.remove("missing")
+    assert len(index) == 3
+    assert "rome" not in {doc_id for doc_id, _ in index.search("honey")}
+    assert index.total_length == sum(index.doc_lengths.values())
+
+
+def test_round_trip_through_dict(index):
+    restored = BM25Index.from_dict(json.loads(json.dumps(index.to_dict())))
+    assert restored.search("honey bees") == index.search("honey bees")
+    restored.remove("honey")
+    assert "honey" not in {doc_id for doc_id, _ in restored.search("honey")}
+
+
+def test_rrf_rewards_agreement():
+    fused = reciprocal_rank_fusion([["a", "b", "c"], ["b", "a", "d"]])
+    assert [doc_id for doc_id, _ in fused][:2] == ["a", "b"]
+    assert fused[0][1] == pytest.approx(fused[1][1])
+    assert {doc_id for doc_id, _ in fused} == {"a", "b", "c", "d"}
+
+
+def test_rrf_scores_are_normalized():
+    fused = dict(reciprocal_rank_fusion([["a", "b"], ["a", "c"]], k=60))
+    assert fused["a"] == pytest.approx(1.0)
+    assert fused["b"] == pytest.approx(fused["c"]) == pytest.approx((1 / 62) / (2 / 61))
+    assert reciprocal_rank_fusion([]) == []
+
+
+def test_manager_persists_and_rebuilds_stale_indexes(tmp_path):
+    coll = FakeCollection({"a": "bees make honey", "b": "roman empire"})
+    manager = LexicalIndexManager(tmp_path)
+    assert manager.get("kb", coll).search("honey")[0][0] == "a"
+    assert (tmp_path / "kb.json").exists()
+
+    # A fresh process loads the saved index, unless the collection changed behind it
+    coll.docs["c"] = "honey cakes"
+    index = LexicalIndexManager(tmp_path).get("kb", coll)
+    assert len(index) == 3
+    assert {doc_id for doc_id, _ in index.search("honey")} == {"a", "c"}
+
@@ -0,0 +1,123 @@
+"""Tests for the metadata index behind filter planning and facets."""
+import pytest
+
+from src.metadata_index import MetadataIndex, MetadataIndexManager
+
+
+class FakeCollection:
+    """The slice of a ChromaDB collection the index manager reads."""
+
+    def __init__(self, metadatas: dict[str, dict]):
+        self.metadatas = metadatas
+
+    def count(self) -> int:
+        return len(self.metadatas)
+
+    def get(self, include=(), limit=None, offset=0, ids=None):
+        chosen = list(self.metadatas) if ids is None else [i for i in ids if i in self.metadatas]
+        chosen = chosen[offset:None if limit is None else offset + limit]
+        return {"ids": chosen, "metadatas": [self.metadatas[i] for i in chosen]}
+
+
+@pytest.fixture
+def index() -> MetadataIndex:
+    index = MetadataIndex(max_values=3, group_key="parent_id", exclude=["content_hash"])
+    index.add_many([
+        ("a", {"category": "science", "level": 1, "draft": True, "content_hash": "x"}),
+        ("b", {"category": "science", "level": 2, "draft": False}),
+        ("c", {"category": "history", "level": 3.5}),
+        ("d", {"category": "history", "level": 1, "tags": ["not", "scalar"]}),
+        ("e", None),
+    ])
+    return index
+
+
+def test_equality_is_exact(index):
+    assert index.candidates({"category": "science"}) == ({"a", "b"}, True)
+    assert index.candidates({"category": {"$eq": "history"}}) == ({"c", "d"}, True)
+    assert index.candidates({"category": "poetry"}) == (set(), True)
+
+
+def test_in_and_ranges(index):
+    assert index.candidates({"category": {"$in": ["science", "history"]}}) == ({"a", "b", "c", "d"}, True)
+    assert index.candidates({"level": {"$gte": 2}}) == ({"b", "c"}, True)
+    assert index.candidates({"level": {"$lt": 2}}) == ({"a", "d"}, True)
+
+
+def test_bool_and_number_values_stay_apart(index):
+    assert index.candidates({"draft": True}) == ({"a"}, True)
+    assert index.candidates({"level": 1}) == ({"a", "d"}, True)
+    assert index.candidates({"level": 1.0}) == ({"a", "d"}, True)
+    assert index.candidates({"level": True}) == (set(), True)
+    # Ranges never match booleans, as in ChromaDB
+    assert index.candidates({"draft": {"$gte": 0}}) == (set(), True)
+
+
+def test_and_or(index):
+    both = {"$and": [{"category": "history"}, {"level": 1}]}
+    assert index.candidates(both) == ({"d"}, True)
+    either = {"$or": [{"category": "science"}, {"level": 3.5}]}
+    assert index.candidates(either) == ({"a", "b", "c"}, True)
+
+
+def test_unindexable_filters_defer_to_chromadb(index):
+    assert index.candidates(None) == (None, False)
+    assert index.candidates({}) == (None, False)
+    assert index.candidates({"category": {"$ne": "science"}}) == (None, False)
+    assert index.candidates({"content_hash": "x"}) == (None, False)
+    assert index.candidates({"$or": [{"category": "science"}, {"category": {"$nin": ["x"]}}]}) == (None, False)
+
+
+def test_and_with_an_unknown_part_is_a_superset(index):
+    ids, exact = index.candidates({"$and": [{"category": "science"}, {"category": {"$ne": "x"}}]})
+    assert ids == {"a", "b"} and not exact
+
+
+def test_multi_key_filter_is_not_exact(index):
+    # ChromaDB rejects several keys in one dict; leave the error to it
+    assert index.candidates({"category": "science", "level": 1}) == ({"a"}, False)
+
+
+def test_high_cardinality_keys_are_dropped():
+    index = MetadataIndex(max_values=2)
+    index.add_many((str(i), {"title": f"t{i}", "kind": "doc"}) for i in range(3))
+    assert "title" in index.high_cardinality
+    assert index.candidates({"title": "t1"}) == (None, False)
+    assert index.candidates({"kind": "doc"}) == ({"0", "1", "2"}, True)
+
+
+def test_replace_and_remove(index):
+    index.add("a", {"category": "history"})
+    assert index.candidates({"category": "science"}) == ({"b"}, True)
+    index.remove("b")
+    index.remove("missing")
+    assert index.candidates({"category": "science"}) == (set(), True)
+    assert len(index) == 4
+
+
+def test_facets_count_logical_documents():
+    index = MetadataIndex(group_key="parent_id")
+    index.add_many([
+        ("p1#0", {"parent_id": "p1", "category": "science"}),
+        ("p1#1", {"parent_id": "p1", "category": "science"}),
+        ("p2", {"category": "science"}),
+        ("p3", {"category": "history", "flag": True}),
+    ])
+    assert len(index) == 4 and index.documents == 3
+    assert index.facets() == {"category": {"science": 2, "history": 1}, "flag": {"True": 1}}
+    assert index.facets(["category"], limit=1) == {"category": {"science": 2}}
+
+
+def test_manager_rebuilds_when_the_collection_changed():
+    coll = FakeCollection({"a": {"category": "science"}})
+    manager = MetadataIndexManager()
+    assert manager.get("kb", coll).candidates({"category": "science"}) == ({"a"}, True)
+
+    # A write that bypassed the server (seed.py, snapshot.py)
+    coll.metadatas["b"] = {"category": "science"}
+    assert manager.get("kb", coll).candidates({"category": "science"}) == ({"a", "b"}, True)
+
+    manager.upsert("kb", ["c"], [{"category": "history"}])
+    coll.metadatas["c"] = {"category": "history"}
+    index = manager.get("kb", coll)
+    assert manager.get("kb", coll) is index
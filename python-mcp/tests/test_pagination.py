@@ -0,0 +1,104 @@
+"""Tests for cursor paging over held result sets."""
+import pytest
+
+from src import cache
+from src.pagination import CursorExpiredError, ResultPages, Snapshot, slice_results
+
+
+def _ranked(n: int) -> dict[str, list]:
+    return {
+        "ids": [f"d{i}" for i in range(n)],
+        "documents": [f"doc {i}" for i in range(n)],
+        "metadatas": [{"n": i} for i in range(n)],
+        "distances": [i / 10 for i in range(n)],
+        "included": ["documents", "metadatas"],
+    }
+
+
+def _pages(pages: ResultPages, snapshot: Snapshot) -> list[list[str]]:
+    page, cursor = pages.first_page(snapshot)
+    seen = [page["ids"]]
+    while cursor:
+        _, _, page, cursor = pages.next_page(cursor)
+        seen.append(page["ids"])
+    return seen
+
+
+def test_slice_results_slices_only_per_hit_lists():
+    sliced = slice_results(_ranked(5), 1, 3)
+    assert sliced["ids"] == ["d1", "d2"]
+    assert sliced["distances"] == [0.1, 0.2]
+    assert sliced["included"] == ["documents", "metadatas"]
+
+
+def test_everything_on_one_page_has_no_cursor():
+    pages = ResultPages()
+    page, cursor = pages.first_page(Snapshot("q", "kb", _ranked(3), page_size=5))
+    assert page["ids"] == ["d0", "d1", "d2"] and cursor is None
+    assert len(pages.cache) == 0
+
+
+def test_cursors_walk_the_held_ranking():
+    pages = ResultPages()
+    assert _pages(pages, Snapshot("q", "kb", _ranked(7), page_size=3)) == [
+        ["d0", "d1", "d2"], ["d3", "d4", "d5"], ["d6"],
+    ]
+
+
+def test_next_page_returns_the_snapshot_and_offset():
+    pages = ResultPages()
+    federation = {"collections": ["a", "b"], "failed": []}
+    _, cursor = pages.first_page(Snapshot("bees", "a,b", _ranked(4), page_size=2, federation=federation))
+    snapshot, offset, page, next_cursor = pages.next_page(cursor)
+    assert (snapshot.query, snapshot.collection, snapshot.federation) == ("bees", "a,b", federation)
+    assert offset == 2 and page["distances"] == [0.2, 0.3] and next_cursor is None
+    # A cursor can be replayed while its set is held
+    assert pages.next_page(cursor)[2]["ids"] == ["d2", "d3"]
+
+
+@pytest.mark.parametrize("cursor", ["", "not base64!", "bm90LWEtY3Vyc29y"])
+def test_invalid_cursors(cursor):
+    with pytest.raises(CursorExpiredError):
+        ResultPages().next_page(cursor)
+
+
+def test_offsets_outside_the_held_set_are_invalid():
+    pages = ResultPages()
+    _, cursor = pages.first_page(Snapshot("q", "kb", _ranked(4), page_size=2))
+    token, _ = pages._decode(cursor)
+    assert pages.next_page(pages._encode(token, 3))[2]["ids"] == ["d3"]
+    for offset in (-1, 4, 100):
+        with pytest.raises(CursorExpiredError, match="Invalid cursor"):
+            pages.next_page(pages._encode(token, offset))
+
+
+def test_cursor_expires_after_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cache.time, "monotonic", lambda: now[0])
+    pages = ResultPages(ttl=60)
+    _, cursor = pages.first_page(Snapshot("q", "kb", _ranked(4), page_size=2))
+    now[0] += 59
+    assert pages.next_page(cursor)[2]["ids"] == ["d2", "d3"]
+    now[0] += 2
+    with pytest.raises(CursorExpiredError, match="expired"):
+        pages.next_page(cursor)
+
+
+def test_oldest_sets_are_evicted_first():
+    pages = ResultPages(max_entries=2)
+    cursors = [pages.first_page(Snapshot(f"q{i}", "kb", _ranked(4), page_size=2))[1] for i in range(3)]
+    with pytest.raises(CursorExpiredError):
+        pages.next_page(cursors[0])
+    assert pages.next_page(cursors[2])[0].query == "q2"
+    assert pages.stats()["size"] == 2
+
+
+def test_cursor_owner():
+    pages = ResultPages(owner="reader-1")
+    _, cursor = pages.first_page(Snapshot("q", "kb", _ranked(4), page_size=2))
+    assert ResultPages.cursor_owner(cursor) == "reader-1"
+    assert pages.next_page(cursor)[2]["ids"] == ["d2", "d3"]
+
+    _, anonymous = ResultPages().first_page(Snapshot("q", "kb", _ranked(4), page_size=2))
+    assert ResultPages.cursor_owner(anonymous) is None
+    assert ResultPages.cursor_owner("not base64!") is None
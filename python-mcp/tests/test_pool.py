@@ -0,0 +1,68 @@
+"""Tests for the agent's pooled MCP client connections."""
+import anyio
+import pytest
+
+pytest.importorskip("google.adk")  # src.agent imports the ADK agent
+
+from fastmcp import FastMCP  # noqa: E402
+
+from src.agent.pool import MCPClientPool  # noqa: E402
+
+
+@pytest.fixture
+def server():
+    mcp = FastMCP("pool-test")
+    mcp.calls = []
+
+    @mcp.tool()
+    def append(item: str) -> str:
+        mcp.calls.append(item)
+        return f"{len(mcp.calls)} items"
+
+    return mcp
+
+
+@pytest.fixture
+def pool(server):
+    pool = MCPClientPool(server, size=1, health_interval=0)
+    pool.start()
+    yield pool
+    pool.close()
+
+
+def _break_next_call(pool: MCPClientPool, error: BaseException, after_call: bool = False) -> None:
+    """Make the next call on the pool's connection fail, before or after reaching the server."""
+    client = pool._connections[0].client
+    call_tool = client.call_tool
+
+    async def failing(name, arguments):
+        client.call_tool = call_tool
+        if after_call:
+            await call_tool(name, arguments)
+        raise error
+
+    client.call_tool = failing
+
+
+def test_transport_errors_reconnect_and_retry_once(pool, server):
+    _break_next_call(pool, anyio.ClosedResourceError())
+    result = pool.call_tool("append", {"item": "a"})
+    assert result.content[0].text == "1 items"
+    assert server.calls == ["a"]
+    assert pool.stats()["reconnects"] == 1 and pool.stats()["connected"] == 1
+
+
+def test_other_errors_are_not_retried(pool, server):
+    # The call may already have run on the server; running it again could repeat a write
+    _break_next_call(pool, RuntimeError("unexpected reply"), after_call=True)
+    with pytest.raises(RuntimeError, match="unexpected reply"):
+        pool.call_tool("append", {"item": "a"})
+    assert server.calls == ["a"]
+    assert pool.stats()["reconnects"] == 0
+
+
+def test_a_dropped_connection_is_reopened_before_the_call(pool, server):
+    pool._submit(pool._connections[0].disconnect()).result()
+    assert pool.stats()["connected"] == 0
+    assert pool.call_tool("append", {"item": "a"}).content[0].text == "1 items"
+    assert pool.stats()["reconnects"] == 1
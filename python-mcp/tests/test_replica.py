@@ -0,0 +1,143 @@
+"""Tests for publishing immutable index versions and the writer/publisher lock."""
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from src.replica import CURRENT, PublishLock, ReplicaWatcher, current_version, prune, publish, version_path
+
+
+def _digests(root: Path) -> dict[str, str]:
+    return {
+        str(path.relative_to(root)): hashlib.sha256(path.read_bytes()).hexdigest()
+        for path in sorted(root.rglob("*")) if path.is_file()
+    }
+
+
+@pytest.fixture
+def live(tmp_path):
+    """A minimal live database directory and index directory."""
+    db, index = tmp_path / "db", tmp_path / "index"
+    (db / "segment").mkdir(parents=True)
+    (index / "lexical").mkdir(parents=True)
+    conn = sqlite3.connect(db / "chroma.sqlite3")
+    conn.execute("CREATE TABLE docs (id TEXT)")
+    conn.execute("INSERT INTO docs VALUES ('a')")
+    conn.commit()
+    conn.close()
+    (db / "segment" / "data.bin").write_bytes(b"vectors")
+    (index / "catalog.json").write_text("{}")
+    (index / "lexical" / "kb.json").write_text('{"docs": 1}')
+    (index / "embeddings.sqlite3").write_bytes(b"writer only")
+    return db, index, tmp_path / "replica"
+
+
+def test_publish_makes_a_complete_version_current(live):
+    db, index, root = live
+    assert current_version(root) is None
+    version = publish(db, index, root)
+    assert version == "00000001" and current_version(root) == version
+
+    path = version_path(root, version)
+    conn = sqlite3.connect(path / "chroma" / "chroma.sqlite3")
+    assert conn.execute("SELECT id FROM docs").fetchall() == [("a",)]
+    conn.close()
+    assert (path / "chroma" / "segment" / "data.bin").read_bytes() == b"vectors"
+    assert (path / "index" / "lexical" / "kb.json").exists()
+    assert not (path / "index" / "embeddings.sqlite3").exists()
+    assert json.loads((path / "manifest.json").read_text())["version"] == version
+    assert not [p for p in root.iterdir() if p.name.startswith(".")]
+
+
+def test_old_versions_are_pruned(live):
+    db, index, root = live
+    versions = [publish(db, index, root, keep=2) for _ in range(4)]
+    assert sorted(p.name for p in root.iterdir() if p.name != CURRENT) == versions[2:]
+    assert prune(root, keep=0) == []
+
+
+def test_writes_wait_for_a_publish_and_a_publish_waits_for_writes():
+    lock = PublishLock()
+    events = []
+
+    def publisher():
+        with lock.publishing():
+            events.append("publish")
+
+    def writer():
+        with lock.writing():
+            events.append("late write")
+
+    with lock.writing(), lock.writing():
+        thread = threading.Thread(target=publisher)
+        thread.start()
+        time.sleep(0.05)
+        assert events == []  # writes in progress hold the publish back
+        late = threading.Thread(target=writer)
+        late.start()
+        time.sleep(0.05)
+        assert events == []  # and the pending publish holds new writes back
+    thread.join(5)
+    late.join(5)
+    assert events == ["publish", "late write"]
+
+
+def test_watcher_follows_current(live):
+    db, index, root = live
+    seen = []
+    watcher = ReplicaWatcher(root, None, seen.append)
+    assert not watcher.check()
+    first = publish(db, index, root)
+    assert watcher.check() and not watcher.check()
+    publish(db, index, root)
+    assert watcher.check()
+    assert seen == [version_path(root, first), version_path(root, current_version(root))]
+    assert watcher.stats()["swaps"] == 2
+
+
+def test_unchanged_files_are_linked_from_the_previous_version(live):
+    db, index, root = live
+    first = version_path(root, publish(db, index, root))
+    (index / "lexical" / "kb.json").write_text('{"docs": 12}')
+    second = version_path(root, publish(db, index, root))
+
+    def same_file(rel: str) -> bool:
+        return (first / rel).stat().st_ino == (second / rel).stat().st_ino
+
+    assert same_file("chroma/segment/data.bin") and same_file("index/catalog.json")
+    assert not same_file("index/lexical/kb.json")
+    assert not same_file("chroma/chroma.sqlite3")  # always a fresh backup
+    assert json.loads((second / "manifest.json").read_text())["linked_files"] == 2
+    assert (first / "index" / "lexical" / "kb.json").read_text() == '{"docs": 1}'
+
+
+def test_opening_a_new_version_leaves_the_previous_one_unchanged(tmp_path):
+    chromadb = pytest.importorskip("chromadb")
+    from hash_embedding import HashEmbeddingFunction
+
+    db, index, root = tmp_path / "db", tmp_path / "index", tmp_path / "replica"
+    index.mkdir()
+    coll = chromadb.PersistentClient(path=str(db)).create_collection(
+        "kb-live", embedding_function=HashEmbeddingFunction(dim=16)
+    )
+    # Enough vectors for ChromaDB to persist HNSW segment files next to the SQLite file
+    coll.add(ids=[str(i) for i in range(1500)], documents=[f"bees {i}" for i in range(1500)])
+    first = publish(db, index, root)
+    before = _digests(version_path(root, first))
+
+    # Not yet persisted to the segment files, so the new version links them
+    # and a reader opening it replays these writes from the SQLite log
+    coll.add(ids=[f"x{i}" for i in range(900)], documents=[f"wax {i}" for i in range(900)])
+    second = publish(db, index, root)
+    assert json.loads((version_path(root, second) / "manifest.json").read_text())["linked_files"] > 0
+    reader = chromadb.PersistentClient(path=str(version_path(root, second) / "chroma")).get_collection("kb-live")
+    assert reader.count() == 2400
+    assert reader.query(query_texts=["wax"], n_results=1)["ids"][0][0].startswith("x")
+
+    assert _digests(version_path(root, first)) == before
+    old = chromadb.PersistentClient(path=str(version_path(root, first) / "chroma")).get_collection("kb-live")
+    assert old.count() == 1500
@@ -0,0 +1,100 @@
+"""Tests for second-stage reranking under a time budget."""
+import pytest
+
+from src import rerank
+from src.rerank import CrossEncoder, LexicalOverlap, Reranker, make_scorer
+
+
+class SlowScorer:
+    """Scores by text length; each call advances the fake clock by `delay` seconds."""
+
+    def __init__(self, clock: list[float] | None = None, delay: float = 0.0):
+        self.clock = clock if clock is not None else [0.0]
+        self.delay = delay
+        self.calls: list[list[str]] = []
+
+    def __call__(self, query: str, texts: list[str]) -> list[float]:
+        self.calls.append(list(texts))
+        self.clock[0] += self.delay
+        return [float(len(text)) for text in texts]
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(rerank.time, "perf_counter", lambda: now[0])
+    return now
+
+
+def test_lexical_overlap():
+    scores = LexicalOverlap()("honey bees", ["bees make honey", "honey bees swarm", "the roman empire", ""])
+    assert scores[1] == pytest.approx(1.0)
+    assert scores[0] == pytest.approx(0.7)
+    assert scores[2] == scores[3] == 0.0
+    assert LexicalOverlap()("", ["anything"]) == [0.0]
+
+
+def test_make_scorer():
+    assert isinstance(make_scorer("lexical"), LexicalOverlap)
+    assert isinstance(make_scorer("cross-encoder", "/models/ms-marco"), CrossEncoder)
+    with pytest.raises(ValueError, match="MCP_RERANK_MODEL"):
+        make_scorer("cross-encoder")
+    with pytest.raises(ValueError, match="Unknown reranker"):
+        make_scorer("bm42")
+
+
+def test_scores_are_batched_and_cached():
+    scorer = SlowScorer()
+    reranker = Reranker(scorer, batch_size=2)
+    ids, texts = ["a", "b", "c"], ["x", "xxx", "xx"]
+    assert reranker.score("Bees", ids, texts, budget=5) == [1.0, 3.0, 2.0]
+    assert scorer.calls == [["x", "xxx"], ["xx"]]
+
+    # Same pairs (query normalized) are served from the cache; changed text is rescored
+    assert reranker.score("bees ", ["c", "a", "b"], ["xx", "x", "xxxx"], budget=5) == [2.0, 1.0, 4.0]
+    assert scorer.calls[2:] == [["xxxx"]]
+    assert reranker.stats()["pairs_scored"] == 4
+
+
+def test_budget_exhaustion_falls_back(clock):
+    scorer = SlowScorer(clock, delay=0.05)
+    reranker = Reranker(scorer, batch_size=1)
+    assert reranker.score("q", ["a", "b", "c", "d"], ["a", "b", "c", "d"], budget=0.07) is None
+    assert len(scorer.calls) == 2
+    assert reranker.stats()["stopped_early"] == 1 and reranker.stats()["reranked"] == 0
+
+    # Pairs scored before the budget ran out are kept for the next request
+    assert reranker.score("q", ["a", "b", "c", "d"], ["a", "b", "c", "d"], budget=5) == [1.0] * 4
+    assert scorer.calls[2:] == [["c"], ["d"]]
+
+
+def test_warm_up_reports_a_missing_model(tmp_path):
+    reranker = Reranker(CrossEncoder(tmp_path))
+    reranker.warm_up()
+    assert reranker.stats()["warmup_error"] is not None
+    Reranker(LexicalOverlap()).warm_up()
+
+
+def test_only_the_top_candidates_are_reordered():
+    scorer = SlowScorer()
+    results = {
+        "ids": ["a", "b", "c", "d"],
+        "documents": ["x", "xxx", "xx", "xxxx"],
+        "metadatas": [{"n": 1}, {"n": 2}, {"n": 3}, {"n": 4}],
+        "distances": [0.1, 0.2, 0.3, 0.4],
+        "mode": "vector",
+    }
+    reranked = Reranker(scorer).rerank("q", results, budget=5, candidates=3)
+    assert scorer.calls == [["x", "xxx", "xx"]]
+    assert reranked["ids"] == ["b", "c", "a"]
+    assert reranked["metadatas"] == [{"n": 2}, {"n": 3}, {"n": 1}]
+    assert reranked["distances"] == [0.2, 0.3, 0.1] and reranked["scores"] == [3.0, 2.0, 1.0]
+    assert reranked["mode"] == "vector"
+    assert Reranker(scorer).rerank("q", results, budget=5)["ids"] == ["d", "b", "c", "a"]
+
+
+def test_over_budget_rerank_keeps_the_first_stage_order(clock):
+    results = {"ids": ["a", "b", "c"], "documents": ["x", "xxx", "xx"]}
+    reranker = Reranker(SlowScorer(clock, delay=0.05), batch_size=1)
+    assert reranker.rerank("q", results, budget=0.07, candidates=3) is None
+    assert results["ids"] == ["a", "b", "c"]
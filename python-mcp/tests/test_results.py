@@ -0,0 +1,29 @@
+"""Tests for shaping search hits into structured records and text."""
+from src.chunking import chunk_documents, collapse_chunks
+from src.ingest import normalize_documents
+from src.results import HIDDEN_KEYS, build_records, format_text, project
+
+
+def test_project():
+    metadata = {"title": "Bees", "level": 2, "content_hash": "x"}
+    assert project(metadata, None) == {"title": "Bees", "level": 2}
+    assert project(metadata, ["level", "missing", "content_hash"]) == {"level": 2}
+    assert project(None, None) == {}
+
+
+def test_a_default_search_hit_has_no_bookkeeping_keys():
+    text = " ".join(f"Sentence {i} about bees." for i in range(40))
+    docs = normalize_documents([{"id": "long", "content": text, "title": "Bees"}, {"id": "short", "content": "Wax."}])
+    ids, documents, metadatas = map(list, zip(*chunk_documents(docs, max_tokens=50, overlap=5)))
+    assert all(HIDDEN_KEYS & meta.keys() for meta in metadatas)  # stored, but not shown
+    hits = collapse_chunks(
+        {"ids": ids[1:], "documents": documents[1:], "metadatas": metadatas[1:], "distances": [0.2] * (len(ids) - 1)},
+        n_results=5,
+    )
+
+    records = build_records(hits)
+    assert [record["id"] for record in records] == ["long", "short"]
+    assert [record["metadata"] for record in records] == [{"title": "Bees"}, {}]
+    start, end = records[0]["span"]
+    assert text[start:end] == documents[1] and "span" not in records[1]
+    assert "content_hash" not in format_text("bees", hits) and "chunk_" not in format_text("bees", hits)
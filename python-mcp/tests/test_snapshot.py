@@ -0,0 +1,121 @@
+"""Tests for the .mcpsnap export/import round trip and its integrity checks."""
+import pytest
+
+chromadb = pytest.importorskip("chromadb")
+np = pytest.importorskip("numpy")
+
+from hash_embedding import HashEmbeddingFunction  # noqa: E402
+from src.snapshot import (  # noqa: E402
+    SUFFIX, SnapshotError, SnapshotReader, collection_settings, load_snapshot, write_snapshot,
+)
+
+DOCS = {
+    "a": ("Bees make honey in hives", {"category": "science", "n": 1}),
+    "b": ("Ünïcode text about bees — 蜜蜂", {"category": "misc", "flag": True, "score": 0.5}),
+    "c": ("", {"category": "history"}),
+    "d": ("The Roman empire fell", {"category": "history", "n": 4}),
+    "e": ("Honey cakes", {"category": "cooking"}),
+}
+
+
+@pytest.fixture
+def client(tmp_path):
+    return chromadb.PersistentClient(path=str(tmp_path / "db"))
+
+
+@pytest.fixture
+def source(client):
+    coll = client.create_collection(
+        "kb-source",
+        embedding_function=HashEmbeddingFunction(dim=32),
+        configuration={"hnsw": {"space": "cosine"}},
+        metadata={"owner": "tests"},
+    )
+    coll.add(ids=list(DOCS), documents=[d for d, _ in DOCS.values()], metadatas=[m for _, m in DOCS.values()])
+    return coll
+
+
+def _entries(coll) -> dict:
+    got = coll.get(include=["documents", "metadatas", "embeddings"])
+    return {
+        doc_id: (doc, meta, np.asarray(vector, dtype=np.float32))
+        for doc_id, doc, meta, vector in zip(got["ids"], got["documents"], got["metadatas"], got["embeddings"])
+    }
+
+
+@pytest.mark.parametrize("dtype,tolerance", [("float32", 0.0), ("float16", 1e-3), ("int8", 1e-2)])
+def test_round_trip(client, source, tmp_path, dtype, tolerance):
+    path = tmp_path / f"kb{SUFFIX}"
+    progress = []
+    info = write_snapshot(source, path, dtype=dtype, page_size=2, on_progress=lambda done, total: progress.append(done))
+    assert (info.count, info.dimension, info.dtype, info.collection) == (5, 32, dtype, "kb-source")
+    assert progress == [2, 4, 5]
+
+    with SnapshotReader(path) as reader:
+        reader.verify()
+        assert reader.info().sha256 == info.sha256
+        target = client.create_collection("kb-restored", **collection_settings(reader.header))
+        written = []
+        count = load_snapshot(reader, target, batch_size=3, on_write=lambda ids, docs, metas: written.extend(ids))
+    assert count == 5 and sorted(written) == sorted(DOCS)
+
+    assert target.metadata == {"owner": "tests"}
+    assert target.configuration["hnsw"]["space"] == "cosine"
+    assert target.configuration["embedding_function"].name() == HashEmbeddingFunction.name()
+
+    before, after = _entries(source), _entries(target)
+    assert before.keys() == after.keys()
+    for doc_id, (doc, meta, vector) in before.items():
+        assert after[doc_id][:2] == (doc, meta)
+        np.testing.assert_allclose(after[doc_id][2], vector, atol=tolerance)
+
+    # Restored vectors are searchable without re-embedding
+    hits = target.query(query_texts=["bees honey"], n_results=1)
+    assert hits["ids"][0] == ["a"]
+
+
+def test_empty_collection(client, tmp_path):
+    coll = client.create_collection("kb-empty", embedding_function=HashEmbeddingFunction(dim=8))
+    info = write_snapshot(coll, tmp_path / "empty.mcpsnap")
+    assert info.count == 0
+    with SnapshotReader(info.path) as reader:
+        reader.verify()
+        assert list(reader.batches(10)) == []
+
+
+def test_checksum_catches_corruption(source, tmp_path):
+    path = tmp_path / "kb.mcpsnap"
+    write_snapshot(source, path)
+    data = bytearray(path.read_bytes())
+    data[-10] ^= 0xFF
+    path.write_bytes(bytes(data))
+    with SnapshotReader(path) as reader:
+        with pytest.raises(SnapshotError, match="Checksum mismatch"):
+            reader.verify()
+
+
+def test_truncated_snapshot(source, tmp_path):
+    path = tmp_path / "kb.mcpsnap"
+    write_snapshot(source, path, dtype="float32")
+    path.write_bytes(path.read_bytes()[:-200])
+    with SnapshotReader(path) as reader:
+        with pytest.raises(SnapshotError):
+            reader.verify()
+        with pytest.raises(SnapshotError, match="truncated"):
+            reader.embeddings(0, 5)
+
+
+@pytest.mark.parametrize("content", [b"", b"hello", b"MCPSNAP\0" + b"\xff" * 60])
+def test_not_a_snapshot(tmp_path, content):
+    path = tmp_path / "bad.mcpsnap"
+    path.write_bytes(content)
+    with pytest.raises(SnapshotError):
+        SnapshotReader(path)
+    with pytest.raises(SnapshotError, match="not found"):
+        SnapshotReader(tmp_path / "missing.mcpsnap")
+
+
+def test_unknown_dtype(source, tmp_path):
+    with pytest.raises(ValueError, match="Unknown embedding dtype"):
+        write_snapshot(source, tmp_path / "kb.mcpsnap", dtype="bfloat16")
+    assert not list(tmp_path.glob("*.mcpsnap"))
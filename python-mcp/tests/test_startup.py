@@ -0,0 +1,84 @@
+"""
+Startup budget: time-to-handshake and time-to-first-result of a fresh stdio server.
+
+Each test spawns the server the way an MCP client does (benchmarks/serve.py,
+which registers the hash embedding) against a small scratch corpus, so the
+numbers cover process start, imports and opening ChromaDB but no model
+download. benchmarks/bench_startup.py reports the same measurements in more
+detail.
+"""
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import pytest
+from fastmcp import Client
+from fastmcp.client.transports import StdioTransport
+
+import corpus
+
+SERVE_PATH = Path(__file__).resolve().parent.parent / "benchmarks" / "serve.py"
+
+# Milliseconds from spawn, fast start (the default)
+HANDSHAKE_BUDGET_MS = 1000.0
+FIRST_RESULT_BUDGET_MS = 5000.0
+
+INITIALIZE = {
+    "jsonrpc": "2.0",
+    "id": 0,
+    "method": "initialize",
+    "params": {"protocolVersion": "2025-06-18", "capabilities": {}, "clientInfo": {"name": "test", "version": "0"}},
+}
+
+
+@pytest.fixture(scope="module")
+def db_path(tmp_path_factory) -> Path:
+    path = tmp_path_factory.mktemp("startup") / "db"
+    corpus.build_corpus(path, 200, log=lambda msg: None)
+    return path
+
+
+def _env(db_path: Path, **extra: str) -> dict[str, str]:
+    return {**os.environ, "MCP_CHROMA_PATH": str(db_path), "MCP_TRANSPORT": "stdio", **extra}
+
+
+async def _measure(db_path: Path) -> tuple[float, float, str]:
+    transport = StdioTransport(sys.executable, [str(SERVE_PATH), "--quiet"], env=_env(db_path))
+    start = time.perf_counter()
+    async with Client(transport) as client:
+        handshake = time.perf_counter() - start
+        result = await client.call_tool(
+            "search_documents", {"query": "quantum energy", "collection": corpus.COLLECTION}, raise_on_error=False
+        )
+        first_result = time.perf_counter() - start
+    return handshake * 1000, first_result * 1000, result.content[0].text if result.content else ""
+
+
+def test_startup_budget(db_path):
+    asyncio.run(_measure(db_path))  # first start fills the OS file cache
+    handshake, first_result, text = asyncio.run(_measure(db_path))
+    assert not text.startswith("❌"), text
+    assert handshake <= HANDSHAKE_BUDGET_MS, f"handshake took {handshake:.0f} ms"
+    assert first_result <= FIRST_RESULT_BUDGET_MS, f"first result took {first_result:.0f} ms"
+
+
+def _initialize(db_path: Path, fast_start: str) -> dict:
+    process = subprocess.run(
+        [sys.executable, str(SERVE_PATH), "--quiet"],
+        input=json.dumps(INITIALIZE) + "\n",
+        capture_output=True,
+        text=True,
+        env=_env(db_path, MCP_FAST_START=fast_start),
+        timeout=60,
+    )
+    replies = [json.loads(line) for line in process.stdout.splitlines() if line.strip()]
+    assert len(replies) == 1, process.stdout
+    return replies[0]
+
+
+def test_early_handshake_matches_fastmcp(db_path):
+    assert _initialize(db_path, "1") == _initialize(db_path, "0")